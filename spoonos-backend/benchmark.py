@@ -0,0 +1,495 @@
+"""
+Backend Benchmark
+Đo tải HTTP cho main.py với NEO và LLM giả lập cục bộ (không cần mạng)
+
+Chạy:
+    python benchmark.py                                  # mọi endpoint, dò RPS tối đa
+    python benchmark.py --endpoints mission_detail --rps 200 --duration 20
+    python benchmark.py --target http://localhost:8000   # server đang chạy sẵn
+    python benchmark.py --output after.json --compare before.json
+
+Mặc định script tự khởi động neo_stub_server.py, llm_stub_server.py và
+main.py (uvicorn) trên các port trống, rồi bắn request theo lịch cố định
+(open loop) với RPS cho trước. Kết quả ghi ra JSON để so sánh giữa các commit.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from mission_store import MissionStore
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STUB_CONTRACT = "0x" + "5354" * 10
+# Address whose script hash owns seeded missions in neo_stub_server.py
+STUB_USER = "NL6aweUkjoHj7vdXhSu9QMRbM7VZWbewXk"
+# Creator of the mission written to check that the indexer follows new blocks
+PROBE_CREATOR = "0x" + "be" * 20
+
+
+@dataclass
+class Endpoint:
+    """One benchmarked route: request factory returns (method, path, json body)"""
+    name: str
+    request: Callable[[random.Random, int], Tuple[str, str, Optional[Dict[str, Any]]]]
+
+
+def _evidence_body(rng: random.Random, missions: int):
+    return "POST", "/api/gemini/verify-evidence", {
+        "evidenceType": "photo",
+        "description": f"Chạy bộ {rng.randint(2, 10)}km buổi sáng",
+        "date": "2025-01-15",
+        "missionTitle": "Chạy bộ mỗi ngày",
+        "missionDescription": "Chạy ít nhất 2km mỗi ngày trong 30 ngày"
+    }
+
+
+def _evaluation_body(rng: random.Random, missions: int):
+    evidences = [
+        {
+            "date": f"2025-01-{day:02d}",
+            "description": f"Ngày {day}: chạy {rng.randint(2, 10)}km",
+            "status": "approved",
+            "aiVerification": {"confidence": rng.randint(60, 99)}
+        }
+        for day in range(1, rng.randint(5, 30) + 1)
+    ]
+    return "POST", "/api/gemini/evaluate-mission", {
+        "missionTitle": "Chạy bộ mỗi ngày",
+        "missionDescription": "Chạy ít nhất 2km mỗi ngày trong 30 ngày",
+        "evidences": evidences,
+        "totalDays": 30
+    }
+
+
+def _create_body(rng: random.Random, missions: int):
+    return "POST", "/api/neo/create-mission", {
+        "creator": STUB_USER,
+        "title": "Benchmark mission",
+        "description": "Created by benchmark.py",
+        "reward_amount": 10,
+        "deadline": 86400,
+        "category": "fitness"
+    }
+
+
+ENDPOINTS: Dict[str, Endpoint] = {
+    endpoint.name: endpoint
+    for endpoint in [
+        Endpoint("health", lambda rng, n: ("GET", "/health", None)),
+        Endpoint("neo_status", lambda rng, n: ("GET", "/api/neo/status", None)),
+        Endpoint("mission_detail", lambda rng, n: ("GET", f"/api/missions/{rng.randint(1, n)}", None)),
+        Endpoint("mission_list", lambda rng, n: ("GET", "/api/missions?limit=20", None)),
+        Endpoint("mission_stats", lambda rng, n: ("GET", "/api/missions/stats", None)),
+        Endpoint("user_missions", lambda rng, n: ("GET", f"/api/missions/user/{STUB_USER}?limit=20", None)),
+        Endpoint("create_mission", _create_body),
+        Endpoint("verify_evidence", _evidence_body),
+        Endpoint("evaluate_mission", _evaluation_body),
+    ]
+}
+
+
+# ========== Measurement ==========
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+@dataclass
+class StepResult:
+    offered_rps: float
+    duration: float
+    sent: int = 0
+    ok: int = 0
+    errors: int = 0
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    latencies_ms: List[float] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "offered_rps": self.offered_rps,
+            "achieved_rps": round(self.ok / self.duration, 2) if self.duration else 0.0,
+            "sent": self.sent,
+            "ok": self.ok,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.sent, 4) if self.sent else 0.0,
+            "status_codes": dict(sorted(self.status_codes.items())),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "p99": round(percentile(latencies, 99), 2),
+                "max": round(latencies[-1], 2) if latencies else 0.0,
+                "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0
+            }
+        }
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    endpoint: Endpoint,
+    rps: float,
+    duration: float,
+    missions: int,
+    max_in_flight: int,
+    seed: int
+) -> StepResult:
+    """
+    Fire requests on a fixed schedule (open loop) for `duration` seconds
+
+    Latency is measured from each request's scheduled start, so time spent
+    waiting behind a slow server counts against it instead of silently
+    lowering the offered rate.
+    """
+    rng = random.Random(seed)
+    result = StepResult(offered_rps=rps, duration=duration)
+    total = max(1, int(rps * duration))
+    in_flight = asyncio.Semaphore(max_in_flight)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def one(scheduled: float, method: str, path: str, body: Optional[Dict[str, Any]]):
+        try:
+            response = await client.request(method, path, json=body)
+            code = str(response.status_code)
+            success = response.status_code < 400
+        except httpx.HTTPError as e:
+            code = type(e).__name__
+            success = False
+        finally:
+            in_flight.release()
+
+        result.latencies_ms.append((loop.time() - scheduled) * 1000)
+        result.status_codes[code] = result.status_codes.get(code, 0) + 1
+        if success:
+            result.ok += 1
+        else:
+            result.errors += 1
+
+    tasks = []
+    for index in range(total):
+        scheduled = start + index / rps
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await in_flight.acquire()
+        method, path, body = endpoint.request(rng, missions)
+        result.sent += 1
+        tasks.append(asyncio.create_task(one(scheduled, method, path, body)))
+
+    await asyncio.gather(*tasks)
+    result.duration = max(duration, loop.time() - start)
+    return result
+
+
+def step_passes(summary: Dict[str, Any], max_error_rate: float, p99_slo_ms: float) -> bool:
+    """A rate is sustainable if errors, tail latency and achieved rate all hold up"""
+    return (
+        summary["error_rate"] <= max_error_rate
+        and summary["latency_ms"]["p99"] <= p99_slo_ms
+        and summary["achieved_rps"] >= 0.9 * summary["offered_rps"]
+    )
+
+
+async def bench_endpoint(client: httpx.AsyncClient, endpoint: Endpoint, args) -> Dict[str, Any]:
+    """Run a fixed rate, or ramp the rate until it stops being sustainable"""
+    rates = [args.rps] if args.rps else []
+    if not rates:
+        rate = args.rps_start
+        while rate <= args.rps_max:
+            rates.append(rate)
+            rate = round(rate * args.rps_factor, 2)
+
+    steps = []
+    max_sustainable = 0.0
+    for index, rate in enumerate(rates):
+        step = await run_step(client, endpoint, rate, args.duration, args.missions, args.max_in_flight, args.seed + index)
+        summary = step.summary()
+        summary["sustainable"] = step_passes(summary, args.max_error_rate, args.p99_slo_ms)
+        steps.append(summary)
+
+        latency = summary["latency_ms"]
+        print(
+            f"   {endpoint.name:<18} {rate:>8.1f} rps -> {summary['achieved_rps']:>8.1f} ok/s  "
+            f"p50 {latency['p50']:>7.1f}  p95 {latency['p95']:>7.1f}  p99 {latency['p99']:>7.1f} ms  "
+            f"err {summary['error_rate'] * 100:5.1f}%{'' if summary['sustainable'] else '  ✗'}"
+        )
+
+        if summary["sustainable"]:
+            max_sustainable = max(max_sustainable, summary["achieved_rps"])
+        elif not args.rps:
+            break
+
+    return {"steps": steps, "max_sustainable_rps": max_sustainable}
+
+
+# ========== Local environment ==========
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout: float = 30.0, method: str = "GET"):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.request(method, url, timeout=1.0, json={} if method == "POST" else None)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+class LocalStack:
+    """NEO stand-in + LLM stand-in + main.py as subprocesses on free ports"""
+
+    def __init__(self, args):
+        self.args = args
+        self.processes: List[subprocess.Popen] = []
+        self.db_dir = tempfile.mkdtemp(prefix="missionstake-bench-")
+        self.neo_port = free_port()
+        self.llm_port = free_port()
+        self.api_port = free_port()
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self.api_port}"
+
+    def _spawn(self, command: List[str], env: Dict[str, str]):
+        self.processes.append(subprocess.Popen(
+            command,
+            cwd=BACKEND_DIR,
+            env={**os.environ, **env},
+            stdout=subprocess.DEVNULL,
+            stderr=None if self.args.verbose else subprocess.DEVNULL
+        ))
+
+    def start(self):
+        args = self.args
+        self._spawn([sys.executable, "neo_stub_server.py"], {
+            "NEO_STUB_PORT": str(self.neo_port),
+            "NEO_STUB_CONTRACT": STUB_CONTRACT,
+            "NEO_STUB_MISSIONS": str(args.missions),
+            "NEO_STUB_LATENCY_MS": str(args.neo_latency_ms),
+            "NEO_STUB_JITTER_MS": str(args.neo_latency_ms / 2),
+            "NEO_STUB_ERROR_RATE": str(args.neo_error_rate),
+        })
+        self._spawn([sys.executable, "llm_stub_server.py"], {
+            "LLM_STUB_PORT": str(self.llm_port),
+            "LLM_STUB_LATENCY_MS": str(args.llm_latency_ms),
+            "LLM_STUB_JITTER_MS": str(args.llm_latency_ms / 2),
+            "LLM_STUB_ERROR_RATE": str(args.llm_error_rate),
+        })
+        wait_until_up(f"http://127.0.0.1:{self.neo_port}/stats")
+        wait_until_up(f"http://127.0.0.1:{self.llm_port}/stats")
+
+        self._spawn(
+            [
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "127.0.0.1",
+                "--port", str(self.api_port),
+                "--workers", str(args.workers),
+                "--log-level", "warning",
+                "--no-access-log"
+            ],
+            {
+                "NEO_RPC_URLS": f"http://127.0.0.1:{self.neo_port}",
+                "NEO_MISSION_CONTRACT": STUB_CONTRACT,
+                "NEO_WALLET_ADDRESS": STUB_USER,
+                "GEMINI_API_KEY": "benchmark",
+                "GEMINI_API_ENDPOINT": f"http://127.0.0.1:{self.llm_port}",
+                "MISSION_DB_PATH": os.path.join(self.db_dir, "missions.db"),
+                "MISSION_INDEXER_ENABLED": "true" if args.indexer else "false",
+            }
+        )
+        wait_until_up(f"{self.api_url}/health")
+
+        if args.indexer:
+            self.wait_for_indexer()
+
+    def _neo_rpc(self, method: str, params: List[Any]) -> Any:
+        response = httpx.post(
+            f"http://127.0.0.1:{self.neo_port}",
+            json={"jsonrpc": "2.0", "method": method, "params": params, "id": 1}
+        )
+        return response.json()["result"]
+
+    def wait_for_indexer(self, timeout: float = 60.0):
+        """
+        Wait until the indexer follows new blocks, not just until it backfilled
+
+        One mission is written straight to the NEO stand-in after the
+        backfill; the projection only counts as live once the indexer has
+        applied the block holding that write.
+        """
+        store = MissionStore(os.path.join(self.db_dir, "missions.db"))
+        deadline = time.monotonic() + timeout
+        try:
+            while store.get_indexed_height() == 0 and time.monotonic() < deadline:
+                time.sleep(0.5)
+
+            self._neo_rpc("invokefunction", [STUB_CONTRACT, "create_mission", [
+                {"type": "Hash160", "value": PROBE_CREATOR},
+                {"type": "String", "value": "Indexer probe"},
+                {"type": "String", "value": "Written by benchmark.py after the backfill"},
+                {"type": "Integer", "value": "10"},
+                {"type": "Integer", "value": "1900000000"},
+                {"type": "String", "value": "fitness"}
+            ]])
+            write_block = self._neo_rpc("getblockcount", []) - 1
+            while store.get_indexed_height() < write_block:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(
+                        f"Indexer did not reach block {write_block} within {timeout}s "
+                        f"(indexed height {store.get_indexed_height()})"
+                    )
+                time.sleep(0.5)
+        finally:
+            store.close()
+
+    def backend_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for name, port in (("neo_stub", self.neo_port), ("llm_stub", self.llm_port)):
+            try:
+                stats[name] = httpx.get(f"http://127.0.0.1:{port}/stats").json()
+            except httpx.HTTPError:
+                pass
+        return stats
+
+    def stop(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+# ========== Reporting ==========
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    """Print per-endpoint deltas against a previous results file"""
+    print(f"\n📊 Compared with {baseline['meta'].get('commit') or 'baseline'}:")
+    for name, result in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before or not before["steps"] or not result["steps"]:
+            continue
+        p99_now = result["steps"][0]["latency_ms"]["p99"]
+        p99_before = before["steps"][0]["latency_ms"]["p99"]
+        print(
+            f"   {name:<18} max {before['max_sustainable_rps']:>8.1f} -> {result['max_sustainable_rps']:>8.1f} rps   "
+            f"p99@first-step {p99_before:>7.1f} -> {p99_now:>7.1f} ms"
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="HTTP load test for the MissionStake backend")
+    parser.add_argument("--target", help="Benchmark a running server instead of starting local stand-ins")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Comma-separated endpoint names")
+    parser.add_argument("--rps", type=float, help="Fixed request rate (skips the ramp)")
+    parser.add_argument("--rps-start", type=float, default=20.0)
+    parser.add_argument("--rps-max", type=float, default=2000.0)
+    parser.add_argument("--rps-factor", type=float, default=2.0, help="Rate multiplier between ramp steps")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("--max-in-flight", type=int, default=512)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--p99-slo-ms", type=float, default=1000.0)
+    parser.add_argument("--missions", type=int, default=1000, help="Missions seeded in the NEO stand-in")
+    parser.add_argument("--neo-latency-ms", type=float, default=20.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--neo-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for main.py")
+    parser.add_argument("--indexer", action="store_true", help="Serve reads from the SQLite projection")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Previous results file to diff against")
+    parser.add_argument("--verbose", action="store_true", help="Show server logs")
+    return parser.parse_args(argv)
+
+
+async def run(args, base_url: str) -> Dict[str, Dict[str, Any]]:
+    names = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {', '.join(unknown)} (known: {', '.join(ENDPOINTS)})")
+
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        for name in names:
+            results[name] = await bench_endpoint(client, ENDPOINTS[name], args)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    stack = None if args.target else LocalStack(args)
+
+    if stack:
+        print("🚀 Starting NEO stand-in, LLM stand-in and main.py...")
+        stack.start()
+    base_url = args.target or stack.api_url
+    print(f"🎯 Target: {base_url}\n")
+
+    try:
+        endpoints = asyncio.run(run(args, base_url))
+        backend = stack.backend_stats() if stack else {}
+    finally:
+        if stack:
+            stack.stop()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": args.target or "local",
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "verbose")}
+        },
+        "endpoints": endpoints,
+        "stand_ins": backend
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
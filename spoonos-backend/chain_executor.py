@@ -0,0 +1,101 @@
+"""
+Blockchain Executor
+Thread pool riêng cho các lời gọi NEO đồng bộ, có giới hạn hàng đợi và backpressure
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict
+
+
+class ChainSaturatedError(Exception):
+    """Raised when the blockchain executor has no room for another call"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Blockchain executor saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class BlockchainExecutor:
+    """
+    Bounded executor for blockchain work
+
+    Synchronous NeoService calls run on a dedicated thread pool so they never
+    block the event loop, and native async calls share the same admission
+    limit. Once max_workers + max_queue calls are in flight, new calls fail
+    fast with ChainSaturatedError instead of piling up behind slow nodes.
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 64, retry_after: int = 2):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="neo-chain")
+        # Only touched from the event loop thread, so a plain int is enough
+        self._pending = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _acquire(self):
+        if self._pending >= self.capacity:
+            self._rejected += 1
+            raise ChainSaturatedError(self.retry_after)
+        self._pending += 1
+
+    def _release(self):
+        self._pending -= 1
+
+    @asynccontextmanager
+    async def admit(self):
+        """Reserve a slot for a native async chain call"""
+        self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking function on the blockchain thread pool
+
+        Args:
+            fn: Synchronous callable (e.g. a NeoService method)
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            ChainSaturatedError: If the queue is full
+        """
+        loop = asyncio.get_running_loop()
+        self._acquire()
+        try:
+            future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the thread is free, even if the awaiter is cancelled first
+        future.add_done_callback(lambda _: self._release_from_thread(loop))
+        return await asyncio.wrap_future(future)
+
+    def _release_from_thread(self, loop: asyncio.AbstractEventLoop):
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # Loop already closed: nothing is left to admit calls
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self._pending,
+            "capacity": self.capacity,
+            "workers": self.max_workers,
+            "rejected": self._rejected
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
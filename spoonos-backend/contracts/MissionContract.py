@@ -10,12 +10,14 @@ Features:
 - Track mission stats
 """
 
-from typing import Any, Union
-from boa3.builtin import NeoMetadata, metadata, public
+from typing import Any, List, Union
+from boa3.builtin import CreateNewEvent, NeoMetadata, metadata, public
 from boa3.builtin.contract import Nep17TransferEvent, abort
 from boa3.builtin.interop.blockchain import get_contract, Transaction
 from boa3.builtin.interop.runtime import calling_script_hash, check_witness, executing_script_hash
 from boa3.builtin.interop.storage import delete, get, put, find
+from boa3.builtin.interop.storage.findoptions import FindOptions
+from boa3.builtin.nativecontract.stdlib import StdLib
 from boa3.builtin.type import UInt160
 
 
@@ -32,8 +34,37 @@ def manifest_metadata() -> NeoMetadata:
 # Storage Keys
 MISSION_COUNT_KEY = b'mission_count'
 MISSION_PREFIX = b'mission:'
+# One entry per (user, mission): user_missions: + user + mission_id -> mission_id
+# Mission IDs in keys are _id_key() bytes, so find() walks every index in ID order
 USER_MISSIONS_PREFIX = b'user_missions:'
 COMPLETED_PREFIX = b'completed:'
+# status:/category: index entries -> mission_id, status_count: counters
+STATUS_INDEX_PREFIX = b'status:'
+CATEGORY_INDEX_PREFIX = b'category:'
+STATUS_COUNT_PREFIX = b'status_count:'
+
+# Upper bound for paginated reads
+MAX_PAGE_SIZE = 100
+MAX_CATEGORY_LENGTH = 32
+# Upper bound for batch entry points (keeps one transaction under the GAS limit)
+MAX_BATCH_SIZE = 20
+
+
+# Mission record layout
+# Missions are stored as StdLib.serialize([...]) of a fixed-position list
+# instead of str(dict): smaller storage, no string parsing on every
+# transition. NeoService.decode_mission mirrors this layout.
+FIELD_ID = 0
+FIELD_CREATOR = 1
+FIELD_TITLE = 2
+FIELD_DESCRIPTION = 3
+FIELD_REWARD = 4
+FIELD_DEADLINE = 5
+FIELD_CATEGORY = 6
+FIELD_STATUS = 7
+FIELD_ASSIGNEE = 8
+FIELD_CREATED_AT = 9
+FIELD_COMPLETED_AT = 10
 
 
 # Mission Status
@@ -44,6 +75,162 @@ STATUS_VERIFIED = 3
 STATUS_CANCELLED = 4
 
 
+# Events - one per state transition, carrying the fields that changed so
+# off-chain indexers can follow the contract from application logs alone
+# (decoded by MISSION_EVENTS in neo_service.py; keep the field order in sync)
+on_mission_created = CreateNewEvent(
+    [
+        ('mission_id', int),
+        ('creator', UInt160),
+        ('title', str),
+        ('description', str),
+        ('reward', int),
+        ('deadline', int),
+        ('category', str),
+        ('created_at', int)
+    ],
+    'MissionCreated'
+)
+
+on_mission_accepted = CreateNewEvent(
+    [
+        ('mission_id', int),
+        ('assignee', UInt160)
+    ],
+    'MissionAccepted'
+)
+
+on_mission_completed = CreateNewEvent(
+    [
+        ('mission_id', int),
+        ('assignee', UInt160),
+        ('proof', str),
+        ('completed_at', int)
+    ],
+    'MissionCompleted'
+)
+
+on_mission_verified = CreateNewEvent(
+    [
+        ('mission_id', int),
+        ('verifier', UInt160),
+        ('approved', bool),
+        ('status', int)
+    ],
+    'MissionVerified'
+)
+
+on_mission_cancelled = CreateNewEvent(
+    [
+        ('mission_id', int),
+        ('creator', UInt160)
+    ],
+    'MissionCancelled'
+)
+
+
+def _id_key(mission_id: int) -> bytes:
+    """
+    Mission ID dạng 8 byte big-endian cho storage key
+
+    int.to_bytes() là little-endian, độ dài thay đổi: find() sẽ trả 256
+    trước 2. Độ dài cố định + big-endian thì thứ tự byte = thứ tự ID.
+    """
+    data = mission_id.to_bytes()
+    key = b''
+    index = 0
+    while index < 8:
+        if index < len(data):
+            key = data[index:index + 1] + key
+        else:
+            key = b'\x00' + key
+        index += 1
+    return key
+
+
+def _mission_key(mission_id: int) -> bytes:
+    return MISSION_PREFIX + _id_key(mission_id)
+
+
+def _load_mission(mission_id: int) -> List[Any]:
+    """
+    Đọc mission từ storage (list rỗng nếu không tồn tại)
+    """
+    data = get(_mission_key(mission_id))
+    if len(data) == 0:
+        return []
+    return StdLib.deserialize(data)
+
+
+def _save_mission(mission_id: int, mission: List[Any]):
+    put(_mission_key(mission_id), StdLib.serialize(mission))
+
+
+def _add_user_mission(user: UInt160, mission_id: int):
+    """
+    Ghi 1 entry cho (user, mission) - O(1), không đọc lại cả danh sách
+    """
+    put(USER_MISSIONS_PREFIX + user + _id_key(mission_id), mission_id)
+
+
+def _status_prefix(status: int) -> bytes:
+    # status + 1 so STATUS_PENDING (0) still gets a non-empty byte
+    return STATUS_INDEX_PREFIX + (status + 1).to_bytes()
+
+
+def _category_prefix(category: str) -> bytes:
+    # Terminator keeps "fit" from matching "fitness"
+    return CATEGORY_INDEX_PREFIX + category.to_bytes() + b'\x00'
+
+
+def _status_count_key(status: int) -> bytes:
+    return STATUS_COUNT_PREFIX + (status + 1).to_bytes()
+
+
+def _add_status_count(status: int, delta: int):
+    count_key = _status_count_key(status)
+    put(count_key, get(count_key).to_int() + delta)
+
+
+def _add_to_status(mission_id: int, status: int):
+    put(_status_prefix(status) + _id_key(mission_id), mission_id)
+
+
+def _remove_from_status(mission_id: int, status: int):
+    delete(_status_prefix(status) + _id_key(mission_id))
+
+
+def _set_status(mission_id: int, mission: List[Any], status: int):
+    """
+    Đổi status của mission, cập nhật status index và counters cùng lúc
+    (mọi thay đổi storage chỉ được commit khi transaction HALT)
+    """
+    _remove_from_status(mission_id, mission[FIELD_STATUS])
+    _add_status_count(mission[FIELD_STATUS], -1)
+    _add_to_status(mission_id, status)
+    _add_status_count(status, 1)
+    mission[FIELD_STATUS] = status
+
+
+def _page_ids(prefix: bytes, offset: int, limit: int) -> List[int]:
+    """
+    Đọc 1 trang mission ID từ các entry có cùng prefix (ID tăng dần, cũ nhất trước)
+    """
+    if limit > MAX_PAGE_SIZE:
+        limit = MAX_PAGE_SIZE
+    
+    ids: List[int] = []
+    entries = find(prefix, FindOptions.VALUES_ONLY)
+    index = 0
+    while len(ids) < limit and entries.next():
+        if index >= offset:
+            value: bytes = entries.value
+            ids.append(value.to_int())
+        index += 1
+    
+    return ids
+
+
 @public
 def deploy() -> bool:
     """
@@ -80,6 +267,62 @@ def create_mission(
     if not check_witness(creator):
         abort()
     
+    # Get next mission ID
+    mission_id = get(MISSION_COUNT_KEY).to_int() + 1
+    _store_new_mission(mission_id, creator, title, description, reward_amount, deadline, category)
+    
+    # Update mission count
+    put(MISSION_COUNT_KEY, mission_id)
+    _add_status_count(STATUS_PENDING, 1)
+    
+    return mission_id
+
+
+@public
+def create_missions_batch(creator: UInt160, missions: List[List[Any]]) -> List[int]:
+    """
+    Tạo nhiều missions trong 1 transaction
+    
+    Witness chỉ kiểm tra 1 lần, mission_count chỉ đọc/ghi 1 lần cho cả batch.
+    
+    Args:
+        creator: Địa chỉ người tạo
+        missions: Mỗi phần tử là [title, description, reward_amount, deadline, category]
+    
+    Returns:
+        List[int]: ID của các missions vừa tạo (theo thứ tự đầu vào)
+    """
+    if not check_witness(creator):
+        abort()
+    if len(missions) == 0 or len(missions) > MAX_BATCH_SIZE:
+        abort()
+    
+    mission_id = get(MISSION_COUNT_KEY).to_int()
+    ids: List[int] = []
+    for item in missions:
+        mission_id = mission_id + 1
+        _store_new_mission(mission_id, creator, item[0], item[1], item[2], item[3], item[4])
+        ids.append(mission_id)
+    
+    put(MISSION_COUNT_KEY, mission_id)
+    _add_status_count(STATUS_PENDING, len(ids))
+    
+    return ids
+
+
+def _store_new_mission(
+    mission_id: int,
+    creator: UInt160,
+    title: str,
+    description: str,
+    reward_amount: int,
+    deadline: int,
+    category: str
+):
+    """
+    Validate và ghi mission mới cùng các index (không kiểm tra witness,
+    không cập nhật mission_count / status counter - caller cập nhật 1 lần)
+    """
     # Validate inputs
     if len(title) == 0 or len(title) > 100:
         abort()
@@ -87,44 +330,42 @@ def create_mission(
         abort()
     if reward_amount <= 0:
         abort()
+    if len(category) == 0 or len(category) > MAX_CATEGORY_LENGTH:
+        abort()
     
-    # Get next mission ID
-    mission_count = get(MISSION_COUNT_KEY).to_int()
-    mission_id = mission_count + 1
-    
-    # Store mission data
-    mission_key = MISSION_PREFIX + mission_id.to_bytes()
-    mission_data = {
-        'id': mission_id,
-        'creator': creator,
-        'title': title,
-        'description': description,
-        'reward': reward_amount,
-        'deadline': deadline,
-        'category': category,
-        'status': STATUS_PENDING,
-        'assignee': b'',
-        'created_at': 0,  # Will be set by block timestamp
-        'completed_at': 0
-    }
-    
-    # Serialize and store (simplified - in production use proper serialization)
-    put(mission_key, str(mission_data))
-    
-    # Update mission count
-    put(MISSION_COUNT_KEY, mission_id)
-    
-    # Add to creator's missions list
-    user_key = USER_MISSIONS_PREFIX + creator
-    user_missions = get(user_key)
-    if len(user_missions) == 0:
-        put(user_key, str([mission_id]))
-    else:
-        missions = eval(user_missions)  # Parse existing list
-        missions.append(mission_id)
-        put(user_key, str(missions))
-    
-    return mission_id
+    # Store mission data (field order = FIELD_* constants)
+    mission: List[Any] = [
+        mission_id,
+        creator,
+        title,
+        description,
+        reward_amount,
+        deadline,
+        category,
+        STATUS_PENDING,
+        b'',
+        0,  # created_at - will be set by block timestamp
+        0   # completed_at
+    ]
+    _save_mission(mission_id, mission)
+    
+    # Status / category indexes
+    _add_to_status(mission_id, STATUS_PENDING)
+    put(_category_prefix(category) + _id_key(mission_id), mission_id)
+    
+    # Add to creator's missions
+    _add_user_mission(creator, mission_id)
+    
+    on_mission_created(
+        mission_id,
+        creator,
+        title,
+        description,
+        reward_amount,
+        deadline,
+        category,
+        mission[FIELD_CREATED_AT]
+    )
 
 
 @public
@@ -144,32 +385,24 @@ def accept_mission(mission_id: int, user: UInt160) -> bool:
         return False
     
     # Get mission
-    mission_key = MISSION_PREFIX + mission_id.to_bytes()
-    mission_data_str = get(mission_key)
+    mission = _load_mission(mission_id)
     
-    if len(mission_data_str) == 0:
+    if len(mission) == 0:
         return False
     
-    mission = eval(mission_data_str)
-    
     # Check if mission is available
-    if mission['status'] != STATUS_PENDING:
+    if mission[FIELD_STATUS] != STATUS_PENDING:
         return False
     
     # Update mission status and assignee
-    mission['status'] = STATUS_IN_PROGRESS
-    mission['assignee'] = user
-    put(mission_key, str(mission))
+    _set_status(mission_id, mission, STATUS_IN_PROGRESS)
+    mission[FIELD_ASSIGNEE] = user
+    _save_mission(mission_id, mission)
     
     # Add to user's accepted missions
-    user_key = USER_MISSIONS_PREFIX + user
-    user_missions = get(user_key)
-    if len(user_missions) == 0:
-        put(user_key, str([mission_id]))
-    else:
-        missions = eval(user_missions)
-        missions.append(mission_id)
-        put(user_key, str(missions))
+    _add_user_mission(user, mission_id)
+    
+    on_mission_accepted(mission_id, user)
     
     return True
 
@@ -192,31 +425,30 @@ def complete_mission(mission_id: int, user: UInt160, proof: str) -> bool:
         return False
     
     # Get mission
-    mission_key = MISSION_PREFIX + mission_id.to_bytes()
-    mission_data_str = get(mission_key)
+    mission = _load_mission(mission_id)
     
-    if len(mission_data_str) == 0:
+    if len(mission) == 0:
         return False
     
-    mission = eval(mission_data_str)
-    
     # Verify user is assigned to this mission
-    if mission['assignee'] != user:
+    if mission[FIELD_ASSIGNEE] != user:
         return False
     
     # Check status
-    if mission['status'] != STATUS_IN_PROGRESS:
+    if mission[FIELD_STATUS] != STATUS_IN_PROGRESS:
         return False
     
     # Update mission
-    mission['status'] = STATUS_COMPLETED
-    mission['completed_at'] = 0  # Will be block timestamp
-    put(mission_key, str(mission))
+    _set_status(mission_id, mission, STATUS_COMPLETED)
+    mission[FIELD_COMPLETED_AT] = 0  # Will be block timestamp
+    _save_mission(mission_id, mission)
     
     # Store proof
-    proof_key = COMPLETED_PREFIX + mission_id.to_bytes()
+    proof_key = COMPLETED_PREFIX + _id_key(mission_id)
     put(proof_key, proof)
     
+    on_mission_completed(mission_id, user, proof, mission[FIELD_COMPLETED_AT])
+    
     return True
 
 
@@ -237,37 +469,70 @@ def verify_mission(mission_id: int, verifier: UInt160, approved: bool) -> bool:
     if not check_witness(verifier):
         return False
     
+    return _verify(mission_id, verifier, approved)
+
+
+@public
+def verify_missions_batch(verifier: UInt160, mission_ids: List[int], approvals: List[bool]) -> List[bool]:
+    """
+    Verify nhiều missions trong 1 transaction (witness kiểm tra 1 lần)
+    
+    Args:
+        verifier: Địa chỉ người verify (phải là creator của từng mission)
+        mission_ids: Danh sách mission IDs
+        approvals: approved/rejected tương ứng với từng mission ID
+    
+    Returns:
+        List[bool]: Kết quả từng mission (False nếu mission đó không hợp lệ)
+    """
+    if not check_witness(verifier):
+        abort()
+    if len(mission_ids) != len(approvals) or len(mission_ids) > MAX_BATCH_SIZE:
+        abort()
+    
+    results: List[bool] = []
+    index = 0
+    while index < len(mission_ids):
+        results.append(_verify(mission_ids[index], verifier, approvals[index]))
+        index += 1
+    
+    return results
+
+
+def _verify(mission_id: int, verifier: UInt160, approved: bool) -> bool:
+    """
+    Logic verify của 1 mission (witness đã được caller kiểm tra)
+    """
     # Get mission
-    mission_key = MISSION_PREFIX + mission_id.to_bytes()
-    mission_data_str = get(mission_key)
+    mission = _load_mission(mission_id)
     
-    if len(mission_data_str) == 0:
+    if len(mission) == 0:
         return False
     
-    mission = eval(mission_data_str)
-    
     # Verify caller is creator
-    if mission['creator'] != verifier:
+    if mission[FIELD_CREATOR] != verifier:
         return False
     
     # Check status
-    if mission['status'] != STATUS_COMPLETED:
+    if mission[FIELD_STATUS] != STATUS_COMPLETED:
         return False
     
     if approved:
-        mission['status'] = STATUS_VERIFIED
+        _set_status(mission_id, mission, STATUS_VERIFIED)
         # TODO: Transfer reward to assignee
         # This would integrate with GAS token transfer
     else:
-        mission['status'] = STATUS_IN_PROGRESS  # Return to in-progress
+        _set_status(mission_id, mission, STATUS_IN_PROGRESS)  # Return to in-progress
+    
+    _save_mission(mission_id, mission)
     
-    put(mission_key, str(mission))
+    on_mission_verified(mission_id, verifier, approved, mission[FIELD_STATUS])
     
     return True
 
 
 @public
-def get_mission(mission_id: int) -> str:
+def get_mission(mission_id: int) -> bytes:
     """
     Lấy thông tin mission
     
@@ -275,35 +540,27 @@ def get_mission(mission_id: int) -> str:
         mission_id: ID của mission
     
     Returns:
-        str: JSON string của mission data
+        bytes: Mission đã serialize (StdLib.serialize, layout FIELD_*),
+               rỗng nếu không tồn tại. Trả nguyên bytes để không tốn GAS
+               deserialize; backend tự giải mã.
     """
-    mission_key = MISSION_PREFIX + mission_id.to_bytes()
-    mission_data = get(mission_key)
-    
-    if len(mission_data) == 0:
-        return ''
-    
-    return mission_data
+    return get(_mission_key(mission_id))
 
 
 @public
-def get_user_missions(user: UInt160) -> str:
+def get_user_missions(user: UInt160, offset: int, limit: int) -> List[int]:
     """
-    Lấy danh sách missions của user
+    Lấy danh sách missions của user (có phân trang)
     
     Args:
         user: Địa chỉ user
+        offset: Số entry bỏ qua
+        limit: Số mission tối đa trả về (tối đa MAX_PAGE_SIZE)
     
     Returns:
-        str: JSON string array của mission IDs
+        List[int]: Mission IDs (tăng dần, cũ nhất trước)
     """
-    user_key = USER_MISSIONS_PREFIX + user
-    missions = get(user_key)
-    
-    if len(missions) == 0:
-        return '[]'
-    
-    return missions
+    return _page_ids(USER_MISSIONS_PREFIX + user, offset, limit)
 
 
 @public
@@ -320,6 +577,52 @@ def get_mission_count() -> int:
     return count.to_int()
 
 
+@public
+def get_missions_by_status(status: int, offset: int, limit: int) -> List[int]:
+    """
+    Lấy 1 trang mission IDs theo status
+    
+    Args:
+        status: STATUS_* code
+        offset: Số entry bỏ qua
+        limit: Số mission tối đa (tối đa MAX_PAGE_SIZE)
+    
+    Returns:
+        List[int]: Mission IDs (tăng dần, cũ nhất trước)
+    """
+    return _page_ids(_status_prefix(status), offset, limit)
+
+
+@public
+def get_missions_by_category(category: str, offset: int, limit: int) -> List[int]:
+    """
+    Lấy 1 trang mission IDs theo category
+    
+    Args:
+        category: Loại mission
+        offset: Số entry bỏ qua
+        limit: Số mission tối đa (tối đa MAX_PAGE_SIZE)
+    
+    Returns:
+        List[int]: Mission IDs (tăng dần, cũ nhất trước)
+    """
+    return _page_ids(_category_prefix(category), offset, limit)
+
+
+@public
+def get_status_count(status: int) -> int:
+    """
+    Số mission đang ở một status (VD: COMPLETED chờ verify)
+    
+    Args:
+        status: STATUS_* code
+    
+    Returns:
+        int: Số lượng missions
+    """
+    return get(_status_count_key(status)).to_int()
+
+
 @public
 def cancel_mission(mission_id: int, creator: UInt160) -> bool:
     """
@@ -337,24 +640,23 @@ def cancel_mission(mission_id: int, creator: UInt160) -> bool:
         return False
     
     # Get mission
-    mission_key = MISSION_PREFIX + mission_id.to_bytes()
-    mission_data_str = get(mission_key)
+    mission = _load_mission(mission_id)
     
-    if len(mission_data_str) == 0:
+    if len(mission) == 0:
         return False
     
-    mission = eval(mission_data_str)
-    
     # Verify caller is creator
-    if mission['creator'] != creator:
+    if mission[FIELD_CREATOR] != creator:
         return False
     
     # Can only cancel pending missions
-    if mission['status'] != STATUS_PENDING:
+    if mission[FIELD_STATUS] != STATUS_PENDING:
         return False
     
     # Update status
-    mission['status'] = STATUS_CANCELLED
-    put(mission_key, str(mission))
+    _set_status(mission_id, mission, STATUS_CANCELLED)
+    _save_mission(mission_id, mission)
+    
+    on_mission_cancelled(mission_id, creator)
     
     return True
@@ -0,0 +1,133 @@
+"""
+Evidence Batch
+Gom nhiều bằng chứng của cùng một nhiệm vụ vào ít lời gọi LLM nhất trong ngân sách token
+"""
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+from structured_output import StructuredOutputError, extract_json
+
+load_dotenv()
+
+# Rough 4 chars/token estimate (the same one llm_stub_server reports)
+CHARS_PER_TOKEN = 4
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_PROMPT_TOKENS", "6000"))
+# Verdicts per call; 25 short verdicts stay well inside the providers' max_tokens
+MAX_ITEMS_PER_CALL = int(os.getenv("LLM_BATCH_MAX_ITEMS", "25"))
+# Evidences accepted by one /api/gemini/verify-evidence/batch request
+MAX_EVIDENCES_PER_REQUEST = 100
+
+# JSON Schema of a batch answer, for the providers' JSON modes
+BATCH_VERDICTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "verdicts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    "result": {"type": "string", "enum": ["approve", "reject"]},
+                    "confidence": {"type": "integer"},
+                    "reason": {"type": "string"}
+                },
+                "required": ["index", "result", "confidence", "reason"]
+            }
+        }
+    },
+    "required": ["verdicts"]
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def format_evidence(index: int, evidence_type: str, description: str, date: str) -> str:
+    """One prompt line per evidence; whitespace is collapsed so items never span lines"""
+    return " ".join(f"[{index}] Loại: {evidence_type} | Mô tả: {description} | Ngày nộp: {date}".split())
+
+
+def build_batch_prompt(mission_title: str, mission_description: str, lines: Sequence[str]) -> str:
+    """Mission context once, then every evidence line, asking for one verdict per index"""
+    evidence_block = "\n".join(lines)
+    return f"""Bạn là một AI chuyên đánh giá bằng chứng hoàn thành nhiệm vụ.
+
+NHIỆM VỤ:
+Tiêu đề: {mission_title}
+Mô tả: {mission_description}
+
+CÁC BẰNG CHỨNG CẦN ĐÁNH GIÁ (mỗi dòng một bằng chứng, đánh số [index]):
+{evidence_block}
+
+YÊU CẦU (cho TỪNG bằng chứng, đánh giá độc lập với các bằng chứng khác):
+1. Đánh giá bằng chứng có phù hợp với nhiệm vụ không (approve hoặc reject)
+2. Cho điểm độ tin cậy từ 0-100
+3. Giải thích lý do ngắn gọn (1-2 câu)
+
+Trả về JSON theo format, đủ một phần tử cho mỗi index:
+{{
+  "verdicts": [
+    {{"index": số index, "result": "approve" hoặc "reject", "confidence": số từ 0-100, "reason": "lý do ngắn gọn"}}
+  ]
+}}"""
+
+
+def pack_evidences(
+    items: Sequence[Tuple[int, str]],
+    header_tokens: int,
+    prompt_budget: int = PROMPT_TOKEN_BUDGET,
+    max_items: int = MAX_ITEMS_PER_CALL
+) -> List[List[Tuple[int, str]]]:
+    """
+    Split (index, line) items into consecutive batches
+
+    Each batch's prompt (mission header counted once per batch) stays within
+    prompt_budget tokens and its answer within max_items verdicts. An item
+    too large for any batch still gets a batch of its own.
+    """
+    batches: List[List[Tuple[int, str]]] = []
+    current: List[Tuple[int, str]] = []
+    used = header_tokens
+
+    for item in items:
+        cost = estimate_tokens(item[1]) + 1
+        if current and (used + cost > prompt_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            used = header_tokens
+        current.append(item)
+        used += cost
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_batch_verdicts(text: str, indexes: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Verdicts by index from a batch answer
+
+    Only indexes that were asked for and carry a result are returned; the
+    caller re-asks for the rest one by one.
+    """
+    try:
+        verdicts = extract_json(text, "{").get("verdicts", [])
+    except StructuredOutputError:
+        return {}
+
+    wanted = set(indexes)
+    parsed: Dict[int, Dict[str, Any]] = {}
+    for verdict in verdicts if isinstance(verdicts, list) else []:
+        if not isinstance(verdict, dict):
+            continue
+        try:
+            index = int(verdict.get("index"))
+        except (TypeError, ValueError):
+            continue
+        if index in wanted and index not in parsed and verdict.get("result") in ("approve", "reject"):
+            parsed[index] = verdict
+    return parsed
@@ -0,0 +1,219 @@
+"""
+Mission Indexer
+Theo dõi block mới, áp dụng event của MissionContract vào bản chiếu SQLite
+
+Chạy riêng:  python indexer.py
+Hoặc trong API: MISSION_INDEXER_ENABLED=true
+"""
+import os
+import base64
+import asyncio
+import logging
+from typing import Any, Dict, List, Set, Tuple
+
+from neo_service import NeoService, decode_mission_events, neo_service
+from neo_codec import decode_contract_calls, script_references
+from mission_store import DEFAULT_DB_PATH, MissionStore
+
+logger = logging.getLogger(__name__)
+
+# Contract methods whose first argument is the mission ID they change
+MISSION_ID_METHODS = {"accept_mission", "complete_mission", "verify_mission", "cancel_mission"}
+
+
+class MissionIndexer:
+    """
+    Follows the chain and keeps a MissionStore in sync with MissionContract
+
+    On first run it backfills every mission by ID. After that it walks each
+    new block, picks the transactions whose script calls the contract and
+    applies the events in their application logs to the store, so the work
+    per block is proportional to the number of changes. Logs without events
+    (contracts deployed before events were added) fall back to decoding the
+    call script and re-reading the missions it touched. The indexed height
+    only advances past a block once all of its logs and mission reads
+    succeeded; otherwise the sync stops there and retries it next time.
+    """
+
+    def __init__(
+        self,
+        service: NeoService,
+        store: MissionStore,
+        batch_size: int = 50,
+        max_blocks_per_sync: int = 200
+    ):
+        self.service = service
+        self.store = store
+        self.batch_size = batch_size
+        self.max_blocks_per_sync = max_blocks_per_sync
+        self._task = None
+
+    @property
+    def contract(self) -> str:
+        return self.service.mission_contract
+
+    async def _refresh(self, mission_ids: List[int], height: int, proofs: Dict[int, str] = None):
+        """Re-read missions from the contract and write them to the store"""
+        proofs = proofs or {}
+        for start in range(0, len(mission_ids), self.batch_size):
+            chunk = mission_ids[start:start + self.batch_size]
+            # strict: a failed read aborts the sync so the block is retried
+            missions = await self.service.aget_missions(chunk, strict=True)
+            for mission in missions:
+                if mission["id"] in proofs:
+                    mission["proof"] = proofs[mission["id"]]
+            self.store.upsert_missions(missions, height)
+
+    async def backfill(self, height: int):
+        """Load every mission currently on chain"""
+        count = await self.service.aget_mission_count()
+        logger.info("Backfilling %d missions at height %d", count, height)
+        await self._refresh(list(range(1, count + 1)), height)
+        self.store.set_indexed_height(height)
+
+    async def _fetch_blocks(self, indexes: List[int]) -> List[Dict[str, Any]]:
+        return await self.service.rpc.batch([("getblock", [index, True]) for index in indexes])
+
+    async def _scan_block(self, block: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Set[int], Dict[int, str]]:
+        """
+        Find missions changed by a block
+
+        Returns:
+            (decoded events, mission IDs to re-read, proofs submitted by those)
+        """
+        txs = []
+        for tx in block.get("tx", []):
+            script = base64.b64decode(tx.get("script", ""))
+            if script_references(script, self.contract):
+                txs.append((tx["hash"], script))
+
+        events: List[Dict[str, Any]] = []
+        changed: Set[int] = set()
+        proofs: Dict[int, str] = {}
+        if not txs:
+            return events, changed, proofs
+
+        logs = await self.service.rpc.batch(
+            [("getapplicationlog", [tx_hash]) for tx_hash, _ in txs],
+            return_exceptions=True
+        )
+
+        failed = [tx_hash for (tx_hash, _), log in zip(txs, logs) if isinstance(log, Exception)]
+        if failed:
+            # The block is retried on the next sync rather than applied without these changes
+            raise RuntimeError(f"No application log for {len(failed)} transaction(s), first {failed[0]}")
+
+        for (tx_hash, script), log in zip(txs, logs):
+            executions = log.get("executions", [])
+            if not executions or executions[0].get("vmstate") != "HALT":
+                continue
+
+            tx_events = decode_mission_events(log, self.contract)
+            if tx_events:
+                events.extend(tx_events)
+                continue
+
+            for call in decode_contract_calls(script, self.contract):
+                method, args = call["method"], call["args"]
+                if method in ("create_mission", "create_missions_batch"):
+                    # New IDs are the call's return values (Integer or Array of Integer)
+                    for item in executions[0].get("stack", []):
+                        if item.get("type") == "Integer":
+                            changed.add(int(item["value"]))
+                        elif item.get("type") == "Array":
+                            changed.update(
+                                int(sub["value"]) for sub in item.get("value", [])
+                                if sub.get("type") == "Integer"
+                            )
+                elif method == "verify_missions_batch" and len(args) > 1 and isinstance(args[1], list):
+                    changed.update(mission_id for mission_id in args[1] if isinstance(mission_id, int))
+                elif method in MISSION_ID_METHODS and args and isinstance(args[0], int):
+                    changed.add(args[0])
+                    if method == "complete_mission" and len(args) > 2 and isinstance(args[2], bytes):
+                        proofs[args[0]] = args[2].decode("utf-8", errors="replace")
+
+        return events, changed, proofs
+
+    async def sync_once(self) -> int:
+        """
+        Apply up to max_blocks_per_sync new blocks to the store
+
+        Returns:
+            Number of blocks applied
+        """
+        tip = await self.service.aget_block_count() - 1
+        last = self.store.get_indexed_height()
+
+        if last == 0:
+            await self.backfill(tip)
+            return 0
+
+        end = min(tip, last + self.max_blocks_per_sync)
+        applied = 0
+        for start in range(last + 1, end + 1, self.batch_size):
+            indexes = list(range(start, min(end, start + self.batch_size - 1) + 1))
+            for index, block in zip(indexes, await self._fetch_blocks(indexes)):
+                events, changed, proofs = await self._scan_block(block)
+                if events:
+                    # Updates for missions the store has never seen need a full read
+                    changed.update(self.store.apply_events(events, index))
+                if changed:
+                    await self._refresh(sorted(changed), index, proofs)
+                self.store.set_indexed_height(index)
+                applied += 1
+
+        return applied
+
+    async def run(self, interval: float = 5.0):
+        """Sync forever; catch up without sleeping while far behind"""
+        while True:
+            try:
+                applied = await self.sync_once()
+            except Exception as e:
+                logger.warning("Indexer sync failed: %s", e)
+                applied = 0
+
+            if applied < self.max_blocks_per_sync:
+                await asyncio.sleep(interval)
+
+    def start(self, interval: float = 5.0):
+        """Run the indexer as a background task on the current loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def main():
+    store = MissionStore(os.getenv("MISSION_DB_PATH") or DEFAULT_DB_PATH)
+    indexer = MissionIndexer(neo_service, store)
+    neo_service.start_background_tasks()
+
+    print(f"📜 Contract: {neo_service.mission_contract}")
+    print(f"🗄️  Store: {store.path} (indexed height {store.get_indexed_height()})")
+
+    try:
+        await indexer.run(float(os.getenv("MISSION_INDEXER_INTERVAL", "5")))
+    finally:
+        await neo_service.aclose()
+        store.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if not neo_service.mission_contract:
+        print("❌ NEO_MISSION_CONTRACT not set in .env")
+        print("   Deploy the contract first (deploy_contract.py)")
+    else:
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            print("\n👋 Indexer stopped")
@@ -0,0 +1,172 @@
+"""
+JSON Stream
+Đọc dần JSON do LLM stream về: phát từng field/phần tử ngay khi hoàn chỉnh và phần chữ đang tới
+"""
+import re
+import json
+from typing import Any, List, Optional, Tuple
+
+# ("text", member name, decoded delta)   string member still arriving (objects only)
+# ("field", member name, value)          member complete (objects)
+# ("item", index, value)                 element complete (arrays)
+StreamEvent = Tuple[str, Any, Any]
+
+_CLOSERS = {"{": "}", "[": "]"}
+# A half escape, or a high surrogate whose low half has not arrived yet
+_PARTIAL_ESCAPE = re.compile(r'\\(u[0-9a-fA-F]{0,3}|u[dD][89abAB][0-9a-fA-F]{2})?$')
+
+
+def _decode_partial(raw: str) -> Tuple[str, int]:
+    """
+    Decode part of the body of an unterminated JSON string
+
+    raw must start on an escape boundary. A trailing half escape is left
+    out; the returned length is how much of raw was decoded, so the next
+    call can start from there.
+    """
+    match = _PARTIAL_ESCAPE.search(raw)
+    while match:
+        # Only a backslash preceded by an even run of backslashes starts an escape
+        prefix = raw[:match.start() + 1]
+        if (len(prefix) - len(prefix.rstrip("\\"))) % 2 == 0:
+            break
+        # Cutting half a low surrogate may expose its high half
+        raw = raw[:match.start()]
+        match = _PARTIAL_ESCAPE.search(raw)
+    return json.loads(f'"{raw}"', strict=False), len(raw)
+
+
+class StreamingJsonParser:
+    """
+    Incremental scanner for one top-level JSON object or array
+
+    feed() takes chunks as they arrive and returns the events they
+    completed. Anything before the opening bracket (prose, ``` fences) and
+    after the closing one is ignored. Members and elements are decoded with
+    json.loads once their raw text is complete, so nested values are
+    reported whole; only top-level string members of an object are also
+    reported piece by piece as "text" events.
+    """
+
+    def __init__(self, container: str = "{"):
+        if container not in _CLOSERS:
+            raise ValueError("container must be '{' or '['")
+        self.container = container
+        self.started = False
+        self.done = False
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._token_start: Optional[int] = None  # start of the current top-level key/value
+        self._token_is_key = False
+        self._key: Optional[str] = None
+        self._items = 0
+        self._text_raw = 0  # buffer offset up to which the current string member was reported
+
+    @property
+    def _is_object(self) -> bool:
+        return self.container == "{"
+
+    def _start_token(self, index: int, is_key: bool):
+        self._token_start = index
+        self._token_is_key = is_key
+        self._text_raw = index + 1
+
+    def _finish_value(self, end: int, events: List[StreamEvent]):
+        if self._token_start is None:
+            return
+        raw = self._buf[self._token_start:end].strip()
+        self._token_start = None
+        try:
+            value = json.loads(raw, strict=False)
+        except ValueError:
+            return
+        if self._is_object:
+            if self._key is not None:
+                events.append(("field", self._key, value))
+            self._key = None
+        else:
+            events.append(("item", self._items, value))
+            self._items += 1
+
+    def _text_delta(self, end: int, events: List[StreamEvent]):
+        """Report the newly arrived part of a top-level string member, decoding only that part"""
+        if not (self._is_object and self._key is not None and self._token_start is not None):
+            return
+        if self._token_is_key or self._buf[self._token_start] != '"':
+            return
+        try:
+            text, used = _decode_partial(self._buf[self._text_raw:end])
+        except ValueError:
+            return
+        self._text_raw += used
+        if text:
+            events.append(("text", self._key, text))
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        events: List[StreamEvent] = []
+        self._buf += chunk
+        buf = self._buf
+
+        for i in range(self._pos, len(buf)):
+            c = buf[i]
+            if self.done:
+                break
+            if not self.started:
+                if c == self.container:
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._token_is_key:
+                        self._key = json.loads(buf[self._token_start:i + 1], strict=False)
+                        self._token_start = None
+                    elif self._depth == 1:
+                        self._text_delta(i, events)
+                continue
+
+            if c in " \t\r\n":
+                continue
+
+            if self._depth > 1:
+                if c == '"':
+                    self._in_string = True
+                elif c in "{[":
+                    self._depth += 1
+                elif c in "}]":
+                    self._depth -= 1
+                continue
+
+            # Top level of the container
+            if c == '"':
+                self._in_string = True
+                if self._token_start is None:
+                    expecting_key = self._is_object and self._key is None
+                    self._start_token(i, is_key=expecting_key)
+            elif c == ":" and self._is_object:
+                continue
+            elif c == ",":
+                self._finish_value(i, events)
+            elif c == _CLOSERS[self.container]:
+                self._finish_value(i, events)
+                self.done = True
+            elif c in "{[":
+                self._depth += 1
+                if self._token_start is None:
+                    self._start_token(i, is_key=False)
+            elif self._token_start is None:
+                self._start_token(i, is_key=False)
+
+        self._pos = len(buf)
+        if self._in_string and self._depth == 1 and not self._token_is_key:
+            self._text_delta(len(buf), events)
+        return events
@@ -0,0 +1,627 @@
+"""
+LLM Client
+Lớp client LLM dùng chung: khởi tạo lười, gọi async, giới hạn đồng thời và timeout theo provider
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 30.0
+
+Schema = Dict[str, Any]
+
+
+class LLMError(Exception):
+    """Raised when a provider call fails"""
+
+
+class LLMTimeoutError(LLMError):
+    """Raised when a provider call (including its wait for a slot) times out"""
+
+
+class LLMNotConfiguredError(LLMError):
+    """Raised when a provider has no API key"""
+
+
+def load_llm_config() -> Dict[str, Any]:
+    """llm_providers / llm_settings sections of config.json (empty if unreadable)"""
+    try:
+        with open(CONFIG_PATH, encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = {}
+    return {
+        "providers": config.get("llm_providers", {}),
+        "settings": config.get("llm_settings", {})
+    }
+
+
+class LLMProvider:
+    """
+    Base class for one LLM provider
+
+    Subclasses implement _generate() and, if the provider can stream,
+    _stream(). generate() and stream() add the per-provider concurrency
+    limit and timeout; callers beyond max_concurrency wait for a slot, and
+    that wait counts against the timeout. A JSON Schema passed as `schema`
+    asks for JSON output in whatever form the provider supports (schema-
+    constrained, JSON mode or a prefilled opening bracket); providers
+    without one rely on the prompt.
+    """
+
+    name = "base"
+
+    def __init__(
+        self,
+        model: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT
+    ):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self._total_latency = 0.0
+        # EWMAs used by the router to rank providers
+        self.latency: Optional[float] = None  # seconds
+        self.error_rate = 0.0
+
+    @property
+    def configured(self) -> bool:
+        return True
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def record_success(self, elapsed: float):
+        self._total_latency += elapsed
+        self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+        self.error_rate *= 0.8
+
+    def record_failure(self):
+        self.error_rate = 0.8 * self.error_rate + 0.2
+
+    async def _generate(self, prompt: str, schema: Optional[Schema] = None) -> str:
+        raise NotImplementedError
+
+    async def _stream(self, prompt: str, schema: Optional[Schema] = None) -> AsyncIterator[str]:
+        # Providers without streaming answer in one chunk
+        yield await self._generate(prompt, schema)
+
+    async def _limited(self, prompt: str, schema: Optional[Schema]) -> str:
+        async with self._get_semaphore():
+            self.in_flight += 1
+            try:
+                return await self._generate(prompt, schema)
+            finally:
+                self.in_flight -= 1
+
+    async def generate(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        schema: Optional[Schema] = None
+    ) -> str:
+        """
+        Generate a completion for a prompt
+
+        Returns:
+            The response text
+
+        Raises:
+            LLMNotConfiguredError: If the provider has no API key
+            LLMTimeoutError: If no answer arrived within the timeout
+            LLMError: On any other provider failure
+        """
+        if not self.configured:
+            raise LLMNotConfiguredError(f"{self.name} API key not configured")
+
+        self.calls += 1
+        start = time.monotonic()
+        try:
+            text = await asyncio.wait_for(self._limited(prompt, schema), timeout or self.timeout)
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            self.record_failure()
+            raise LLMTimeoutError(f"{self.name} did not answer within {timeout or self.timeout}s") from e
+        except LLMError:
+            self.errors += 1
+            self.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # Lost a hedged race; says nothing about the provider's health
+            self.calls -= 1
+            raise
+        except Exception as e:
+            self.errors += 1
+            self.record_failure()
+            raise LLMError(f"{self.name} call failed: {e}") from e
+
+        self.record_success(time.monotonic() - start)
+        return text
+
+    async def stream(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        schema: Optional[Schema] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion as text chunks
+
+        The concurrency slot is held until the stream ends. The timeout
+        covers the wait for a slot plus the first chunk, then each gap
+        between chunks.
+
+        Raises:
+            LLMNotConfiguredError: If the provider has no API key
+            LLMTimeoutError: If the first or a later chunk did not arrive in time
+            LLMError: On any other provider failure
+        """
+        if not self.configured:
+            raise LLMNotConfiguredError(f"{self.name} API key not configured")
+
+        timeout = timeout or self.timeout
+        self.calls += 1
+        start = time.monotonic()
+        semaphore = self._get_semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            self.record_failure()
+            raise LLMTimeoutError(f"{self.name} had no free slot within {timeout}s") from e
+        except asyncio.CancelledError:
+            self.calls -= 1
+            raise
+
+        self.in_flight += 1
+        chunks = self._stream(prompt, schema)
+        budget = timeout - (time.monotonic() - start)
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(budget, 0.001))
+                except StopAsyncIteration:
+                    break
+                budget = timeout
+                if chunk:
+                    yield chunk
+            self.record_success(time.monotonic() - start)
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            self.record_failure()
+            raise LLMTimeoutError(f"{self.name} stream stalled for {timeout}s") from e
+        except LLMError:
+            self.errors += 1
+            self.record_failure()
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away mid-stream; says nothing about the provider's health
+            self.calls -= 1
+            raise
+        except Exception as e:
+            self.errors += 1
+            self.record_failure()
+            raise LLMError(f"{self.name} stream failed: {e}") from e
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+            await chunks.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        succeeded = self.calls - self.errors - self.timeouts
+        return {
+            "model": self.model,
+            "configured": self.configured,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_latency_ms": round(self._total_latency / succeeded * 1000, 1) if succeeded > 0 else 0.0,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 3)
+        }
+
+    async def aclose(self):
+        pass
+
+
+# JSON Schema keys Gemini's response_schema (an OpenAPI subset) understands
+GEMINI_SCHEMA_KEYS = {"type", "properties", "items", "required", "enum", "description", "format", "nullable"}
+
+
+def _gemini_schema(schema: Schema) -> Optional[Schema]:
+    """
+    Gemini-compatible copy of a JSON Schema, or None if it cannot express it
+    (references, unions, or objects without declared properties such as a
+    free-form dict field); the call then uses plain JSON mode.
+    """
+    if "$ref" in schema or "anyOf" in schema or "oneOf" in schema or "allOf" in schema:
+        return None
+    if schema.get("type") == "object" and not schema.get("properties"):
+        return None
+
+    converted = {key: value for key, value in schema.items() if key in GEMINI_SCHEMA_KEYS}
+    if "properties" in converted:
+        properties = {}
+        for name, child in converted["properties"].items():
+            child = _gemini_schema(child)
+            if child is None:
+                return None
+            properties[name] = child
+        converted["properties"] = properties
+    if "items" in converted:
+        converted["items"] = _gemini_schema(converted["items"])
+        if converted["items"] is None:
+            return None
+    return converted
+
+
+class GeminiProvider(LLMProvider):
+    """
+    Google Gemini via google-generativeai
+
+    The SDK is configured and the GenerativeModel built once, on first use.
+    Calls use generate_content_async. The REST transport (used when
+    GEMINI_API_ENDPOINT points at another server, e.g. llm_stub_server.py)
+    has no async support in the SDK, so in that case the blocking call runs
+    on a thread pool sized to max_concurrency instead.
+    """
+
+    name = "gemini"
+
+    def __init__(self, model: str, api_key: Optional[str], endpoint: Optional[str] = None, **kwargs):
+        super().__init__(model, **kwargs)
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self._model = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def _get_model(self):
+        if self._model is None:
+            import google.generativeai as genai
+
+            if self.endpoint:
+                genai.configure(
+                    api_key=self.api_key,
+                    transport="rest",
+                    client_options={"api_endpoint": self.endpoint}
+                )
+            else:
+                genai.configure(api_key=self.api_key)
+
+            generation_config = {}
+            if self.max_tokens is not None:
+                generation_config["max_output_tokens"] = self.max_tokens
+            if self.temperature is not None:
+                generation_config["temperature"] = self.temperature
+            self._model = genai.GenerativeModel(self.model, generation_config=generation_config or None)
+        return self._model
+
+    @staticmethod
+    def _generation_config(schema: Optional[Schema]) -> Optional[Dict[str, Any]]:
+        """Per-call JSON mode, schema-constrained when Gemini accepts the schema"""
+        if schema is None:
+            return None
+        config = {"response_mime_type": "application/json"}
+        gemini_schema = _gemini_schema(schema)
+        if gemini_schema is not None:
+            config["response_schema"] = gemini_schema
+        return config
+
+    async def _generate(self, prompt: str, schema: Optional[Schema] = None) -> str:
+        model = self._get_model()
+        config = self._generation_config(schema)
+        if not self.endpoint:
+            response = await model.generate_content_async(prompt, generation_config=config)
+            return response.text
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm-gemini")
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self._executor,
+            functools.partial(model.generate_content, prompt, generation_config=config)
+        )
+        return response.text
+
+    async def _stream(self, prompt: str, schema: Optional[Schema] = None) -> AsyncIterator[str]:
+        if self.endpoint:
+            # No async streaming on the REST transport: one chunk from the thread pool
+            yield await self._generate(prompt, schema)
+            return
+        response = await self._get_model().generate_content_async(
+            prompt,
+            generation_config=self._generation_config(schema),
+            stream=True
+        )
+        async for chunk in response:
+            yield chunk.text
+
+    async def aclose(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions via the async SDK client (created on first use)"""
+
+    name = "openai"
+
+    def __init__(self, model: str, api_key: Optional[str], base_url: Optional[str] = None, **kwargs):
+        super().__init__(model, **kwargs)
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def _get_client(self):
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            # Retries are the router's job (fallback chain), not the SDK's
+            self._client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return self._client
+
+    def _options(self, schema: Optional[Schema]) -> Dict[str, Any]:
+        kwargs = {}
+        if self.max_tokens is not None:
+            kwargs["max_tokens"] = self.max_tokens
+        if self.temperature is not None:
+            kwargs["temperature"] = self.temperature
+        # JSON mode only guarantees a top-level object
+        if schema is not None and schema.get("type") == "object":
+            kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    async def _generate(self, prompt: str, schema: Optional[Schema] = None) -> str:
+        response = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            **self._options(schema)
+        )
+        return response.choices[0].message.content or ""
+
+    async def _stream(self, prompt: str, schema: Optional[Schema] = None) -> AsyncIterator[str]:
+        response = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            **self._options(schema)
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class AnthropicProvider(LLMProvider):
+    """Anthropic messages via the async SDK client (created on first use)"""
+
+    name = "anthropic"
+
+    def __init__(self, model: str, api_key: Optional[str], base_url: Optional[str] = None, **kwargs):
+        super().__init__(model, **kwargs)
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def _get_client(self):
+        if self._client is None:
+            from anthropic import AsyncAnthropic
+
+            self._client = AsyncAnthropic(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return self._client
+
+    def _request(self, prompt: str, prefill: str) -> Dict[str, Any]:
+        messages = [{"role": "user", "content": prompt}]
+        if prefill:
+            # No JSON mode: start the answer with the opening bracket instead
+            messages.append({"role": "assistant", "content": prefill})
+        kwargs = {"model": self.model, "max_tokens": self.max_tokens or 1024, "messages": messages}
+        if self.temperature is not None:
+            kwargs["temperature"] = self.temperature
+        return kwargs
+
+    @staticmethod
+    def _prefill(schema: Optional[Schema]) -> str:
+        if schema is None:
+            return ""
+        return "[" if schema.get("type") == "array" else "{"
+
+    async def _generate(self, prompt: str, schema: Optional[Schema] = None) -> str:
+        prefill = self._prefill(schema)
+        response = await self._get_client().messages.create(**self._request(prompt, prefill))
+        return prefill + "".join(block.text for block in response.content if getattr(block, "type", "") == "text")
+
+    async def _stream(self, prompt: str, schema: Optional[Schema] = None) -> AsyncIterator[str]:
+        prefill = self._prefill(schema)
+        async with self._get_client().messages.stream(**self._request(prompt, prefill)) as response:
+            if prefill:
+                yield prefill
+            async for text in response.text_stream:
+                yield text
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class StubProvider(LLMProvider):
+    """
+    In-process stand-in for any provider (no network, no API key)
+
+    Answers with llm_stub_server.canned_reply after a configurable latency
+    and fails a configurable share of calls, so routing, fallback and
+    hedging can be exercised locally. Streams send the reply in
+    CHUNK_CHARS pieces chunk_ms apart, the first one after the latency.
+    """
+
+    CHUNK_CHARS = 16
+
+    def __init__(
+        self,
+        name: str,
+        model: str = "stub",
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        chunk_ms: float = 5.0,
+        **kwargs
+    ):
+        super().__init__(model, **kwargs)
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.fail_rate = error_rate
+        self.chunk_ms = chunk_ms
+        self._random = random.Random()
+
+    async def _generate(self, prompt: str, schema: Optional[Schema] = None) -> str:
+        from llm_stub_server import canned_reply
+
+        jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+        if self._random.random() < self.fail_rate:
+            raise LLMError(f"{self.name} stub: injected error")
+        return json.dumps(canned_reply(prompt, schema), ensure_ascii=False)
+
+    async def _stream(self, prompt: str, schema: Optional[Schema] = None) -> AsyncIterator[str]:
+        text = await self._generate(prompt, schema)
+        for start in range(0, len(text), self.CHUNK_CHARS):
+            if start:
+                await asyncio.sleep(self.chunk_ms / 1000)
+            yield text[start:start + self.CHUNK_CHARS]
+
+
+class LLMClients:
+    """
+    Registry of shared provider clients
+
+    Providers are created on first use from config.json (model, max_tokens,
+    temperature) and env vars (API keys, LLM_<PROVIDER>_MAX_CONCURRENCY,
+    LLM_<PROVIDER>_TIMEOUT), then reused by every request. Providers listed
+    in LLM_STUB_PROVIDERS are replaced by in-process StubProviders
+    (LLM_STUB_<PROVIDER>_LATENCY_MS / _JITTER_MS / _ERROR_RATE).
+    """
+
+    def __init__(self):
+        self._providers: Dict[str, LLMProvider] = {}
+        self._config: Optional[Dict[str, Any]] = None
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            self._config = load_llm_config()
+        return self._config
+
+    def _limits(self, name: str) -> Dict[str, Any]:
+        prefix = f"LLM_{name.upper()}_"
+        return {
+            "max_concurrency": int(os.getenv(prefix + "MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY))),
+            "timeout": float(os.getenv(prefix + "TIMEOUT", str(DEFAULT_TIMEOUT)))
+        }
+
+    def _create(self, name: str) -> LLMProvider:
+        settings = self.config["providers"].get(name, {})
+        common = {
+            "max_tokens": settings.get("max_tokens"),
+            "temperature": settings.get("temperature"),
+            **self._limits(name)
+        }
+        stubs = [stub.strip() for stub in os.getenv("LLM_STUB_PROVIDERS", "").split(",")]
+        if name in stubs:
+            prefix = f"LLM_STUB_{name.upper()}_"
+            return StubProvider(
+                name,
+                model=f"stub-{settings.get('model', name)}",
+                latency_ms=float(os.getenv(prefix + "LATENCY_MS", "0")),
+                jitter_ms=float(os.getenv(prefix + "JITTER_MS", "0")),
+                error_rate=float(os.getenv(prefix + "ERROR_RATE", "0")),
+                **common
+            )
+        if name == "gemini":
+            return GeminiProvider(
+                settings.get("model", "gemini-2.5-flash-lite"),
+                api_key=os.getenv("GEMINI_API_KEY"),
+                endpoint=os.getenv("GEMINI_API_ENDPOINT"),
+                **common
+            )
+        if name == "openai":
+            return OpenAIProvider(
+                settings.get("model", "gpt-4o-mini"),
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=os.getenv("OPENAI_BASE_URL") or None,
+                **common
+            )
+        if name == "anthropic":
+            return AnthropicProvider(
+                settings.get("model", "claude-3-5-sonnet-20241022"),
+                api_key=os.getenv("ANTHROPIC_API_KEY"),
+                base_url=os.getenv("ANTHROPIC_BASE_URL") or None,
+                **common
+            )
+        raise LLMError(f"Unknown LLM provider: {name}")
+
+    def get(self, name: str) -> LLMProvider:
+        """Shared client for a provider, created on first use"""
+        if name not in self._providers:
+            self._providers[name] = self._create(name)
+        return self._providers[name]
+
+    def register(self, provider: LLMProvider):
+        """Install a provider instance (e.g. a stand-in for tests)"""
+        self._providers[provider.name] = provider
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: provider.stats() for name, provider in self._providers.items()}
+
+    async def aclose(self):
+        for provider in self._providers.values():
+            await provider.aclose()
+
+
+# Singleton instance
+llm_clients = LLMClients()
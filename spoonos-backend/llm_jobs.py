@@ -0,0 +1,516 @@
+"""
+LLM Jobs
+Hàng đợi job xác minh AI: trả job ID ngay, worker pool xử lý theo độ ưu tiên và giới hạn tốc độ,
+client hỏi trạng thái hoặc nhận webhook khi xong
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import itertools
+import ipaddress
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_JOB_PREFIX = "missionstake:job:"
+REDIS_QUEUE_KEY = "missionstake:jobs:queue"
+REDIS_LEASE_PREFIX = "missionstake:joblease:"
+
+MAX_PRIORITY = 9
+CALLBACK_ATTEMPTS = 3
+# A running job whose worker stopped renewing its lease for this long is queued again
+JOB_LEASE_SECONDS = 60
+# Pause after a backend error before a worker takes the next job
+WORKER_BACKOFF_SECONDS = 1.0
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many jobs are waiting to be processed"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def public_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job record as returned to clients (without the request payload)"""
+    return {name: value for name, value in job.items() if name != "payload"}
+
+
+async def check_callback_url(url: str, allowed_hosts: FrozenSet[str] = frozenset()):
+    """
+    Refuse callback URLs that would make the server call its own network
+
+    Only http(s) is accepted. With allowed_hosts set, the host must be one of
+    them; otherwise every address it resolves to must be public (no private,
+    loopback, link-local, shared or reserved ranges, which also covers
+    cloud metadata endpoints).
+
+    Raises:
+        ValueError: If the URL is not acceptable
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callbackUrl must be an http(s) URL")
+    host = parts.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise ValueError(f"callbackUrl host {host} is not allowed")
+        return
+
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (ValueError, socket.gaierror):
+        raise ValueError(f"callbackUrl host {host} does not resolve")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ValueError("callbackUrl must not point to a private, loopback or link-local address")
+
+
+class MemoryJobBackend:
+    """
+    In-process job store and priority queue
+
+    Finished jobs are kept for ttl seconds so clients can still poll them.
+    """
+
+    name = "memory"
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+
+    def _get_queue(self) -> asyncio.PriorityQueue:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        return self._queue
+
+    def _expire(self):
+        now = time.time()
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if now - finished_at < self.ttl:
+                break
+            self._finished.popitem(last=False)
+            self._jobs.pop(job_id, None)
+
+    async def put(self, job: Dict[str, Any]):
+        self._expire()
+        self._jobs[job["id"]] = job
+        # Higher priority first, FIFO within a priority
+        self._get_queue().put_nowait((-job["priority"], next(self._seq), job["id"]))
+
+    async def take(self, timeout: float) -> Optional[str]:
+        try:
+            _, _, job_id = await asyncio.wait_for(self._get_queue().get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return job_id
+
+    async def save(self, job: Dict[str, Any]):
+        self._jobs[job["id"]] = job
+        if job["status"] in ("done", "failed"):
+            self._finished[job["id"]] = time.time()
+
+    async def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def queued(self) -> int:
+        return self._get_queue().qsize()
+
+    async def lease(self, job_id: str, seconds: float):
+        pass
+
+    async def release(self, job_id: str):
+        pass
+
+    async def requeue_orphans(self) -> int:
+        # Jobs live and die with this process, so none can be left running
+        return 0
+
+    async def aclose(self):
+        pass
+
+
+class RedisJobBackend:
+    """
+    Job store and priority queue shared by several API workers
+
+    Jobs are JSON strings expiring after ttl seconds; the queue is a sorted
+    set scored by priority then submission time, popped with BZPOPMIN.
+    Running jobs hold a lease key their worker keeps renewing, so jobs of a
+    process that stopped mid-run can be told apart and queued again.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url, decode_responses=True, socket_connect_timeout=2)
+        self.ttl = ttl
+
+    async def put(self, job: Dict[str, Any]):
+        await self.save(job)
+        await self._enqueue(job)
+
+    async def _enqueue(self, job: Dict[str, Any]):
+        score = (MAX_PRIORITY - job["priority"]) * 1e13 + job["createdAt"] * 1000
+        await self._client.zadd(REDIS_QUEUE_KEY, {job["id"]: score})
+
+    async def take(self, timeout: float) -> Optional[str]:
+        popped = await self._client.bzpopmin(REDIS_QUEUE_KEY, timeout=max(1, int(timeout)))
+        return popped[1] if popped else None
+
+    async def save(self, job: Dict[str, Any]):
+        await self._client.set(REDIS_JOB_PREFIX + job["id"], json.dumps(job, ensure_ascii=False), px=max(1, int(self.ttl * 1000)))
+
+    async def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self._client.get(REDIS_JOB_PREFIX + job_id)
+        return json.loads(raw) if raw is not None else None
+
+    async def queued(self) -> int:
+        return await self._client.zcard(REDIS_QUEUE_KEY)
+
+    async def lease(self, job_id: str, seconds: float):
+        await self._client.set(REDIS_LEASE_PREFIX + job_id, "1", ex=max(1, int(seconds)))
+
+    async def release(self, job_id: str):
+        await self._client.delete(REDIS_LEASE_PREFIX + job_id)
+
+    async def requeue_orphans(self) -> int:
+        """Queue again the running jobs whose lease expired"""
+        requeued = 0
+        async for key in self._client.scan_iter(match=REDIS_JOB_PREFIX + "*", count=500):
+            job_id = key[len(REDIS_JOB_PREFIX):]
+            job = await self.load(job_id)
+            if job is None or job["status"] != "running":
+                continue
+            if await self._client.exists(REDIS_LEASE_PREFIX + job_id):
+                continue
+            job["status"] = "queued"
+            job["startedAt"] = None
+            await self.put(job)
+            requeued += 1
+        return requeued
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class JobQueue:
+    """
+    Background processing for slow LLM requests
+
+    submit() stores a job and returns at once; a pool of worker tasks takes
+    jobs highest priority first, runs the handler registered for the job's
+    kind and records its result or error. Workers start no more than `rate`
+    jobs per second (0 = unlimited), so a burst of submissions queues up
+    instead of hammering the providers. When a job has a callback URL its
+    final record is POSTed there (retried with backoff); the URL is checked
+    with check_callback_url on submit and again before delivery. Once
+    max_queued jobs are waiting, submit() fails fast with JobQueueFullError.
+    Running jobs abandoned by a stopped process are queued again on start()
+    and every JOB_LEASE_SECONDS after.
+    """
+
+    def __init__(
+        self,
+        backend,
+        workers: int = 4,
+        rate: float = 0.0,
+        max_queued: int = 1000,
+        retry_after: int = 5,
+        callback_timeout: float = 5.0,
+        callback_hosts: FrozenSet[str] = frozenset()
+    ):
+        self.backend = backend
+        self.workers = workers
+        self.rate = rate
+        self.max_queued = max_queued
+        self.retry_after = retry_after
+        self.callback_timeout = callback_timeout
+        self.callback_hosts = callback_hosts
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        self._callbacks: set = set()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._next_start = 0.0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.requeued = 0
+
+    def register(self, kind: str, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    async def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        priority: int = 0,
+        callback_url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a job
+
+        Returns:
+            The job record (without payload), status "queued"
+
+        Raises:
+            ValueError: Unknown kind, priority outside 0..MAX_PRIORITY or a
+                refused callback URL
+            JobQueueFullError: If max_queued jobs are already waiting
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if not 0 <= priority <= MAX_PRIORITY:
+            raise ValueError(f"priority must be between 0 and {MAX_PRIORITY}")
+        if callback_url:
+            await check_callback_url(callback_url, self.callback_hosts)
+        if await self.backend.queued() >= self.max_queued:
+            self.rejected += 1
+            raise JobQueueFullError(self.retry_after)
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "priority": priority,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "callbackUrl": callback_url,
+            "callback": None,
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None
+        }
+        await self.backend.put(job)
+        self.submitted += 1
+        return public_view(job)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await self.backend.load(job_id)
+        return public_view(job) if job is not None else None
+
+    async def _throttle(self):
+        """Space job starts 1/rate seconds apart across all workers"""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + 1 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                await self.backend.lease(job_id, JOB_LEASE_SECONDS)
+            except Exception as e:
+                logger.warning("Lease renewal for job %s failed: %s", job_id, e)
+
+    async def _process(self, job: Dict[str, Any]):
+        # Lease first: a job saved as running always has one until its worker stops
+        await self.backend.lease(job["id"], JOB_LEASE_SECONDS)
+        job["status"] = "running"
+        job["startedAt"] = time.time()
+        await self.backend.save(job)
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+
+        self.running += 1
+        try:
+            job["result"] = await self._handlers[job["kind"]](job["payload"])
+            job["status"] = "done"
+            self.completed += 1
+        except Exception as e:
+            # HTTPException from the reused endpoint handlers carries its message in .detail
+            job["error"] = str(getattr(e, "detail", None) or e)
+            job["status"] = "failed"
+            self.failed += 1
+        finally:
+            self.running -= 1
+            heartbeat.cancel()
+
+        job["finishedAt"] = time.time()
+        await self.backend.save(job)
+        await self.backend.release(job["id"])
+
+        if job["callbackUrl"]:
+            task = asyncio.create_task(self._deliver(job))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    async def _deliver(self, job: Dict[str, Any]):
+        """POST the finished job to its callback URL, retrying with backoff"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=self.callback_timeout)
+
+        outcome: Dict[str, Any] = {"delivered": False, "attempts": 0, "statusCode": None}
+        try:
+            # Again at delivery: the host may resolve differently than at submit
+            await check_callback_url(job["callbackUrl"], self.callback_hosts)
+        except ValueError as e:
+            outcome["error"] = str(e)
+            job["callback"] = outcome
+            await self.backend.save(job)
+            return
+
+        for attempt in range(CALLBACK_ATTEMPTS):
+            outcome["attempts"] = attempt + 1
+            try:
+                response = await self._http.post(job["callbackUrl"], json=public_view(job))
+                outcome["statusCode"] = response.status_code
+                if response.status_code < 500:
+                    outcome["delivered"] = response.is_success
+                    break
+            except httpx.HTTPError as e:
+                logger.warning("Callback for job %s failed: %s", job["id"], e)
+            if attempt + 1 < CALLBACK_ATTEMPTS:
+                await asyncio.sleep(2 ** attempt)
+
+        job["callback"] = outcome
+        await self.backend.save(job)
+
+    async def _worker(self):
+        while True:
+            try:
+                job_id = await self.backend.take(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Job queue read failed: %s", e)
+                await asyncio.sleep(WORKER_BACKOFF_SECONDS)
+                continue
+            if job_id is None:
+                continue
+
+            job = None
+            try:
+                job = await self.backend.load(job_id)
+                if job is None or job["status"] != "queued":
+                    continue
+                await self._throttle()
+                await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Worker failed on job %s: %s", job_id, e)
+                await self._abandon(job, e)
+                await asyncio.sleep(WORKER_BACKOFF_SECONDS)
+
+    async def _abandon(self, job: Optional[Dict[str, Any]], error: Exception):
+        """Mark failed a job the worker could not finish, so pollers stop waiting on it"""
+        if job is None or job["status"] in ("done", "failed"):
+            return
+        job["error"] = f"Job could not be processed: {error}"
+        job["status"] = "failed"
+        job["finishedAt"] = time.time()
+        self.failed += 1
+        try:
+            await self.backend.save(job)
+            await self.backend.release(job["id"])
+        except Exception as e:
+            # A running job is queued again by the sweeper once its lease runs out
+            logger.warning("Could not mark job %s failed: %s", job["id"], e)
+
+    async def _sweep(self):
+        """Queue again jobs left running by stopped processes, now and every lease period"""
+        while True:
+            try:
+                self.requeued += await self.backend.requeue_orphans()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Requeueing orphaned jobs failed: %s", e)
+            await asyncio.sleep(JOB_LEASE_SECONDS)
+
+    def start(self):
+        """Start the worker pool on the current loop"""
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self):
+        tasks = self._tasks + list(self._callbacks) + ([self._sweeper] if self._sweeper else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._sweeper = None
+
+    async def stats(self) -> Dict[str, Any]:
+        try:
+            queued = await self.backend.queued()
+        except Exception:
+            queued = None
+        return {
+            "backend": self.backend.name,
+            "workers": self.workers,
+            "rate": self.rate,
+            "queued": queued,
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "requeued": self.requeued
+        }
+
+    async def aclose(self):
+        await self.stop()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        await self.backend.aclose()
+
+
+def create_job_queue() -> JobQueue:
+    """
+    Build the queue from env (LLM_JOBS_WORKERS, LLM_JOBS_RATE,
+    LLM_JOBS_MAX_QUEUED, LLM_JOBS_TTL, LLM_JOBS_REDIS_URL, LLM_JOBS_CALLBACK_HOSTS)
+    """
+    ttl = float(os.getenv("LLM_JOBS_TTL", "3600"))
+    redis_url = os.getenv("LLM_JOBS_REDIS_URL", "")
+    backend = RedisJobBackend(redis_url, ttl) if redis_url else MemoryJobBackend(ttl)
+    return JobQueue(
+        backend,
+        workers=int(os.getenv("LLM_JOBS_WORKERS", "4")),
+        rate=float(os.getenv("LLM_JOBS_RATE", "0")),
+        max_queued=int(os.getenv("LLM_JOBS_MAX_QUEUED", "1000")),
+        callback_hosts=frozenset(
+            host.strip().lower() for host in os.getenv("LLM_JOBS_CALLBACK_HOSTS", "").split(",") if host.strip()
+        )
+    )
+
+
+# Singleton instance
+llm_jobs = create_job_queue()
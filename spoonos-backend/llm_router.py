@@ -0,0 +1,214 @@
+"""
+LLM Router
+Điều phối nhiều provider theo fallback_chain, theo dõi độ trễ/lỗi và gửi request dự phòng (hedging)
+"""
+import os
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from llm_client import LLMClients, LLMError, LLMNotConfiguredError, LLMProvider, Schema, llm_clients
+
+# A provider whose recent error rate is above this is tried after the healthy ones
+UNHEALTHY_ERROR_RATE = 0.5
+
+
+@dataclass
+class RoutedResponse:
+    text: str
+    provider: str
+    model: str
+    hedged: bool
+
+
+class LLMRouter:
+    """
+    Route prompts across the providers of llm_settings.fallback_chain
+
+    Providers are tried in chain order (default_provider first), skipping
+    those without an API key and moving providers with a high recent error
+    rate to the back. A failure falls through to the next provider at once.
+    If the current provider has not answered within hedge_after seconds, the
+    next one is started as well and the first answer wins; the other calls
+    are cancelled. hedge_after <= 0 disables hedging (plain fallback).
+    """
+
+    def __init__(self, clients: LLMClients, chain: List[str], hedge_after: float = 3.0):
+        self.clients = clients
+        self.chain = chain
+        self.hedge_after = hedge_after
+        self.requests = 0
+        self.hedges = 0
+        self.fallbacks = 0
+        self.failures = 0
+        self.wins: Dict[str, int] = {}
+
+    def _configured(self) -> List[LLMProvider]:
+        """Providers with an API key, in chain order"""
+        configured = []
+        for name in self.chain:
+            try:
+                provider = self.clients.get(name)
+            except LLMError:
+                continue
+            if provider.configured:
+                configured.append(provider)
+        return configured
+
+    def providers(self) -> List[LLMProvider]:
+        """Configured providers in the order a request should try them"""
+        # Stable sort keeps chain order among equally healthy providers
+        return sorted(self._configured(), key=lambda provider: provider.error_rate > UNHEALTHY_ERROR_RATE)
+
+    @property
+    def configured(self) -> bool:
+        return bool(self._configured())
+
+    @property
+    def model_id(self) -> str:
+        """
+        Identifies the chain's models, e.g. for cache keys
+
+        Built from the configured chain order, not the health-sorted try
+        order, so it does not change when a provider's error rate does.
+        """
+        return "|".join(provider.model for provider in self._configured())
+
+    async def generate(self, prompt: str, schema: Optional[Schema] = None) -> RoutedResponse:
+        """
+        Get one answer for a prompt from the fastest healthy provider
+
+        schema (JSON Schema) asks every provider tried for JSON output
+
+        Raises:
+            LLMNotConfiguredError: If no provider in the chain has an API key
+            LLMError: If every provider failed (the last error is re-raised)
+        """
+        candidates = self.providers()
+        if not candidates:
+            raise LLMNotConfiguredError("No LLM provider configured")
+
+        self.requests += 1
+        pending: Dict[asyncio.Task, LLMProvider] = {}
+        next_index = 0
+        last_error: Optional[Exception] = None
+        hedged = False
+
+        def launch():
+            nonlocal next_index
+            provider = candidates[next_index]
+            next_index += 1
+            pending[asyncio.ensure_future(provider.generate(prompt, schema=schema))] = provider
+
+        launch()
+        try:
+            while pending:
+                can_hedge = self.hedge_after > 0 and next_index < len(candidates)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_after if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Current provider is slow: race the next one against it
+                    self.hedges += 1
+                    hedged = True
+                    launch()
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        self.wins[provider.name] = self.wins.get(provider.name, 0) + 1
+                        return RoutedResponse(task.result(), provider.name, provider.model, hedged)
+                    last_error = task.exception()
+
+                if not pending and next_index < len(candidates):
+                    self.fallbacks += 1
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.failures += 1
+        raise last_error or LLMError("All LLM providers failed")
+
+    async def stream(self, prompt: str, schema: Optional[Schema] = None) -> AsyncIterator[str]:
+        """
+        Stream one answer as text chunks
+
+        Providers are tried in the same order as generate() until one
+        produces its first chunk; the stream is then committed to that
+        provider, so a failure after the first chunk is raised to the caller.
+        Streams are not hedged.
+
+        Raises:
+            LLMNotConfiguredError: If no provider in the chain has an API key
+            LLMError: If every provider failed before its first chunk
+        """
+        candidates = self.providers()
+        if not candidates:
+            raise LLMNotConfiguredError("No LLM provider configured")
+
+        self.requests += 1
+        last_error: Optional[Exception] = None
+        for position, provider in enumerate(candidates):
+            chunks = provider.stream(prompt, schema=schema)
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                first = ""
+            except LLMError as e:
+                last_error = e
+                if position + 1 < len(candidates):
+                    self.fallbacks += 1
+                continue
+
+            self.wins[provider.name] = self.wins.get(provider.name, 0) + 1
+            try:
+                if first:
+                    yield first
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await chunks.aclose()
+            return
+
+        self.failures += 1
+        raise last_error or LLMError("All LLM providers failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chain": self.chain,
+            "hedge_after": self.hedge_after,
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "fallbacks": self.fallbacks,
+            "failures": self.failures,
+            "wins": dict(self.wins),
+            "providers": self.clients.stats()
+        }
+
+
+def create_llm_router(clients: LLMClients = llm_clients) -> LLMRouter:
+    """
+    Build the router from config.json's llm_settings (default_provider,
+    fallback_chain) and env (LLM_FALLBACK_CHAIN overrides the chain,
+    LLM_HEDGE_AFTER sets the hedging budget in seconds)
+    """
+    settings = clients.config["settings"]
+    env_chain = os.getenv("LLM_FALLBACK_CHAIN", "")
+    if env_chain.strip():
+        chain = [name.strip() for name in env_chain.split(",") if name.strip()]
+    else:
+        chain = list(settings.get("fallback_chain") or ["gemini"])
+        default = settings.get("default_provider")
+        if default:
+            chain = [default] + [name for name in chain if name != default]
+
+    return LLMRouter(clients, chain, float(os.getenv("LLM_HEDGE_AFTER", "3")))
+
+
+# Singleton instance
+llm_router = create_llm_router()
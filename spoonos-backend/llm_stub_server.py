@@ -0,0 +1,200 @@
+"""
+LLM Stand-in Server
+Giả lập Gemini REST API (generateContent) cho test tải offline
+
+Chạy riêng:  python llm_stub_server.py
+Rồi trỏ backend vào:  GEMINI_API_ENDPOINT=http://127.0.0.1:8090
+                      GEMINI_API_KEY=<bất kỳ>
+
+Cấu hình qua env:
+    LLM_STUB_PORT          Port lắng nghe (mặc định 8090)
+    LLM_STUB_LATENCY_MS    Độ trễ trung bình mỗi request
+    LLM_STUB_JITTER_MS     Độ lệch ngẫu nhiên (+/-) quanh độ trễ
+    LLM_STUB_ERROR_RATE    Tỉ lệ request trả HTTP 503 (0-1)
+"""
+import os
+import re
+import json
+import random
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_PORT = 8090
+
+# Every backend prompt ends with a format block introduced by this line
+FORMAT_MARKER = "Trả về JSON"
+
+
+def _schema_fields(schema: Optional[Dict[str, Any]]) -> Set[str]:
+    """Top-level field names of a response schema (of its items, for arrays)"""
+    if not isinstance(schema, dict):
+        return set()
+    if isinstance(schema.get("items"), dict):
+        schema = schema["items"]
+    return set(schema.get("properties") or {})
+
+
+def _format_fields(prompt: str) -> Set[str]:
+    """Field names quoted in the prompt's format block (after the last FORMAT_MARKER)"""
+    start = prompt.rfind(FORMAT_MARKER)
+    if start < 0:
+        return set()
+    return set(re.findall(r'"(\w+)"\s*:', prompt[start:]))
+
+
+def canned_reply(prompt: str, schema: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Deterministic JSON answer shaped like the one the request asks for
+
+    The shape follows the response schema's fields, or without one the
+    field names of the prompt's format block, so evidence text that happens
+    to mention a field name cannot change it.
+    """
+    fields = _schema_fields(schema) or _format_fields(prompt)
+    if "reasoning" in fields:
+        return [
+            {
+                "id": f"mission_{i}",
+                "title": f"Đi bộ {20 + 10 * i} phút mỗi ngày",
+                "description": "Duy trì thói quen vận động nhẹ mỗi ngày.",
+                "category": "sức khỏe",
+                "difficulty": ["easy", "medium", "hard"][i % 3],
+                "estimatedTime": 20 + 10 * i,
+                "rewards": {"xp": 100 + 50 * i, "coins": 300 + 100 * i},
+                "tags": ["AI-generated", "personalized"],
+                "reasoning": "Phù hợp với sở thích vận động của bạn."
+            }
+            for i in range(1, 4)
+        ]
+    if "verdicts" in fields:
+        # Batch prompt: one verdict per "[index] ..." evidence line
+        return {
+            "verdicts": [
+                {"index": int(index), "result": "approve", "confidence": 88, "reason": "Bằng chứng khớp với mô tả nhiệm vụ."}
+                for index in re.findall(r"^\[(\d+)\]", prompt, re.MULTILINE)
+            ]
+        }
+    if "overallScore" in fields:
+        return {
+            "overallScore": 82,
+            "aiAssessment": "Bằng chứng đều đặn và phù hợp với mục tiêu nhiệm vụ.",
+            "passedRequirements": True
+        }
+    if "confidence" in fields:
+        return {
+            "result": "approve",
+            "confidence": 88,
+            "reason": "Bằng chứng khớp với mô tả nhiệm vụ."
+        }
+    return {"text": "ok"}
+
+
+class LlmStub:
+    """Request counter plus latency and error injection"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.injected_errors = 0
+        self.prompt_chars = 0
+
+    async def delay(self):
+        if self.latency_ms <= 0 and self.jitter_ms <= 0:
+            return
+        jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+    def should_fail(self) -> bool:
+        if self.error_rate > 0 and self._random.random() < self.error_rate:
+            self.injected_errors += 1
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "injected_errors": self.injected_errors,
+            "prompt_chars": self.prompt_chars
+        }
+
+
+def create_app(stub: LlmStub) -> FastAPI:
+    """ASGI app serving POST /v1beta/models/{model}:generateContent"""
+    app = FastAPI(title="LLM Stand-in", docs_url=None, redoc_url=None)
+
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def generate_content(model: str, request: Request):
+        stub.requests += 1
+        body = await request.json()
+        prompt = "".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        stub.prompt_chars += len(prompt)
+        config = body.get("generationConfig") or body.get("generation_config") or {}
+        schema = config.get("responseSchema") or config.get("response_schema")
+
+        await stub.delay()
+        if stub.should_fail():
+            return JSONResponse(
+                {"error": {"code": 503, "message": "Injected error", "status": "UNAVAILABLE"}},
+                status_code=503
+            )
+
+        text = json.dumps(canned_reply(prompt, schema), ensure_ascii=False)
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0
+            }],
+            "usageMetadata": {
+                # Rough 4 chars/token estimate, enough for budget accounting in tests
+                "promptTokenCount": len(prompt) // 4,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": (len(prompt) + len(text)) // 4
+            },
+            "modelVersion": model
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return stub.stats()
+
+    return app
+
+
+def stub_from_env() -> LlmStub:
+    return LlmStub(
+        latency_ms=float(os.getenv("LLM_STUB_LATENCY_MS", "0")),
+        jitter_ms=float(os.getenv("LLM_STUB_JITTER_MS", "0")),
+        error_rate=float(os.getenv("LLM_STUB_ERROR_RATE", "0"))
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    stub = stub_from_env()
+    port = int(os.getenv("LLM_STUB_PORT", DEFAULT_PORT))
+
+    print(f"🧪 LLM stand-in on http://127.0.0.1:{port}")
+    print(f"⏱️  Latency: {stub.latency_ms}±{stub.jitter_ms} ms, error rate {stub.error_rate}")
+
+    uvicorn.run(create_app(stub), host="127.0.0.1", port=port, log_level="warning")
@@ -2,28 +2,98 @@
 MissionStake SpoonOS Backend
 Simple FastAPI server với AI agents và NEO blockchain
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, field_validator
+from typing import Any, Dict, List, Literal, Optional
+from contextlib import asynccontextmanager
 import os
+import json
+import asyncio
 from dotenv import load_dotenv
-from neo_service import neo_service
-import google.generativeai as genai
+from neo_service import (
+    MAX_BATCH_SIZE,
+    MAX_PAGE_SIZE,
+    STATUS_NAMES,
+    address_to_script_hash,
+    neo_service,
+    to_script_hash
+)
+from chain_executor import BlockchainExecutor, ChainSaturatedError
+from mission_store import DEFAULT_DB_PATH, MissionStore
+from indexer import MissionIndexer
+from llm_client import LLMTimeoutError, llm_clients
+from llm_router import llm_router
+from verdict_cache import verdict_cache, verdict_key
+from evidence_batch import (
+    MAX_EVIDENCES_PER_REQUEST,
+    BATCH_VERDICTS_SCHEMA,
+    build_batch_prompt,
+    estimate_tokens,
+    format_evidence,
+    pack_evidences,
+    parse_batch_verdicts
+)
+from llm_jobs import JobQueueFullError, llm_jobs
+from mission_prescore import mission_prescorer
+from mission_evaluation import EvaluationPlan, evaluation_key, mission_evaluations
+from structured_output import (
+    StructuredOutputError,
+    StructuredStream,
+    array_schema,
+    generate_structured,
+    json_schema,
+    validate_model
+)
+from neo_rpc import SingleFlight
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini AI
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+# Dedicated, bounded executor for blockchain calls
+chain_executor = BlockchainExecutor(
+    max_workers=int(os.getenv("NEO_EXECUTOR_WORKERS", "8")),
+    max_queue=int(os.getenv("NEO_EXECUTOR_QUEUE", "64")),
+    retry_after=int(os.getenv("NEO_EXECUTOR_RETRY_AFTER", "2"))
+)
+
+# Local projection of MissionContract state; list/detail reads are served
+# from it once the indexer (in-process or `python indexer.py`) has synced
+mission_store = MissionStore(os.getenv("MISSION_DB_PATH") or DEFAULT_DB_PATH)
+mission_indexer = MissionIndexer(neo_service, mission_store)
+INDEXER_ENABLED = os.getenv("MISSION_INDEXER_ENABLED", "false").lower() == "true"
+# Reads go to the chain while the projection trails the tip by more blocks than this
+INDEX_MAX_LAG = int(os.getenv("MISSION_INDEX_MAX_LAG", "2"))
+
+# Concurrent retries of the same evidence share one LLM call
+verdict_flight = SingleFlight()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Probe NEO seed nodes in the background so calls go to the fastest healthy one
+    neo_service.start_background_tasks()
+    if INDEXER_ENABLED and neo_service.mission_contract:
+        mission_indexer.start(float(os.getenv("MISSION_INDEXER_INTERVAL", "5")))
+    # Workers for queued LLM verification jobs
+    llm_jobs.start()
+    yield
+    await llm_jobs.aclose()
+    await mission_indexer.stop()
+    # Close pooled NEO RPC connections on shutdown
+    await neo_service.aclose()
+    chain_executor.shutdown()
+    mission_store.close()
+    await llm_clients.aclose()
+    await verdict_cache.aclose()
+    await mission_evaluations.aclose()
 
 # Initialize FastAPI
 app = FastAPI(
     title="MissionStake AI API",
     description="SpoonOS-powered AI backend for MissionStake",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS
@@ -74,21 +144,78 @@ class EvidenceVerificationRequest(BaseModel):
     missionTitle: str
     missionDescription: str
 
+def _clamp_score(value: Any) -> int:
+    try:
+        return min(100, max(0, int(float(value))))
+    except (TypeError, ValueError):
+        return 0
+
 class EvidenceVerificationResponse(BaseModel):
-    result: str  # 'approve' or 'reject'
+    result: Literal["approve", "reject"]
     confidence: int
     reason: str
+    
+    @field_validator("result", mode="before")
+    @classmethod
+    def _normalize_result(cls, value):
+        # Anything but a clear approval counts as a rejection
+        return "approve" if str(value).strip().lower() == "approve" else "reject"
+    
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def _clamp_confidence(cls, value):
+        return _clamp_score(value)
+
+# Used for fields the model left out of its answer
+EVIDENCE_VERDICT_DEFAULTS = {"result": "reject", "confidence": 0, "reason": "Không có lý do cụ thể"}
+
+class EvidenceItem(BaseModel):
+    evidenceType: str
+    description: str
+    date: str
+
+class BatchEvidenceVerificationRequest(BaseModel):
+    missionTitle: str
+    missionDescription: str
+    evidences: List[EvidenceItem]
+
+class BatchEvidenceError(BaseModel):
+    index: int
+    status: int  # what the single endpoint would have answered: 504 or 500
+    detail: str
+
+class BatchEvidenceVerificationResponse(BaseModel):
+    results: List[Optional[EvidenceVerificationResponse]]  # same order as request.evidences; None where errors has the index
+    cached: int
+    llmCalls: int
+    errors: List[BatchEvidenceError] = []
 
 class MissionEvaluationRequest(BaseModel):
     missionTitle: str
     missionDescription: str
     evidences: List[dict]
     totalDays: int
+    missionId: Optional[str] = None  # keys the incremental evaluation state; evaluated in full without one
 
 class MissionEvaluationResponse(BaseModel):
     overallScore: int
     aiAssessment: str
     passedRequirements: bool
+    
+    @field_validator("overallScore", mode="before")
+    @classmethod
+    def _clamp_overall_score(cls, value):
+        return _clamp_score(value)
+
+MISSION_EVALUATION_DEFAULTS = {"overallScore": 0, "aiAssessment": "Không có nhận xét", "passedRequirements": False}
+
+class EvidenceVerificationJobRequest(EvidenceVerificationRequest):
+    priority: int = 0  # 0-9, higher runs first
+    callbackUrl: Optional[str] = None
+
+class MissionEvaluationJobRequest(MissionEvaluationRequest):
+    priority: int = 0
+    callbackUrl: Optional[str] = None
 
 # ========== Health Check ==========
 @app.get("/")
@@ -137,40 +264,155 @@ async def suggest_tasks(request: TaskSuggestionRequest):
 async def generate_personalized_missions(request: PersonalizedMissionRequest):
     """
     Tạo nhiệm vụ cá nhân hóa bằng AI
+    
+    Cùng prompt và cách parse với /api/ai/generate-missions/stream; nhiệm vụ sai format bị bỏ qua
+    Khi chưa cấu hình AI provider thì trả về các nhiệm vụ mẫu
     """
+    if not llm_router.configured:
+        return _placeholder_missions()
+    
     try:
-        # TODO: Implement SpoonOS PersonalizedMissionAgent
-        missions = [
-            {
-                "id": f"mission_{i}",
-                "title": f"Nhiệm vụ cá nhân hóa {i}",
-                "description": "Nhiệm vụ được tạo riêng cho bạn dựa trên sở thích",
-                "category": "học tập",
-                "difficulty": "medium",
-                "estimatedTime": 45,
-                "rewards": {"xp": 150, "coins": 500},
-                "tags": ["AI-generated", "personalized"],
-                "reasoning": "Nhiệm vụ này phù hợp với bạn vì..."
-            }
-            for i in range(3)
-        ]
-        return missions
+        response = await llm_router.generate(_mission_generation_prompt(request), schema=array_schema(Mission))
+        stream = StructuredStream(Mission, container="[")
+        stream.feed(response.text)
+        return stream.result()
+    except LLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=f"Error calling AI provider: {str(e)}")
+
+def _placeholder_missions() -> List[dict]:
+    return [
+        {
+            "id": f"mission_{i}",
+            "title": f"Nhiệm vụ cá nhân hóa {i}",
+            "description": "Nhiệm vụ được tạo riêng cho bạn dựa trên sở thích",
+            "category": "học tập",
+            "difficulty": "medium",
+            "estimatedTime": 45,
+            "rewards": {"xp": 150, "coins": 500},
+            "tags": ["AI-generated", "personalized"],
+            "reasoning": "Nhiệm vụ này phù hợp với bạn vì..."
+        }
+        for i in range(3)
+    ]
+
+def _mission_generation_prompt(request: PersonalizedMissionRequest) -> str:
+    return f"""Bạn là một AI thiết kế nhiệm vụ tự hoàn thiện cá nhân hóa.
+
+NGƯỜI DÙNG: {request.userId}
+SỞ THÍCH: {json.dumps(request.preferences, ensure_ascii=False)}
+
+YÊU CẦU:
+1. Tạo 3 nhiệm vụ phù hợp với sở thích của người dùng
+2. Mỗi nhiệm vụ có độ khó easy, medium hoặc hard và thời gian ước tính (phút)
+3. Giải thích ngắn gọn vì sao nhiệm vụ phù hợp (reasoning)
+
+Trả về JSON là một mảng, mỗi phần tử theo format:
+[
+  {{
+    "id": "mission_1",
+    "title": "tiêu đề",
+    "description": "mô tả 1-2 câu",
+    "category": "danh mục",
+    "difficulty": "easy" hoặc "medium" hoặc "hard",
+    "estimatedTime": số phút,
+    "rewards": {{"xp": số, "coins": số}},
+    "tags": ["tag"],
+    "reasoning": "vì sao phù hợp"
+  }}
+]"""
+
+@app.post("/api/ai/generate-missions/stream")
+async def generate_personalized_missions_stream(request: PersonalizedMissionRequest):
+    """
+    Tạo nhiệm vụ cá nhân hóa bằng AI, trả về dạng Server-Sent Events
+    
+    Events: `mission` (từng nhiệm vụ ngay khi AI viết xong), `done` {"count"}, `error` {"status", "detail"}
+    Khi chưa cấu hình AI provider thì stream các nhiệm vụ mẫu như /api/ai/generate-missions
+    """
+    if not llm_router.configured:
+        async def placeholders():
+            for mission in _placeholder_missions():
+                yield _sse("mission", mission)
+            yield _sse("done", {"count": 3})
+        return _event_stream(placeholders())
+    
+    prompt = _mission_generation_prompt(request)
+    
+    async def events():
+        # Malformed missions are dropped, the rest keep streaming
+        stream = StructuredStream(Mission, container="[")
+        try:
+            async for chunk in llm_router.stream(prompt, schema=array_schema(Mission)):
+                for kind, _, mission in stream.feed(chunk):
+                    if kind == "item":
+                        yield _sse("mission", mission.model_dump())
+            missions = stream.items
+            if not stream.parser.done:
+                # Unterminated answer: salvage whatever the bounded fallback finds
+                try:
+                    missions = stream.result()
+                except StructuredOutputError:
+                    pass  # Nothing recoverable: the missions already sent are the answer
+                for mission in missions[len(stream.items):]:
+                    yield _sse("mission", mission.model_dump())
+            yield _sse("done", {"count": len(missions)})
+        except LLMTimeoutError as e:
+            yield _sse("error", {"status": 504, "detail": str(e)})
+        except Exception as e:
+            yield _sse("error", {"status": 500, "detail": f"Error calling AI provider: {str(e)}"})
+    
+    return _event_stream(events())
 
 # ========== Gemini AI Endpoints ==========
+@app.get("/api/llm/status")
+async def llm_status():
+    """
+    Trạng thái các LLM provider (độ trễ, tỉ lệ lỗi, hedging) và cache verdict
+    """
+    return {
+        **llm_router.stats(),
+        "verdict_cache": verdict_cache.stats(),
+        "evaluations": mission_evaluations.stats(),
+        "prescore": mission_prescorer.stats(),
+        "jobs": await llm_jobs.stats()
+    }
+
 @app.post("/api/gemini/verify-evidence", response_model=EvidenceVerificationResponse)
 async def verify_evidence(request: EvidenceVerificationRequest):
     """
-    Xác minh bằng chứng hoàn thành nhiệm vụ bằng Gemini AI
+    Xác minh bằng chứng hoàn thành nhiệm vụ bằng AI (Gemini, dự phòng OpenAI/Anthropic)
     """
-    if not GEMINI_API_KEY:
-        raise HTTPException(status_code=500, detail="Gemini API key not configured")
+    # Shared clients routed over the fallback chain (Gemini first by default)
+    if not llm_router.configured:
+        raise HTTPException(status_code=500, detail="No AI provider configured")
+    
+    # Content-addressed: same evidence for the same mission and model -> same verdict
+    cache_key = verdict_key(
+        llm_router.model_id,
+        missionTitle=request.missionTitle,
+        missionDescription=request.missionDescription,
+        evidenceType=request.evidenceType,
+        description=request.description,
+        date=request.date
+    )
+    cached = await verdict_cache.get(cache_key)
+    if cached is not None:
+        return EvidenceVerificationResponse(**cached)
     
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        
-        prompt = f"""Bạn là một AI chuyên đánh giá bằng chứng hoàn thành nhiệm vụ.
+        verdict = await verdict_flight.do(cache_key, lambda: _ask_evidence_verdict(request))
+        await verdict_cache.set(cache_key, verdict.model_dump())
+        return verdict
+    except LLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calling AI provider: {str(e)}")
+
+async def _ask_evidence_verdict(request: EvidenceVerificationRequest) -> EvidenceVerificationResponse:
+    """Ask the LLM for one evidence verdict"""
+    prompt = f"""Bạn là một AI chuyên đánh giá bằng chứng hoàn thành nhiệm vụ.
 
 NHIỆM VỤ:
 Tiêu đề: {request.missionTitle}
@@ -193,102 +435,329 @@ Trả về JSON theo format:
   "reason": "lý do ngắn gọn"
 }}"""
 
-        response = model.generate_content(prompt)
-        text = response.text
-        
-        # Extract JSON from response
-        import json
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', text)
-        if not json_match:
-            raise ValueError("Invalid JSON response from AI")
-        
-        result = json.loads(json_match.group(0))
-        
-        return EvidenceVerificationResponse(
-            result=result.get("result", "reject"),
-            confidence=min(100, max(0, result.get("confidence", 0))),
-            reason=result.get("reason", "Không có lý do cụ thể")
+    return await generate_structured(llm_router, prompt, EvidenceVerificationResponse, EVIDENCE_VERDICT_DEFAULTS)
+
+@app.post("/api/gemini/verify-evidence/batch", response_model=BatchEvidenceVerificationResponse)
+async def verify_evidence_batch(request: BatchEvidenceVerificationRequest):
+    """
+    Xác minh nhiều bằng chứng của cùng một nhiệm vụ trong ít lời gọi AI nhất
+    
+    Body: {"missionTitle": "...", "missionDescription": "...", "evidences": [{"evidenceType", "description", "date"}]}
+    Mô tả nhiệm vụ chỉ gửi một lần cho mỗi lô; kết quả trả về theo đúng thứ tự evidences
+    Bằng chứng không xác minh được (timeout, lỗi provider) có results null và nằm trong errors
+    """
+    if not llm_router.configured:
+        raise HTTPException(status_code=500, detail="No AI provider configured")
+    if not request.evidences:
+        raise HTTPException(status_code=400, detail="evidences must not be empty")
+    if len(request.evidences) > MAX_EVIDENCES_PER_REQUEST:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_EVIDENCES_PER_REQUEST} evidences per request"
         )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calling Gemini API: {str(e)}")
+    
+    # Same keys as the single endpoint, so both share cached verdicts
+    keys = [
+        verdict_key(
+            llm_router.model_id,
+            missionTitle=request.missionTitle,
+            missionDescription=request.missionDescription,
+            evidenceType=evidence.evidenceType,
+            description=evidence.description,
+            date=evidence.date
+        )
+        for evidence in request.evidences
+    ]
+    verdicts: Dict[str, EvidenceVerificationResponse] = {}
+    unique_keys = list(dict.fromkeys(keys))
+    for key, cached in zip(unique_keys, await asyncio.gather(*(verdict_cache.get(key) for key in unique_keys))):
+        if cached is not None:
+            verdicts[key] = EvidenceVerificationResponse(**cached)
+    cached_count = len(verdicts)
+    
+    # Ask only for uncached evidences, duplicates once, packed into as few prompts as fit
+    pending = [keys.index(key) for key in unique_keys if key not in verdicts]
+    header_tokens = estimate_tokens(build_batch_prompt(request.missionTitle, request.missionDescription, []))
+    items = []
+    for i in pending:
+        evidence = request.evidences[i]
+        items.append((i, format_evidence(i, evidence.evidenceType, evidence.description, evidence.date)))
+    batches = pack_evidences(items, header_tokens)
+    
+    # A failed batch call (timeout, provider error) is re-asked item by item like a skipped index
+    answers = await asyncio.gather(
+        *(_ask_evidence_batch(request, batch) for batch in batches),
+        return_exceptions=True
+    )
+    llm_calls = len(batches)
+    
+    # Items the batch answer skipped or garbled are re-asked one by one
+    retries = []
+    for batch, answer in zip(batches, answers):
+        for i, _ in batch:
+            if not isinstance(answer, Exception) and i in answer:
+                verdicts[keys[i]] = answer[i]
+            else:
+                retries.append(i)
+    failures: Dict[str, Exception] = {}
+    for i, verdict in zip(retries, await asyncio.gather(*(
+        verdict_flight.do(keys[i], lambda i=i: _ask_evidence_verdict(_single_request(request, i)))
+        for i in retries
+    ), return_exceptions=True)):
+        if isinstance(verdict, Exception):
+            failures[keys[i]] = verdict
+        else:
+            verdicts[keys[i]] = verdict
+    llm_calls += len(retries)
+    
+    # Nothing verified at all: answer like the single endpoint would
+    if failures and not verdicts:
+        error = next(iter(failures.values()))
+        if isinstance(error, LLMTimeoutError):
+            raise HTTPException(status_code=504, detail=str(error))
+        raise HTTPException(status_code=500, detail=f"Error calling AI provider: {str(error)}")
+    
+    # Failures are not cached, so the next request asks for them again
+    await asyncio.gather(*(
+        verdict_cache.set(keys[i], verdicts[keys[i]].model_dump()) for i in pending if keys[i] in verdicts
+    ))
+    
+    errors = []
+    for i, key in enumerate(keys):
+        if key in failures:
+            timed_out = isinstance(failures[key], LLMTimeoutError)
+            errors.append(BatchEvidenceError(
+                index=i,
+                status=504 if timed_out else 500,
+                detail=str(failures[key]) if timed_out else f"Error calling AI provider: {str(failures[key])}"
+            ))
+    
+    return BatchEvidenceVerificationResponse(
+        results=[verdicts.get(key) for key in keys],
+        cached=cached_count,
+        llmCalls=llm_calls,
+        errors=errors
+    )
+
+def _single_request(request: BatchEvidenceVerificationRequest, index: int) -> EvidenceVerificationRequest:
+    evidence = request.evidences[index]
+    return EvidenceVerificationRequest(
+        missionTitle=request.missionTitle,
+        missionDescription=request.missionDescription,
+        **evidence.model_dump()
+    )
+
+async def _ask_evidence_batch(
+    request: BatchEvidenceVerificationRequest,
+    batch: List[tuple]
+) -> Dict[int, EvidenceVerificationResponse]:
+    """Ask the LLM for the verdicts of one packed batch, keyed by evidence index"""
+    prompt = build_batch_prompt(request.missionTitle, request.missionDescription, [line for _, line in batch])
+    text = (await llm_router.generate(prompt, schema=BATCH_VERDICTS_SCHEMA)).text
+    
+    verdicts = {}
+    for index, result in parse_batch_verdicts(text, [i for i, _ in batch]).items():
+        try:
+            verdicts[index] = validate_model(result, EvidenceVerificationResponse, EVIDENCE_VERDICT_DEFAULTS)
+        except ValueError:
+            continue  # re-asked on its own
+    return verdicts
 
 @app.post("/api/gemini/evaluate-mission", response_model=MissionEvaluationResponse)
 async def evaluate_mission(request: MissionEvaluationRequest):
     """
-    Đánh giá tổng thể hoàn thành nhiệm vụ bằng Gemini AI
+    Đánh giá tổng thể hoàn thành nhiệm vụ bằng AI (Gemini, dự phòng OpenAI/Anthropic)
     """
-    if not GEMINI_API_KEY:
-        raise HTTPException(status_code=500, detail="Gemini API key not configured")
+    # Clear-cut missions (no evidence at all, or full coverage with high confidence) skip the LLM
+    prescored = mission_prescorer.score(request.evidences, request.totalDays)
+    if prescored is not None:
+        return MissionEvaluationResponse(**prescored)
+    
+    # Shared clients routed over the fallback chain (Gemini first by default)
+    if not llm_router.configured:
+        raise HTTPException(status_code=500, detail="No AI provider configured")
+    
+    # Only the evidences added since the last evaluation of this mission reach the LLM
+    plan = await _evaluation_plan(request)
+    if plan.assessment is not None:
+        return MissionEvaluationResponse(**plan.assessment)
     
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        
-        approved_evidences = [e for e in request.evidences if e.get("status") == "approved"]
-        evidence_summary = "\n".join([
-            f"{i+1}. [{e.get('date')}] {e.get('description')} (AI confidence: {e.get('aiVerification', {}).get('confidence', 0)}%)"
-            for i, e in enumerate(approved_evidences)
-        ])
-        
-        prompt = f"""Bạn là một AI chuyên đánh giá hoàn thành nhiệm vụ tự hoàn thiện.
+        evaluation = await generate_structured(
+            llm_router,
+            plan.prompt,
+            MissionEvaluationResponse,
+            MISSION_EVALUATION_DEFAULTS
+        )
+        await mission_evaluations.record(plan, evaluation.model_dump())
+        return evaluation
+    except LLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calling AI provider: {str(e)}")
 
-NHIỆM VỤ:
-Tiêu đề: {request.missionTitle}
-Mô tả: {request.missionDescription}
-Thời gian cam kết: {request.totalDays} ngày
+@app.post("/api/gemini/evaluate-mission/stream")
+async def evaluate_mission_stream(request: MissionEvaluationRequest):
+    """
+    Đánh giá nhiệm vụ bằng AI, trả về dạng Server-Sent Events
+    
+    Events: `assessment` {"delta"} (nhận xét đang được viết), `field` {"name", "value"}
+    (overallScore / passedRequirements ngay khi có), `result` (MissionEvaluationResponse đầy đủ),
+    `error` {"status", "detail"}
+    """
+    # Decided without streaming: clear-cut prescore, or no new evidence since the last evaluation
+    decided = mission_prescorer.score(request.evidences, request.totalDays)
+    if decided is None:
+        if not llm_router.configured:
+            raise HTTPException(status_code=500, detail="No AI provider configured")
+        plan = await _evaluation_plan(request)
+        decided = plan.assessment
+    
+    async def events():
+        if decided is not None:
+            yield _sse("result", decided)
+            return
+        stream = StructuredStream(MissionEvaluationResponse, MISSION_EVALUATION_DEFAULTS)
+        try:
+            async for chunk in llm_router.stream(plan.prompt, schema=json_schema(MissionEvaluationResponse)):
+                for kind, name, value in stream.feed(chunk):
+                    if kind == "text" and name == "aiAssessment":
+                        yield _sse("assessment", {"delta": value})
+                    elif kind == "field" and name != "aiAssessment":
+                        yield _sse("field", {"name": name, "value": value})
+            evaluation = stream.result().model_dump()
+            await mission_evaluations.record(plan, evaluation)
+            yield _sse("result", evaluation)
+        except LLMTimeoutError as e:
+            yield _sse("error", {"status": 504, "detail": str(e)})
+        except Exception as e:
+            yield _sse("error", {"status": 500, "detail": f"Error calling AI provider: {str(e)}"})
+    
+    return _event_stream(events())
 
-BẰNG CHỨNG ĐÃ ĐƯỢC DUYỆT ({len(approved_evidences)}/{len(request.evidences)}):
-{evidence_summary or 'Không có bằng chứng nào được duyệt'}
+def _sse(event: str, data: Any) -> str:
+    """One Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-YÊU CẦU:
-1. Đánh giá tổng thể mức độ hoàn thành nhiệm vụ (điểm 0-100)
-2. Nhận xét chi tiết về chất lượng thực hiện
-3. Quyết định PASS (≥70 điểm) hay FAIL (<70 điểm)
+def _event_stream(events) -> StreamingResponse:
+    # no-cache / X-Accel-Buffering: keep proxies (nginx) from buffering the stream
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-Tiêu chí chấm điểm:
-- Số lượng bằng chứng so với thời gian cam kết
-- Chất lượng bằng chứng (độ tin cậy AI)
-- Tính nhất quán và kiên trì
-- Mức độ đạt mục tiêu ban đầu
+async def _evaluation_plan(request: MissionEvaluationRequest) -> EvaluationPlan:
+    # Prompts stay within LLM_EVALUATION_PROMPT_TOKENS however long the mission runs
+    return await mission_evaluations.plan(
+        evaluation_key(llm_router.model_id, request.missionId),
+        request.missionTitle,
+        request.missionDescription,
+        request.totalDays,
+        request.evidences
+    )
 
-Trả về JSON theo format:
-{{
-  "overallScore": số từ 0-100,
-  "aiAssessment": "nhận xét chi tiết 2-3 câu",
-  "passedRequirements": true hoặc false
-}}"""
+# ========== AI Job Endpoints ==========
+# Queued variants of the Gemini endpoints: reply 202 with a job ID at once,
+# workers run the same handlers; clients poll GET /api/jobs/{id} or pass callbackUrl
+async def _verify_evidence_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return (await verify_evidence(EvidenceVerificationRequest(**payload))).model_dump()
 
-        response = model.generate_content(prompt)
-        text = response.text
-        
-        # Extract JSON from response
-        import json
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', text)
-        if not json_match:
-            raise ValueError("Invalid JSON response from AI")
-        
-        result = json.loads(json_match.group(0))
-        
-        return MissionEvaluationResponse(
-            overallScore=min(100, max(0, result.get("overallScore", 0))),
-            aiAssessment=result.get("aiAssessment", "Không có nhận xét"),
-            passedRequirements=result.get("passedRequirements", False)
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calling Gemini API: {str(e)}")
+async def _evaluate_mission_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return (await evaluate_mission(MissionEvaluationRequest(**payload))).model_dump()
+
+llm_jobs.register("verify-evidence", _verify_evidence_job)
+llm_jobs.register("evaluate-mission", _evaluate_mission_job)
+
+async def submit_job(kind: str, request) -> Dict[str, Any]:
+    """
+    Đưa request vào hàng đợi job (400 khi priority hoặc callbackUrl không hợp lệ, 503 khi hàng đợi đầy)
+    """
+    payload = request.model_dump(exclude={"priority", "callbackUrl"})
+    try:
+        return await llm_jobs.submit(kind, payload, request.priority, request.callbackUrl)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+@app.post("/api/jobs/verify-evidence", status_code=202)
+async def submit_verify_evidence_job(request: EvidenceVerificationJobRequest):
+    """
+    Xếp hàng xác minh bằng chứng, trả về job ID ngay
+    """
+    return await submit_job("verify-evidence", request)
+
+@app.post("/api/jobs/evaluate-mission", status_code=202)
+async def submit_evaluate_mission_job(request: MissionEvaluationJobRequest):
+    """
+    Xếp hàng đánh giá nhiệm vụ, trả về job ID ngay
+    """
+    return await submit_job("evaluate-mission", request)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Trạng thái job: queued, running, done (kèm result) hoặc failed (kèm error)
+    """
+    job = await llm_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
 
 # ========== NEO Endpoints ==========
+def _saturated(e: ChainSaturatedError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+async def run_chain_call(fn, *args, **kwargs):
+    """
+    Chạy NeoService call đồng bộ trên blockchain executor (503 khi quá tải)
+    """
+    try:
+        return await chain_executor.run(fn, *args, **kwargs)
+    except ChainSaturatedError as e:
+        raise _saturated(e)
+
+@asynccontextmanager
+async def chain_slot():
+    """
+    Giữ một slot của blockchain executor cho NeoService call async (503 khi quá tải)
+    """
+    try:
+        async with chain_executor.admit():
+            yield
+    except ChainSaturatedError as e:
+        raise _saturated(e)
+
+async def index_ready() -> bool:
+    """
+    Đọc từ bản chiếu SQLite được không (đã sync và không trễ quá INDEX_MAX_LAG block)
+    """
+    if mission_store.get_indexed_height() == 0:
+        return False
+    # Height seen by the seed node health probes; one getblockcount before the first probe
+    try:
+        block_count = neo_service.cache.block_height or await neo_service.aget_block_count()
+    except Exception:
+        # Chain unreachable: a chain read would fail too, the projection is the best answer
+        return True
+    return mission_store.is_ready(block_count - 1, INDEX_MAX_LAG)
+
 @app.get("/api/neo/status")
 async def neo_status():
     """
     Kiểm tra kết nối NEO blockchain
     """
     try:
-        status = neo_service.get_blockchain_status()
-        return status
+        async with chain_slot():
+            status = await neo_service.aget_blockchain_status()
+        return {**status, "executor": chain_executor.stats()}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"NEO connection error: {str(e)}")
 
@@ -311,7 +780,8 @@ async def create_mission_on_neo(mission_data: dict):
             raise HTTPException(status_code=400, detail="Title and description are required")
         
         # Create mission on NEO
-        result = neo_service.create_mission(
+        result = await run_chain_call(
+            neo_service.create_mission,
             creator=creator,
             title=title,
             description=description,
@@ -331,24 +801,195 @@ async def create_mission_on_neo(mission_data: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create mission: {str(e)}")
 
+@app.post("/api/neo/create-missions")
+async def create_missions_on_neo(batch_data: dict):
+    """
+    Tạo nhiều missions trong một transaction NEO (tối đa MAX_BATCH_SIZE)
+    """
+    try:
+        creator = batch_data.get("creator", "default_creator")
+        items = batch_data.get("missions") or []
+        
+        if not isinstance(items, list) or not items:
+            raise HTTPException(status_code=400, detail="missions must be a non-empty list")
+        if len(items) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} missions per batch")
+        
+        missions = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get("title") or not item.get("description"):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Mission {index}: title and description are required"
+                )
+            missions.append({
+                "title": item["title"],
+                "description": item["description"],
+                "reward_amount": item.get("reward_amount", 10),
+                "deadline": item.get("deadline", 86400),  # Default 1 day
+                "category": item.get("category", "general")
+            })
+        
+        result = await run_chain_call(neo_service.create_missions_batch, creator, missions)
+        
+        return {
+            "success": True,
+            "missionIds": result["mission_ids"],
+            "txHash": result["tx_hash"],
+            "count": len(result["mission_ids"]),
+            "data": result
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create missions: {str(e)}")
+
+def _mission_matches(mission: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    for field in ("status", "category", "creator", "assignee"):
+        if filters[field] is not None and mission.get(field) != filters[field]:
+            return False
+    deadline = mission.get("deadline", 0)
+    if filters["deadline_from"] is not None and deadline < filters["deadline_from"]:
+        return False
+    if filters["deadline_to"] is not None and deadline > filters["deadline_to"]:
+        return False
+    return True
+
+@app.get("/api/missions")
+async def list_missions(
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    creator: Optional[str] = None,
+    assignee: Optional[str] = None,
+    deadline_from: Optional[int] = None,
+    deadline_to: Optional[int] = None,
+    cursor: Optional[int] = Query(None, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Danh sách missions (mới nhất trước), phân trang bằng cursor và có bộ lọc
+    """
+    filters = {
+        "status": status.upper() if status else None,
+        "category": category,
+        "creator": to_script_hash(creator) if creator else None,
+        "assignee": to_script_hash(assignee) if assignee else None,
+        "deadline_from": deadline_from,
+        "deadline_to": deadline_to,
+    }
+    
+    try:
+        if await index_ready():
+            missions, next_cursor = mission_store.list_missions(cursor=cursor, limit=limit, **filters)
+        else:
+            # Index not synced yet: read one page of IDs from chain and
+            # filter it, so a page may hold fewer than `limit` missions
+            async with chain_slot():
+                total = await neo_service.aget_mission_count()
+                top = min(total, cursor - 1) if cursor else total
+                mission_ids = list(range(top, max(0, top - limit), -1))
+                missions = await neo_service.aget_missions(mission_ids)
+            missions = [m for m in missions if _mission_matches(m, filters)]
+            next_cursor = mission_ids[-1] if mission_ids and mission_ids[-1] > 1 else None
+        
+        return {
+            "missions": missions,
+            "count": len(missions),
+            "nextCursor": next_cursor
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/missions/count")
 async def get_mission_count():
     """
     Lấy tổng số missions
     """
     try:
-        count = neo_service.get_mission_count()
+        if await index_ready():
+            return {"count": mission_store.count()}
+        
+        async with chain_slot():
+            count = await neo_service.aget_mission_count()
         return {"count": count}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/missions/stats")
+async def get_mission_stats():
+    """
+    Số missions theo từng status (VD: COMPLETED đang chờ verify)
+    """
+    try:
+        if await index_ready():
+            counts = {name: 0 for name in STATUS_NAMES.values()}
+            counts.update(mission_store.status_counts())
+        else:
+            async with chain_slot():
+                counts = await neo_service.aget_status_counts()
+        return {"byStatus": counts, "total": sum(counts.values())}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _index_page(loader, key: str, value: str, offset: int, limit: int):
+    try:
+        async with chain_slot():
+            mission_ids = await loader(value, offset, limit)
+            missions = await neo_service.aget_missions(mission_ids)
+        return {
+            key: value,
+            "missionIds": mission_ids,
+            "missions": missions,
+            "count": len(mission_ids),
+            "offset": offset,
+            "limit": limit
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/missions/status/{status}")
+async def get_missions_by_status(
+    status: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """
+    Duyệt missions theo status bằng status index trên contract
+    """
+    return await _index_page(neo_service.aget_missions_by_status, "status", status.upper(), offset, limit)
+
+@app.get("/api/missions/category/{category}")
+async def get_missions_by_category(
+    category: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """
+    Duyệt missions theo category bằng category index trên contract
+    """
+    return await _index_page(neo_service.aget_missions_by_category, "category", category, offset, limit)
+
 @app.get("/api/missions/{mission_id}")
 async def get_mission(mission_id: int):
     """
     Lấy thông tin chi tiết của mission
     """
     try:
-        mission = neo_service.get_mission(mission_id)
+        mission = mission_store.get_mission(mission_id) if await index_ready() else None
+        if not mission:
+            # Not indexed (yet) - read from chain
+            async with chain_slot():
+                mission = await neo_service.aget_mission(mission_id)
         if not mission:
             raise HTTPException(status_code=404, detail="Mission not found")
         return mission
@@ -367,7 +1008,7 @@ async def accept_mission(mission_id: int, data: dict):
         if not user:
             raise HTTPException(status_code=400, detail="User address is required")
         
-        result = neo_service.accept_mission(mission_id, user)
+        result = await run_chain_call(neo_service.accept_mission, mission_id, user)
         return {
             "success": result["success"],
             "txHash": result.get("tx_hash"),
@@ -390,7 +1031,7 @@ async def complete_mission(mission_id: int, data: dict):
         if not user:
             raise HTTPException(status_code=400, detail="User address is required")
         
-        result = neo_service.complete_mission(mission_id, user, proof)
+        result = await run_chain_call(neo_service.complete_mission, mission_id, user, proof)
         return {
             "success": result["success"],
             "txHash": result.get("tx_hash"),
@@ -413,7 +1054,7 @@ async def verify_mission(mission_id: int, data: dict):
         if not verifier:
             raise HTTPException(status_code=400, detail="Verifier address is required")
         
-        result = neo_service.verify_mission(mission_id, verifier, approved)
+        result = await run_chain_call(neo_service.verify_mission, mission_id, verifier, approved)
         return {
             "success": result["success"],
             "txHash": result.get("tx_hash"),
@@ -425,27 +1066,86 @@ async def verify_mission(mission_id: int, data: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/missions/user/{user_address}")
-async def get_user_missions(user_address: str):
+@app.post("/api/missions/verify-batch")
+async def verify_missions_batch(data: dict):
     """
-    Lấy danh sách missions của user
+    Xác minh nhiều nhiệm vụ trong một transaction (tối đa MAX_BATCH_SIZE)
     """
     try:
-        mission_ids = neo_service.get_user_missions(user_address)
+        verifier = data.get("verifier")
+        items = data.get("items") or []
         
-        # Get details for each mission
-        missions = []
-        for mission_id in mission_ids:
-            mission = neo_service.get_mission(mission_id)
-            if mission:
-                missions.append(mission)
+        if not verifier:
+            raise HTTPException(status_code=400, detail="Verifier address is required")
+        if not isinstance(items, list) or not items:
+            raise HTTPException(status_code=400, detail="items must be a non-empty list")
+        if len(items) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} missions per batch")
+        
+        pairs = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get("missionId"), int):
+                raise HTTPException(status_code=400, detail=f"Item {index}: missionId is required")
+            pairs.append((item["missionId"], bool(item.get("approved", True))))
+        
+        result = await run_chain_call(neo_service.verify_missions_batch, verifier, pairs)
+        return {
+            "success": result["success"],
+            "txHash": result.get("tx_hash"),
+            "results": [
+                {
+                    "missionId": entry["mission_id"],
+                    "verified": entry["verified"],
+                    "rewardDistributed": entry.get("reward_distributed", False)
+                }
+                for entry in result["data"]
+            ],
+            "message": result.get("message", "Missions verified")
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/missions/user/{user_address}")
+async def get_user_missions(
+    user_address: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """
+    Lấy danh sách missions của user (phân trang bằng offset/limit; 400 nếu địa chỉ không hợp lệ khi đã cấu hình contract)
+    """
+    if neo_service.mission_contract:
+        try:
+            script_hash = address_to_script_hash(user_address)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        # Mock data answers any user string, as list_missions filters do
+        script_hash = to_script_hash(user_address)
+    
+    try:
+        if await index_ready():
+            mission_ids = mission_store.get_user_mission_ids(script_hash, offset, limit)
+            missions = mission_store.get_missions(mission_ids)
+        else:
+            async with chain_slot():
+                mission_ids = await neo_service.aget_user_missions(user_address, offset, limit)
+                
+                # Get details for all missions in one batched RPC request
+                missions = await neo_service.aget_missions(mission_ids)
         
         return {
             "user": user_address,
             "missionIds": mission_ids,
             "missions": missions,
-            "count": len(mission_ids)
+            "count": len(mission_ids),
+            "offset": offset,
+            "limit": limit
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
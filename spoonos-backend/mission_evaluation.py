@@ -0,0 +1,176 @@
+"""
+Mission Evaluation
+Lưu trạng thái đánh giá của từng nhiệm vụ (đánh giá gần nhất, thống kê, mốc bằng chứng) để lần sau chỉ gửi bằng chứng mới cho LLM
+"""
+import os
+import json
+import time
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from mission_prompt import build_evaluation_prompt, build_incremental_prompt, evidence_stats, format_stats
+from verdict_cache import MemoryVerdictBackend, RedisVerdictBackend, verdict_key
+
+load_dotenv()
+
+REDIS_KEY_PREFIX = "missionstake:evaluation:"
+
+
+def evaluation_key(model: str, mission_id: Optional[str]) -> Optional[str]:
+    """
+    State address of a mission, or None without a mission ID
+
+    Title and description do not identify a mission: different users'
+    missions share them, so requests without an ID keep no state.
+    """
+    if not mission_id:
+        return None
+    return verdict_key(model, missionId=mission_id)
+
+
+def evidence_digests(evidences: List[Dict[str, Any]], prefix: int) -> Tuple[str, str]:
+    """
+    sha256 of the first `prefix` evidences and of the whole list, in one pass
+
+    Evidences are hashed as canonical JSON, so an edited or reordered
+    history no longer matches a stored digest while an appended one does.
+    """
+    digest = hashlib.sha256()
+    prefix_digest = digest.hexdigest() if prefix == 0 else ""
+    for count, evidence in enumerate(evidences, 1):
+        digest.update(json.dumps(evidence, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(b"\n")
+        if count == prefix:
+            prefix_digest = digest.hexdigest()
+    return prefix_digest, digest.hexdigest()
+
+
+@dataclass
+class EvaluationPlan:
+    """What one evaluate-mission call has to do, and the state to record afterwards"""
+
+    key: Optional[str]  # None when the mission has no state (no mission ID)
+    mode: str  # "unchanged", "incremental" or "full"
+    prompt: Optional[str]  # None when mode is "unchanged"
+    assessment: Optional[Dict[str, Any]]  # the stored assessment when mode is "unchanged"
+    watermark: int
+    digest: str
+    stats: str
+    total_days: int
+    increments: int = 0
+
+
+class MissionEvaluationStore:
+    """
+    Running evaluation state per mission
+
+    After each evaluation the store keeps the assessment, the statistics it
+    was based on and a watermark: how many evidences it covered and their
+    digest. A later request whose evidence list still starts with exactly
+    those evidences (the frontend only appends) is planned as an update that
+    sends just the new ones; an unchanged list reuses the stored assessment
+    without an LLM call. Edited history, a different totalDays, a delta too
+    large for the prompt budget or max_increments updates in a row (so
+    errors cannot compound forever) fall back to a full evaluation. A
+    request without a key is always evaluated in full and leaves no state.
+    """
+
+    def __init__(self, backend=None, enabled: bool = True, max_increments: int = 10):
+        self.backend = backend
+        self.enabled = enabled and backend is not None
+        self.max_increments = max_increments
+        self.full = 0
+        self.incremental = 0
+        self.unchanged = 0
+
+    async def plan(
+        self,
+        key: Optional[str],
+        mission_title: str,
+        mission_description: str,
+        total_days: int,
+        evidences: List[Dict[str, Any]]
+    ) -> EvaluationPlan:
+        state = await self.backend.get(key) if self.enabled and key is not None else None
+        watermark = state["watermark"] if state is not None else 0
+        prefix_digest, digest = evidence_digests(evidences, watermark)
+        stats = format_stats(evidence_stats(evidences, total_days))
+        plan = EvaluationPlan(key, "full", None, None, len(evidences), digest, stats, total_days)
+
+        if (
+            state is not None
+            and state["totalDays"] == total_days
+            and watermark <= len(evidences)
+            and state["digest"] == prefix_digest
+        ):
+            if watermark == len(evidences):
+                self.unchanged += 1
+                plan.mode = "unchanged"
+                plan.assessment = state["assessment"]
+                return plan
+            if state["increments"] < self.max_increments:
+                plan.prompt = build_incremental_prompt(
+                    mission_title,
+                    mission_description,
+                    total_days,
+                    evidences,
+                    evidences[watermark:],
+                    state
+                )
+                if plan.prompt is not None:
+                    self.incremental += 1
+                    plan.mode = "incremental"
+                    plan.increments = state["increments"] + 1
+                    return plan
+
+        self.full += 1
+        plan.prompt = build_evaluation_prompt(mission_title, mission_description, total_days, evidences)
+        return plan
+
+    async def record(self, plan: EvaluationPlan, assessment: Dict[str, Any]):
+        """Store the outcome of a planned evaluation as the mission's new state"""
+        if not self.enabled or plan.key is None or plan.mode == "unchanged":
+            return
+        await self.backend.set(plan.key, {
+            "assessment": assessment,
+            "watermark": plan.watermark,
+            "digest": plan.digest,
+            "stats": plan.stats,
+            "totalDays": plan.total_days,
+            "increments": plan.increments,
+            "updatedAt": time.time()
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {"full": self.full, "incremental": self.incremental, "unchanged": self.unchanged}
+        if not self.enabled:
+            return {"enabled": False, **counts}
+        return {"enabled": True, "backend": self.backend.name, **counts, **self.backend.stats()}
+
+    async def aclose(self):
+        if self.backend is not None:
+            await self.backend.aclose()
+
+
+def create_mission_evaluation_store() -> MissionEvaluationStore:
+    """
+    Build the store from env (LLM_EVALUATION_INCREMENTAL, LLM_EVALUATION_MAX_INCREMENTS,
+    LLM_EVALUATION_STATE_TTL, LLM_EVALUATION_STATE_MAX_ENTRIES, LLM_EVALUATION_STATE_REDIS_URL)
+    """
+    if os.getenv("LLM_EVALUATION_INCREMENTAL", "true").lower() != "true":
+        return MissionEvaluationStore(enabled=False)
+
+    ttl = float(os.getenv("LLM_EVALUATION_STATE_TTL", "2592000"))
+    redis_url = os.getenv("LLM_EVALUATION_STATE_REDIS_URL", "")
+    if redis_url:
+        backend = RedisVerdictBackend(redis_url, ttl, prefix=REDIS_KEY_PREFIX)
+    else:
+        backend = MemoryVerdictBackend(int(os.getenv("LLM_EVALUATION_STATE_MAX_ENTRIES", "10000")), ttl)
+    return MissionEvaluationStore(backend, max_increments=int(os.getenv("LLM_EVALUATION_MAX_INCREMENTS", "10")))
+
+
+# Singleton instance
+mission_evaluations = create_mission_evaluation_store()
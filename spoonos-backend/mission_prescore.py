@@ -0,0 +1,137 @@
+"""
+Mission Prescore
+Chấm điểm nhiệm vụ theo quy tắc (độ phủ, chuỗi ngày, độ tin cậy AI) để trả kết quả ngay cho các trường hợp rõ ràng, chỉ gửi trường hợp biên cho LLM
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from mission_prompt import EvidenceStats, evidence_stats
+
+load_dotenv()
+
+# Same cut-off the evaluation prompt gives the LLM
+PASS_SCORE = 70
+
+# Rule score weights: coverage, mean AI confidence, longest streak over totalDays
+COVERAGE_WEIGHT = 0.6
+CONFIDENCE_WEIGHT = 0.25
+STREAK_WEIGHT = 0.15
+
+
+def rule_score(stats: EvidenceStats) -> int:
+    """0-100 score from coverage, mean confidence and longest streak"""
+    confidence = (stats.mean_confidence or 0) / 100
+    streak = min(1.0, stats.longest_streak / stats.total_days) if stats.total_days > 0 else 0.0
+    score = COVERAGE_WEIGHT * stats.coverage + CONFIDENCE_WEIGHT * confidence + STREAK_WEIGHT * streak
+    return max(0, min(100, round(score * 100)))
+
+
+def _summary(stats: EvidenceStats) -> str:
+    mean = f"{stats.mean_confidence:.0f}%" if stats.mean_confidence is not None else "không có"
+    return (
+        f"Chấm điểm tự động theo quy tắc: {stats.active_days}/{stats.total_days} ngày có bằng chứng được duyệt "
+        f"({stats.coverage:.0%}), độ tin cậy AI trung bình {mean}, "
+        f"chuỗi ngày liên tiếp dài nhất {stats.longest_streak} ngày."
+    )
+
+
+class MissionPrescorer:
+    """
+    Rule-based first pass over evaluate-mission requests
+
+    Missions at either end of the scale get a verdict without an LLM call. A
+    mission with no approved and no pending evidence at all fails. Coverage
+    (days with an approved evidence over totalDays) of at least
+    pass_coverage with a mean AI confidence of at least pass_confidence
+    passes, scored with the weighted rule score kept at or above PASS_SCORE.
+    Low coverage alone never fails a mission: the request does not say how
+    many of its days have elapsed. Everything in between, missions without a
+    positive totalDays and missions with approved evidences whose date does
+    not parse (their days cannot be counted) are left to the LLM.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        pass_coverage: float = 0.95,
+        pass_confidence: float = 85.0
+    ):
+        self.enabled = enabled
+        self.pass_coverage = pass_coverage
+        self.pass_confidence = pass_confidence
+        self.passed = 0
+        self.failed = 0
+        self.escalated = 0
+
+    def score(self, evidences: List[Dict[str, Any]], total_days: int) -> Optional[Dict[str, Any]]:
+        """
+        A MissionEvaluationResponse-shaped verdict for clear-cut missions
+
+        Returns:
+            overallScore / aiAssessment / passedRequirements, or None when the
+            mission needs the LLM
+        """
+        if not self.enabled:
+            return None
+        if total_days <= 0:
+            self.escalated += 1
+            return None
+
+        stats = evidence_stats(evidences, total_days)
+        if stats.approved == 0 and not any(e.get("status") == "pending" for e in evidences):
+            self.failed += 1
+            return {
+                "overallScore": 0,
+                "aiAssessment": _summary(stats) + " Chưa có bằng chứng nào được duyệt hoặc đang chờ duyệt.",
+                "passedRequirements": False
+            }
+        if stats.undated:
+            self.escalated += 1
+            return None
+        if (
+            stats.coverage >= self.pass_coverage
+            and stats.mean_confidence is not None
+            and stats.mean_confidence >= self.pass_confidence
+        ):
+            self.passed += 1
+            return {
+                "overallScore": max(rule_score(stats), PASS_SCORE),
+                "aiAssessment": _summary(stats) + " Nhiệm vụ được thực hiện đều đặn với bằng chứng đáng tin cậy.",
+                "passedRequirements": True
+            }
+
+        self.escalated += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        skipped = self.passed + self.failed
+        total = skipped + self.escalated
+        return {
+            "enabled": self.enabled,
+            "thresholds": {
+                "pass_coverage": self.pass_coverage,
+                "pass_confidence": self.pass_confidence
+            },
+            "passed": self.passed,
+            "failed": self.failed,
+            "escalated": self.escalated,
+            "skip_rate": round(skipped / total, 3) if total else 0.0
+        }
+
+
+def create_mission_prescorer() -> MissionPrescorer:
+    """
+    Build the prescorer from env (LLM_PRESCORE_ENABLED, LLM_PRESCORE_PASS_COVERAGE,
+    LLM_PRESCORE_PASS_CONFIDENCE)
+    """
+    return MissionPrescorer(
+        enabled=os.getenv("LLM_PRESCORE_ENABLED", "true").lower() == "true",
+        pass_coverage=float(os.getenv("LLM_PRESCORE_PASS_COVERAGE", "0.95")),
+        pass_confidence=float(os.getenv("LLM_PRESCORE_PASS_CONFIDENCE", "85"))
+    )
+
+
+# Singleton instance
+mission_prescorer = create_mission_prescorer()
@@ -0,0 +1,398 @@
+"""
+Mission Prompt
+Dựng prompt đánh giá nhiệm vụ trong ngân sách token: gộp bằng chứng trùng, tóm tắt bằng chứng cũ theo tuần, cập nhật đánh giá trước với bằng chứng mới
+"""
+import os
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from evidence_batch import CHARS_PER_TOKEN, estimate_tokens
+from verdict_cache import normalize_text
+
+load_dotenv()
+
+EVALUATION_PROMPT_TOKENS = int(os.getenv("LLM_EVALUATION_PROMPT_TOKENS", "3000"))
+# Newest evidences quoted verbatim at most; older ones only appear in the weekly summary
+MAX_RECENT_EVIDENCES = 30
+MAX_DESCRIPTION_CHARS = 200
+# Previous assessment quoted back by incremental prompts
+MAX_ASSESSMENT_CHARS = 600
+# Word-set overlap above which two descriptions count as the same evidence
+NEAR_DUPLICATE_SIMILARITY = 0.85
+# Kept descriptions each new one is compared against
+DUPLICATE_WINDOW = 20
+MAX_GAPS_LISTED = 5
+# Headings of the optional summary / recent-evidence sections
+SECTION_OVERHEAD_TOKENS = 20
+
+_WORD = re.compile(r"\w+")
+
+
+def parse_evidence_date(value: Any) -> Optional[date]:
+    """Evidence dates as the frontend sends them: d/m/yyyy (vi-VN) or ISO 8601"""
+    text = str(value or "").strip()
+    if not text:
+        return None
+    match = re.match(r"(\d{1,2})/(\d{1,2})/(\d{4})", text)
+    try:
+        if match:
+            day, month, year = (int(part) for part in match.groups())
+            return date(year, month, day)
+        return datetime.fromisoformat(text[:10]).date()
+    except ValueError:
+        return None
+
+
+def _confidence(evidence: Dict[str, Any]) -> Optional[float]:
+    value = (evidence.get("aiVerification") or {}).get("confidence")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fmt(day: date) -> str:
+    return day.strftime("%d/%m/%Y")
+
+
+@dataclass
+class EvidenceStats:
+    """Aggregates over a mission's evidences, cheap enough to compute on every request"""
+
+    total: int
+    approved: int
+    total_days: int
+    active_days: int
+    mean_confidence: Optional[float]
+    longest_streak: int
+    current_streak: int
+    gaps: List[Tuple[date, date]] = field(default_factory=list)  # runs of >= 2 missing days
+    undated: int = 0  # approved evidences whose date does not parse (not counted in active_days)
+
+    @property
+    def coverage(self) -> float:
+        """Share of committed days with at least one approved evidence"""
+        return min(1.0, self.active_days / self.total_days) if self.total_days > 0 else 0.0
+
+
+def evidence_stats(evidences: List[Dict[str, Any]], total_days: int) -> EvidenceStats:
+    """Counts, coverage, mean AI confidence, streaks and gaps of the approved evidences"""
+    approved = [e for e in evidences if e.get("status") == "approved"]
+    dates = [parse_evidence_date(e.get("date")) for e in approved]
+    days = sorted({day for day in dates if day is not None})
+    confidences = [c for c in (_confidence(e) for e in approved) if c is not None]
+
+    longest = current = 0
+    gaps: List[Tuple[date, date]] = []
+    previous: Optional[date] = None
+    for day in days:
+        if previous is not None and day - previous == timedelta(days=1):
+            current += 1
+        else:
+            if previous is not None and (day - previous).days > 2:
+                gaps.append((previous + timedelta(days=1), day - timedelta(days=1)))
+            current = 1
+        longest = max(longest, current)
+        previous = day
+
+    return EvidenceStats(
+        total=len(evidences),
+        approved=len(approved),
+        total_days=total_days,
+        active_days=len(days),
+        mean_confidence=sum(confidences) / len(confidences) if confidences else None,
+        longest_streak=longest,
+        current_streak=current,
+        gaps=gaps,
+        undated=dates.count(None)
+    )
+
+
+@dataclass
+class _Entry:
+    """One quoted line: an evidence plus the near-duplicates merged into it"""
+
+    date_text: str
+    description: str
+    words: frozenset
+    day: Optional[date]
+    confidence_sum: float = 0.0
+    confidence_count: int = 0
+    repeats: int = 1
+
+    def add_confidence(self, confidence: Optional[float]):
+        if confidence is not None:
+            self.confidence_sum += confidence
+            self.confidence_count += 1
+
+
+class _Deduper:
+    """
+    Merges evidences whose descriptions are (nearly) the same
+
+    Two descriptions match when their normalized word sets overlap by at
+    least NEAR_DUPLICATE_SIMILARITY (Jaccard). Each one is compared with the
+    last DUPLICATE_WINDOW kept entries only, so cost stays linear. Evidences
+    are added newest first, so an entry shows its latest date.
+    """
+
+    def __init__(self):
+        self.entries: List[_Entry] = []
+
+    def add(self, evidence: Dict[str, Any], day: Optional[date]):
+        description = " ".join(str(evidence.get("description") or "").split())
+        # Bare numbers (day counters, "ngày 12") do not make a description different
+        words = frozenset(word for word in _WORD.findall(normalize_text(description)) if not word.isdigit())
+        for entry in reversed(self.entries[-DUPLICATE_WINDOW:]):
+            union = words | entry.words
+            if union and len(words & entry.words) / len(union) >= NEAR_DUPLICATE_SIMILARITY:
+                entry.repeats += 1
+                entry.add_confidence(_confidence(evidence))
+                return
+        entry = _Entry(str(evidence.get("date") or ""), description, words, day)
+        entry.add_confidence(_confidence(evidence))
+        self.entries.append(entry)
+
+
+def _evidence_line(number: int, entry: _Entry) -> str:
+    description = entry.description
+    if len(description) > MAX_DESCRIPTION_CHARS:
+        description = description[:MAX_DESCRIPTION_CHARS].rstrip() + "…"
+    confidence = entry.confidence_sum / entry.confidence_count if entry.confidence_count else 0
+    repeats = f" (x{entry.repeats}, gộp mô tả trùng lặp)" if entry.repeats > 1 else ""
+    return f"{number}. [{entry.date_text}] {description} (AI confidence: {confidence:.0f}%){repeats}"
+
+
+def format_stats(stats: EvidenceStats) -> str:
+    """The statistics block of the evaluation prompts"""
+    mean = f"{stats.mean_confidence:.0f}%" if stats.mean_confidence is not None else "n/a"
+    gaps = sorted(stats.gaps, key=lambda gap: (gap[1] - gap[0]).days, reverse=True)[:MAX_GAPS_LISTED]
+    gap_text = ", ".join(
+        f"{_fmt(start)} → {_fmt(end)} ({(end - start).days + 1} ngày)" for start, end in sorted(gaps)
+    ) or "không có"
+    return "\n".join([
+        f"- Số ngày có bằng chứng được duyệt: {stats.active_days}/{stats.total_days} ({stats.coverage:.0%})",
+        f"- Độ tin cậy AI trung bình: {mean}",
+        f"- Chuỗi ngày liên tiếp dài nhất: {stats.longest_streak} ngày (chuỗi gần nhất: {stats.current_streak} ngày)",
+        f"- Khoảng trống ≥2 ngày không có bằng chứng ({len(stats.gaps)}): {gap_text}"
+    ])
+
+
+class _WeeklySummary:
+    """Evidence count and confidence per week (from the first evidence's date), computed once"""
+
+    def __init__(self, dated: List[Tuple[date, Dict[str, Any]]], undated: List[Dict[str, Any]]):
+        self.origin = dated[0][0] if dated else None
+        # week index -> [count, confidence sum, confidence count]
+        self.weeks: Dict[int, List[float]] = {}
+        for day, evidence in dated:
+            self._add(self.weeks.setdefault(self.week_of(day), [0, 0.0, 0]), evidence)
+        self.undated = [0, 0.0, 0]
+        for evidence in undated:
+            self._add(self.undated, evidence)
+        # One line per week, rendered once; prefixes serve every candidate cut-off
+        self._week_keys = sorted(self.weeks)
+        self._week_lines = [self._bucket_line(week, 1, self.weeks[week]) for week in self._week_keys]
+
+    @staticmethod
+    def _add(totals: List[float], evidence: Dict[str, Any]):
+        totals[0] += 1
+        confidence = _confidence(evidence)
+        if confidence is not None:
+            totals[1] += confidence
+            totals[2] += 1
+
+    def week_of(self, day: date) -> int:
+        return (day - self.origin).days // 7
+
+    @staticmethod
+    def _line(period: str, totals: List[float]) -> str:
+        mean = f"{totals[1] / totals[2]:.0f}%" if totals[2] else "n/a"
+        return f"- {period}: {totals[0]} bằng chứng, độ tin cậy AI TB {mean}"
+
+    def _bucket_line(self, bucket: int, weeks_per_line: int, totals: List[float]) -> str:
+        start = self.origin + timedelta(weeks=bucket * weeks_per_line)
+        end = start + timedelta(weeks=weeks_per_line) - timedelta(days=1)
+        return self._line(f"{_fmt(start)} → {_fmt(end)}", totals)
+
+    def lines(self, before_week: int, weeks_per_line: int = 1) -> List[str]:
+        """Lines for the weeks before before_week, weeks_per_line weeks each"""
+        undated = [self._line("Không rõ ngày", self.undated)] if self.undated[0] else []
+        if weeks_per_line == 1:
+            return self._week_lines[:bisect_left(self._week_keys, before_week)] + undated
+
+        buckets: Dict[int, List[float]] = {}
+        for week, totals in self.weeks.items():
+            if week < before_week:
+                bucket = buckets.setdefault(week // weeks_per_line, [0, 0.0, 0])
+                for i in range(3):
+                    bucket[i] += totals[i]
+
+        return [self._bucket_line(bucket, weeks_per_line, buckets[bucket]) for bucket in sorted(buckets)] + undated
+
+
+def build_evaluation_prompt(
+    mission_title: str,
+    mission_description: str,
+    total_days: int,
+    evidences: List[Dict[str, Any]],
+    budget: int = EVALUATION_PROMPT_TOKENS
+) -> str:
+    """
+    Evaluation prompt whose size does not grow with the mission's length
+
+    Always states the aggregate statistics. The newest weeks of approved
+    evidence are quoted, near-duplicates merged, for as long as that fits
+    the token budget and stays within MAX_RECENT_EVIDENCES lines; older
+    weeks are summarized one line per week, or per several weeks if even
+    those lines would not fit. Undated evidences are only summarized.
+    """
+    stats = evidence_stats(evidences, total_days)
+    dated = []
+    undated = []
+    for evidence in evidences:
+        if evidence.get("status") != "approved":
+            continue
+        day = parse_evidence_date(evidence.get("date"))
+        if day is None:
+            undated.append(evidence)
+        else:
+            dated.append((day, evidence))
+    dated.sort(key=lambda item: item[0])
+    weekly = _WeeklySummary(dated, undated)
+
+    def render(recent: List[str], summary: List[str]) -> str:
+        sections = [f"""Bạn là một AI chuyên đánh giá hoàn thành nhiệm vụ tự hoàn thiện.
+
+NHIỆM VỤ:
+Tiêu đề: {mission_title}
+Mô tả: {mission_description}
+Thời gian cam kết: {total_days} ngày
+
+BẰNG CHỨNG ĐÃ ĐƯỢC DUYỆT ({stats.approved}/{stats.total}):
+{format_stats(stats)}"""]
+        if summary:
+            sections.append("TỔNG HỢP THEO TUẦN (bằng chứng cũ hơn):\n" + "\n".join(summary))
+        if recent:
+            sections.append(f"{'BẰNG CHỨNG GẦN NHẤT' if summary else 'DANH SÁCH BẰNG CHỨNG'}:\n" + "\n".join(recent))
+        elif not (dated or undated):
+            sections.append("Không có bằng chứng nào được duyệt")
+        sections.append(EVALUATION_INSTRUCTIONS)
+        return "\n\n".join(sections)
+
+    # Sized from line lengths instead of re-rendering the whole prompt per candidate
+    fixed = estimate_tokens(render([], [])) + SECTION_OVERHEAD_TOKENS
+
+    def cost(lines: List[str]) -> int:
+        return sum(len(line) + 1 for line in lines) // CHARS_PER_TOKEN
+
+    def summarize(before_week: int, room: int) -> List[str]:
+        weeks_per_line = 1
+        lines = weekly.lines(before_week)
+        while len(lines) > 1 and cost(lines) > room and weeks_per_line < 52:
+            weeks_per_line *= 2
+            lines = weekly.lines(before_week, weeks_per_line)
+        return lines
+
+    if not dated:
+        return render([], summarize(0, budget - fixed))
+
+    # Add whole weeks newest first while the quoted lines fit
+    last_week = weekly.week_of(dated[-1][0])
+    best = ([], summarize(last_week + 1, budget - fixed))
+    deduper = _Deduper()
+    index = len(dated) - 1
+    for week in range(last_week, -1, -1):
+        while index >= 0 and weekly.week_of(dated[index][0]) == week:
+            deduper.add(dated[index][1], dated[index][0])
+            index -= 1
+        if len(deduper.entries) > MAX_RECENT_EVIDENCES:
+            break
+        recent = [_evidence_line(i + 1, entry) for i, entry in enumerate(reversed(deduper.entries))]
+        room = budget - fixed - cost(recent)
+        summary = summarize(week, room)
+        if room < 0 or cost(summary) > room:
+            break
+        best = (recent, summary)
+    return render(*best)
+
+
+def build_incremental_prompt(
+    mission_title: str,
+    mission_description: str,
+    total_days: int,
+    evidences: List[Dict[str, Any]],
+    new_evidences: List[Dict[str, Any]],
+    previous: Dict[str, Any],
+    budget: int = EVALUATION_PROMPT_TOKENS
+) -> Optional[str]:
+    """
+    Prompt updating a previous assessment with the evidences submitted since
+
+    The model sees its last score and comment, the statistics they were
+    based on, the current statistics over all evidences and only the new
+    approved evidences, near-duplicates merged. Returns None when the new
+    evidences do not fit MAX_RECENT_EVIDENCES lines and the token budget;
+    the caller then evaluates from scratch.
+    """
+    stats = evidence_stats(evidences, total_days)
+    deduper = _Deduper()
+    for evidence in reversed(new_evidences):
+        if evidence.get("status") == "approved":
+            deduper.add(evidence, parse_evidence_date(evidence.get("date")))
+    if len(deduper.entries) > MAX_RECENT_EVIDENCES:
+        return None
+
+    assessment = previous["assessment"]
+    comment = " ".join(str(assessment.get("aiAssessment") or "").split())
+    if len(comment) > MAX_ASSESSMENT_CHARS:
+        comment = comment[:MAX_ASSESSMENT_CHARS].rstrip() + "…"
+    recent = [_evidence_line(i + 1, entry) for i, entry in enumerate(reversed(deduper.entries))]
+
+    prompt = f"""Bạn là một AI chuyên đánh giá hoàn thành nhiệm vụ tự hoàn thiện.
+
+NHIỆM VỤ:
+Tiêu đề: {mission_title}
+Mô tả: {mission_description}
+Thời gian cam kết: {total_days} ngày
+
+ĐÁNH GIÁ TRƯỚC ĐÓ (trên {previous["watermark"]} bằng chứng đầu tiên):
+- Điểm: {assessment.get("overallScore")}/100 ({"PASS" if assessment.get("passedRequirements") else "FAIL"})
+- Nhận xét: {comment}
+Thống kê khi đó:
+{previous["stats"]}
+
+THỐNG KÊ HIỆN TẠI ({stats.approved}/{stats.total} bằng chứng đã được duyệt):
+{format_stats(stats)}
+
+BẰNG CHỨNG MỚI ĐƯỢC DUYỆT TỪ LẦN ĐÁNH GIÁ TRƯỚC:
+{chr(10).join(recent) or "Không có bằng chứng mới nào được duyệt"}
+
+Cập nhật đánh giá trước đó: giữ những nhận định vẫn đúng, điều chỉnh theo bằng chứng mới và thống kê hiện tại.
+
+{EVALUATION_INSTRUCTIONS}"""
+    return prompt if estimate_tokens(prompt) <= budget else None
+
+
+EVALUATION_INSTRUCTIONS = """YÊU CẦU:
+1. Đánh giá tổng thể mức độ hoàn thành nhiệm vụ (điểm 0-100)
+2. Nhận xét chi tiết về chất lượng thực hiện
+3. Quyết định PASS (≥70 điểm) hay FAIL (<70 điểm)
+
+Tiêu chí chấm điểm:
+- Số lượng bằng chứng so với thời gian cam kết
+- Chất lượng bằng chứng (độ tin cậy AI)
+- Tính nhất quán và kiên trì
+- Mức độ đạt mục tiêu ban đầu
+
+Trả về JSON theo format:
+{
+  "overallScore": số từ 0-100,
+  "aiAssessment": "nhận xét chi tiết 2-3 câu",
+  "passedRequirements": true hoặc false
+}"""
@@ -0,0 +1,322 @@
+"""
+Mission Store
+Bản chiếu SQLite của trạng thái MissionContract, do indexer cập nhật
+"""
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "missions.db")
+
+MISSION_FIELDS = [
+    "id",
+    "creator",
+    "title",
+    "description",
+    "reward",
+    "deadline",
+    "category",
+    "status",
+    "assignee",
+    "created_at",
+    "completed_at",
+]
+
+# Columns a non-creation event may update
+EVENT_COLUMNS = ("status", "assignee", "proof", "completed_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS missions (
+    id INTEGER PRIMARY KEY,
+    creator TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    reward INTEGER NOT NULL DEFAULT 0,
+    deadline INTEGER NOT NULL DEFAULT 0,
+    category TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'PENDING',
+    assignee TEXT NOT NULL DEFAULT '',
+    created_at INTEGER NOT NULL DEFAULT 0,
+    completed_at INTEGER NOT NULL DEFAULT 0,
+    proof TEXT NOT NULL DEFAULT '',
+    updated_height INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_missions_creator_id ON missions (creator, id);
+CREATE INDEX IF NOT EXISTS idx_missions_assignee_id ON missions (assignee, id);
+CREATE INDEX IF NOT EXISTS idx_missions_status_id ON missions (status, id);
+CREATE INDEX IF NOT EXISTS idx_missions_category_id ON missions (category, id);
+CREATE INDEX IF NOT EXISTS idx_missions_deadline ON missions (deadline);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class MissionStore:
+    """
+    Local SQLite projection of on-chain missions
+
+    The indexer is the only writer; the API reads from it. WAL mode lets a
+    standalone indexer process and the API workers share the same file.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def _row_to_mission(row: sqlite3.Row) -> Dict[str, Any]:
+        mission = {field: row[field] for field in MISSION_FIELDS}
+        mission["proof"] = row["proof"]
+        return mission
+
+    # ========== Writes (indexer) ==========
+
+    def upsert_missions(self, missions: Iterable[Dict[str, Any]], height: int):
+        """
+        Insert or replace missions as read from the chain at a block height
+
+        Proofs are kept unless the new record carries one.
+        """
+        rows = [
+            (
+                int(m["id"]),
+                str(m.get("creator") or ""),
+                str(m.get("title") or ""),
+                str(m.get("description") or ""),
+                int(m.get("reward") or 0),
+                int(m.get("deadline") or 0),
+                str(m.get("category") or ""),
+                str(m.get("status") or "PENDING"),
+                str(m.get("assignee") or ""),
+                int(m.get("created_at") or 0),
+                int(m.get("completed_at") or 0),
+                str(m.get("proof") or ""),
+                height,
+            )
+            for m in missions
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO missions (
+                        id, creator, title, description, reward, deadline, category,
+                        status, assignee, created_at, completed_at, proof, updated_height
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        creator = excluded.creator,
+                        title = excluded.title,
+                        description = excluded.description,
+                        reward = excluded.reward,
+                        deadline = excluded.deadline,
+                        category = excluded.category,
+                        status = excluded.status,
+                        assignee = excluded.assignee,
+                        created_at = excluded.created_at,
+                        completed_at = excluded.completed_at,
+                        proof = CASE WHEN excluded.proof != '' THEN excluded.proof ELSE missions.proof END,
+                        updated_height = excluded.updated_height
+                    """,
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def apply_events(self, events: Iterable[Dict[str, Any]], height: int) -> List[int]:
+        """
+        Apply decoded MissionContract events in order
+
+        MissionCreated inserts the full record; the other events update only
+        the columns they carry (status, assignee, proof, completed_at).
+
+        Returns:
+            IDs of missions an update event referred to but the store does
+            not have (the caller should re-read them from the chain)
+        """
+        missing: List[int] = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for event in events:
+                    mission_id = int(event["mission_id"])
+                    if event["event"] == "MissionCreated":
+                        self._conn.execute(
+                            """
+                            INSERT INTO missions (
+                                id, creator, title, description, reward, deadline, category,
+                                status, created_at, updated_height
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT (id) DO UPDATE SET
+                                creator = excluded.creator,
+                                title = excluded.title,
+                                description = excluded.description,
+                                reward = excluded.reward,
+                                deadline = excluded.deadline,
+                                category = excluded.category,
+                                status = excluded.status,
+                                created_at = excluded.created_at,
+                                updated_height = excluded.updated_height
+                            """,
+                            (
+                                mission_id,
+                                str(event.get("creator") or ""),
+                                str(event.get("title") or ""),
+                                str(event.get("description") or ""),
+                                int(event.get("reward") or 0),
+                                int(event.get("deadline") or 0),
+                                str(event.get("category") or ""),
+                                str(event.get("status") or "PENDING"),
+                                int(event.get("created_at") or 0),
+                                height,
+                            )
+                        )
+                        continue
+
+                    columns = [field for field in EVENT_COLUMNS if field in event]
+                    assignments = ", ".join(f"{column} = ?" for column in columns + ["updated_height"])
+                    cursor = self._conn.execute(
+                        f"UPDATE missions SET {assignments} WHERE id = ?",
+                        [event[column] for column in columns] + [height, mission_id]
+                    )
+                    if cursor.rowcount == 0 and mission_id not in missing:
+                        missing.append(mission_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return missing
+
+    def set_proof(self, mission_id: int, proof: str):
+        with self._lock:
+            self._conn.execute("UPDATE missions SET proof = ? WHERE id = ?", (proof, mission_id))
+
+    def set_indexed_height(self, height: int):
+        """Record the last block fully applied to the projection"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('indexed_height', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (str(height),)
+            )
+
+    # ========== Reads (API) ==========
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def get_indexed_height(self) -> int:
+        rows = self._query("SELECT value FROM meta WHERE key = 'indexed_height'")
+        return int(rows[0]["value"]) if rows else 0
+
+    def is_ready(self, tip: int, max_lag: int = 0) -> bool:
+        """
+        True once the indexer has completed its initial sync and trails the
+        chain tip by at most max_lag blocks; a projection that stopped
+        following the chain is not served
+        """
+        height = self.get_indexed_height()
+        return height > 0 and tip - height <= max_lag
+
+    def get_mission(self, mission_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT * FROM missions WHERE id = ?", (mission_id,))
+        return self._row_to_mission(rows[0]) if rows else None
+
+    def get_missions(self, mission_ids: List[int]) -> List[Dict[str, Any]]:
+        """Missions that exist, in the order of mission_ids"""
+        if not mission_ids:
+            return []
+        placeholders = ",".join("?" for _ in mission_ids)
+        rows = self._query(f"SELECT * FROM missions WHERE id IN ({placeholders})", mission_ids)
+        by_id = {row["id"]: self._row_to_mission(row) for row in rows}
+        return [by_id[mission_id] for mission_id in mission_ids if mission_id in by_id]
+
+    def get_user_mission_ids(self, user: str, offset: int = 0, limit: int = -1) -> List[int]:
+        """IDs of missions the user created or accepted (limit -1 = all)"""
+        rows = self._query(
+            "SELECT id FROM missions WHERE creator = ? "
+            "UNION SELECT id FROM missions WHERE assignee = ? ORDER BY id LIMIT ? OFFSET ?",
+            (user, user, limit, offset)
+        )
+        return [row["id"] for row in rows]
+
+    def list_missions(
+        self,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        creator: Optional[str] = None,
+        assignee: Optional[str] = None,
+        deadline_from: Optional[int] = None,
+        deadline_to: Optional[int] = None,
+        cursor: Optional[int] = None,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        One page of missions, newest first
+
+        Equality filters use the (column, id) indexes so each page is an
+        index range scan regardless of table size.
+
+        Args:
+            cursor: Return missions with id below this (from a previous page)
+            limit: Page size
+
+        Returns:
+            (missions, next cursor or None on the last page)
+        """
+        clauses = []
+        params: List[Any] = []
+        for column, value in (
+            ("status", status),
+            ("category", category),
+            ("creator", creator),
+            ("assignee", assignee),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if deadline_from is not None:
+            clauses.append("deadline >= ?")
+            params.append(deadline_from)
+        if deadline_to is not None:
+            clauses.append("deadline <= ?")
+            params.append(deadline_to)
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(
+            f"SELECT * FROM missions {where} ORDER BY id DESC LIMIT ?",
+            params + [limit + 1]
+        )
+
+        missions = [self._row_to_mission(row) for row in rows[:limit]]
+        next_cursor = missions[-1]["id"] if len(rows) > limit else None
+        return missions, next_cursor
+
+    def status_counts(self) -> Dict[str, int]:
+        rows = self._query("SELECT status, COUNT(*) AS n FROM missions GROUP BY status")
+        return {row["status"]: row["n"] for row in rows}
+
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM missions")[0][0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
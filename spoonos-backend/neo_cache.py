@@ -0,0 +1,116 @@
+"""
+NEO Read Cache
+Cache đọc theo (method, params) với TTL + LRU, tự xóa khi có block mới
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class BlockReadCache:
+    """
+    Read-through cache for chain queries
+
+    On-chain state only changes when a new block arrives, so every entry is
+    dropped as soon as a higher block height is observed. The TTL bounds
+    staleness between height observations, and the least recently used
+    entry is evicted once max_entries is reached.
+
+    Every invalidation bumps generation. A loader reads it before going to
+    the chain and passes it back to set(), so a result fetched before a new
+    block but returned after it is dropped instead of cached for a full TTL.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 15.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.block_height = 0
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_sets = 0
+
+    @staticmethod
+    def make_key(method: str, params: Any = None) -> Tuple[str, str]:
+        """Build a hashable key from an RPC-style method and its params"""
+        return (method, json.dumps(params, sort_keys=True, default=str))
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a key
+
+        Returns:
+            (hit, value) - value is None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Store a value
+
+        Args:
+            generation: self.generation when the value started loading; the
+                value is dropped if the cache was invalidated since
+        """
+        if self.max_entries <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            self.stale_sets += 1
+            return
+
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry, and any load still in flight"""
+        self.generation += 1
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+
+    def observe_block_height(self, height: int) -> bool:
+        """
+        Record a block height seen on the chain
+
+        Returns:
+            True if the height advanced and the cache was invalidated
+        """
+        if height <= self.block_height:
+            return False
+
+        self.block_height = height
+        self.invalidate()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "block_height": self.block_height,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale_sets": self.stale_sets
+        }
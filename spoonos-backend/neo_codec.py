@@ -0,0 +1,322 @@
+"""
+NEO Codec
+Dựng/giải mã script NeoVM và định dạng StdLib.serialize dùng bởi MissionContract
+"""
+import base64
+from typing import Any, Dict, List, Optional, Tuple
+
+# System.Contract.Call interop hash (little-endian in the script)
+SYSCALL_CONTRACT_CALL = bytes.fromhex("627d5b52")
+
+OP_PUSHINT8 = 0x00
+OP_PUSHINT256 = 0x05
+OP_PUSHT = 0x08
+OP_PUSHF = 0x09
+OP_PUSHNULL = 0x0B
+OP_PUSHDATA1 = 0x0C
+OP_PUSHDATA2 = 0x0D
+OP_PUSHDATA4 = 0x0E
+OP_PUSHM1 = 0x0F
+OP_PUSH0 = 0x10
+OP_PUSH16 = 0x20
+OP_SYSCALL = 0x41
+OP_PACK = 0xC0
+OP_NEWARRAY0 = 0xC2
+
+
+# BinarySerializer stack item types
+ITEM_ANY = 0x00
+ITEM_BOOLEAN = 0x20
+ITEM_INTEGER = 0x21
+ITEM_BYTESTRING = 0x28
+ITEM_BUFFER = 0x30
+ITEM_ARRAY = 0x40
+ITEM_STRUCT = 0x41
+ITEM_MAP = 0x48
+
+
+class ScriptDecodeError(Exception):
+    """Raised when a script uses opcodes outside the contract-call subset"""
+
+
+def contract_hash_bytes(contract_hash: str) -> bytes:
+    """Convert a 0x-prefixed big-endian contract hash to script byte order"""
+    return bytes.fromhex(contract_hash[2:] if contract_hash.startswith("0x") else contract_hash)[::-1]
+
+
+def decode_contract_calls(script: bytes, contract_hash: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Extract System.Contract.Call invocations from a transaction script
+
+    Only the instructions wallets emit for contract calls are understood
+    (pushes, PACK, SYSCALL). Decoding stops at the first other opcode and
+    returns the calls found so far.
+
+    Args:
+        script: Raw script bytes
+        contract_hash: Only return calls to this contract (0x-prefixed)
+
+    Returns:
+        List of {"contract": "0x...", "method": str, "args": list}
+    """
+    wanted = contract_hash_bytes(contract_hash) if contract_hash else None
+    stack: List[Any] = []
+    calls: List[Dict[str, Any]] = []
+    pos = 0
+
+    try:
+        while pos < len(script):
+            op = script[pos]
+            pos += 1
+
+            if OP_PUSHINT8 <= op <= OP_PUSHINT256:
+                size = 1 << op
+                stack.append(int.from_bytes(script[pos:pos + size], "little", signed=True))
+                pos += size
+            elif op == OP_PUSHT:
+                stack.append(True)
+            elif op == OP_PUSHF:
+                stack.append(False)
+            elif op == OP_PUSHNULL:
+                stack.append(None)
+            elif op in (OP_PUSHDATA1, OP_PUSHDATA2, OP_PUSHDATA4):
+                prefix = {OP_PUSHDATA1: 1, OP_PUSHDATA2: 2, OP_PUSHDATA4: 4}[op]
+                size = int.from_bytes(script[pos:pos + prefix], "little")
+                pos += prefix
+                stack.append(script[pos:pos + size])
+                pos += size
+            elif op == OP_PUSHM1:
+                stack.append(-1)
+            elif OP_PUSH0 <= op <= OP_PUSH16:
+                stack.append(op - OP_PUSH0)
+            elif op == OP_NEWARRAY0:
+                stack.append([])
+            elif op == OP_PACK:
+                count = stack.pop()
+                items = [stack.pop() for _ in range(count)]
+                stack.append(items)
+            elif op == OP_SYSCALL:
+                interop = script[pos:pos + 4]
+                pos += 4
+                if interop != SYSCALL_CONTRACT_CALL:
+                    raise ScriptDecodeError(f"Unsupported syscall {interop.hex()}")
+                target = stack.pop()
+                method = stack.pop()
+                stack.pop()  # call flags
+                args = stack.pop()
+                if wanted is None or target == wanted:
+                    calls.append({
+                        "contract": "0x" + bytes(target)[::-1].hex(),
+                        "method": bytes(method).decode("utf-8"),
+                        "args": args
+                    })
+                # The call's return value stays on the stack
+                stack.append(None)
+            else:
+                raise ScriptDecodeError(f"Unsupported opcode 0x{op:02x}")
+    except (ScriptDecodeError, IndexError, TypeError, UnicodeDecodeError):
+        pass
+
+    return calls
+
+
+# CallFlags.All, as wallets pass it for contract invocations
+CALL_FLAGS_ALL = 15
+
+
+def _emit_push(value: Any) -> bytes:
+    if value is None:
+        return bytes([OP_PUSHNULL])
+    if isinstance(value, bool):
+        return bytes([OP_PUSHT if value else OP_PUSHF])
+    if isinstance(value, int):
+        if value == -1:
+            return bytes([OP_PUSHM1])
+        if 0 <= value <= 16:
+            return bytes([OP_PUSH0 + value])
+        for op in range(OP_PUSHINT8, OP_PUSHINT256 + 1):
+            size = 1 << op
+            try:
+                return bytes([op]) + value.to_bytes(size, "little", signed=True)
+            except OverflowError:
+                continue
+        raise ValueError("Integer out of range")
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    if isinstance(value, (bytes, bytearray)):
+        size = len(value)
+        if size < 0x100:
+            return bytes([OP_PUSHDATA1, size]) + bytes(value)
+        if size < 0x10000:
+            return bytes([OP_PUSHDATA2]) + size.to_bytes(2, "little") + bytes(value)
+        return bytes([OP_PUSHDATA4]) + size.to_bytes(4, "little") + bytes(value)
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return bytes([OP_NEWARRAY0])
+        # PACK pops the first element first, so elements are pushed last to first
+        return b"".join(_emit_push(item) for item in reversed(value)) + _emit_push(len(value)) + bytes([OP_PACK])
+    raise TypeError(f"Cannot push {type(value).__name__}")
+
+
+def build_contract_call(contract_hash: str, method: str, args: List[Any], call_flags: int = CALL_FLAGS_ALL) -> bytes:
+    """
+    Script calling a contract method, as wallets build it (the inverse of
+    decode_contract_calls)
+
+    args use the Python values decode_contract_calls returns: int, bool,
+    None, bytes (Hash160 in script byte order) or str, and lists of those.
+    """
+    return (
+        _emit_push(list(args))
+        + _emit_push(call_flags)
+        + _emit_push(method)
+        + _emit_push(contract_hash_bytes(contract_hash))
+        + bytes([OP_SYSCALL])
+        + SYSCALL_CONTRACT_CALL
+    )
+
+
+def script_references(script: bytes, contract_hash: str) -> bool:
+    """Cheap pre-filter: does the script mention the contract at all"""
+    return contract_hash_bytes(contract_hash) in script
+
+
+def parse_stack_item(item: Optional[Dict[str, Any]]) -> Any:
+    """
+    Convert an RPC JSON stack item (invoke results, notification states)
+    into Python values
+
+    Integer -> int, Boolean -> bool, ByteString/Buffer -> bytes,
+    Array/Struct -> list, Map -> dict, Any/unknown -> None.
+    """
+    if not item:
+        return None
+
+    item_type = item.get("type")
+    value = item.get("value")
+    if item_type == "Integer":
+        return int(value)
+    if item_type == "Boolean":
+        return value is True or value == "true"
+    if item_type in ("ByteString", "Buffer"):
+        return base64.b64decode(value or "")
+    if item_type in ("Array", "Struct"):
+        return [parse_stack_item(sub) for sub in value or []]
+    if item_type == "Map":
+        return {parse_stack_item(entry["key"]): parse_stack_item(entry["value"]) for entry in value or []}
+    return None
+
+
+# ========== StdLib.serialize / deserialize ==========
+
+def _write_varint(value: int) -> bytes:
+    if value < 0xFD:
+        return bytes([value])
+    if value <= 0xFFFF:
+        return b"\xfd" + value.to_bytes(2, "little")
+    if value <= 0xFFFFFFFF:
+        return b"\xfe" + value.to_bytes(4, "little")
+    return b"\xff" + value.to_bytes(8, "little")
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    prefix = data[pos]
+    if prefix < 0xFD:
+        return prefix, pos + 1
+    size = {0xFD: 2, 0xFE: 4, 0xFF: 8}[prefix]
+    if pos + 1 + size > len(data):
+        raise ValueError("Truncated varint")
+    return int.from_bytes(data[pos + 1:pos + 1 + size], "little"), pos + 1 + size
+
+
+def _read_varbytes(data: bytes, pos: int) -> Tuple[bytes, int]:
+    size, pos = _read_varint(data, pos)
+    if pos + size > len(data):
+        raise ValueError("Truncated byte string")
+    return data[pos:pos + size], pos + size
+
+
+def _encode_int(value: int) -> bytes:
+    if value == 0:
+        return b""
+    size = ((value if value >= 0 else ~value).bit_length() + 8) // 8
+    return value.to_bytes(size, "little", signed=True)
+
+
+def serialize_stack_item(value: Any) -> bytes:
+    """
+    Encode a Python value the way StdLib.serialize encodes stack items
+
+    None -> Any, bool -> Boolean, int -> Integer, bytes/str -> ByteString,
+    list/tuple -> Array, dict -> Map.
+    """
+    if value is None:
+        return bytes([ITEM_ANY])
+    if isinstance(value, bool):
+        return bytes([ITEM_BOOLEAN, 1 if value else 0])
+    if isinstance(value, int):
+        encoded = _encode_int(value)
+        return bytes([ITEM_INTEGER]) + _write_varint(len(encoded)) + encoded
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    if isinstance(value, (bytes, bytearray)):
+        return bytes([ITEM_BYTESTRING]) + _write_varint(len(value)) + bytes(value)
+    if isinstance(value, (list, tuple)):
+        return bytes([ITEM_ARRAY]) + _write_varint(len(value)) + b"".join(
+            serialize_stack_item(item) for item in value
+        )
+    if isinstance(value, dict):
+        return bytes([ITEM_MAP]) + _write_varint(len(value)) + b"".join(
+            serialize_stack_item(k) + serialize_stack_item(v) for k, v in value.items()
+        )
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _deserialize(data: bytes, pos: int) -> Tuple[Any, int]:
+    item_type = data[pos]
+    pos += 1
+
+    if item_type == ITEM_ANY:
+        return None, pos
+    if item_type == ITEM_BOOLEAN:
+        return data[pos] != 0, pos + 1
+    if item_type == ITEM_INTEGER:
+        raw, pos = _read_varbytes(data, pos)
+        return int.from_bytes(raw, "little", signed=True), pos
+    if item_type in (ITEM_BYTESTRING, ITEM_BUFFER):
+        return _read_varbytes(data, pos)
+    if item_type in (ITEM_ARRAY, ITEM_STRUCT):
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _deserialize(data, pos)
+            items.append(item)
+        return items, pos
+    if item_type == ITEM_MAP:
+        count, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _deserialize(data, pos)
+            value, pos = _deserialize(data, pos)
+            result[key] = value
+        return result, pos
+
+    raise ValueError(f"Unsupported stack item type 0x{item_type:02x}")
+
+
+def deserialize_stack_item(data: bytes) -> Any:
+    """
+    Decode StdLib.serialize output into Python values
+
+    ByteStrings stay bytes; callers decide which fields are text.
+
+    Raises:
+        ValueError: On malformed or truncated input
+    """
+    try:
+        value, pos = _deserialize(data, 0)
+    except IndexError as e:
+        raise ValueError("Truncated stack item") from e
+    if pos != len(data):
+        raise ValueError("Trailing bytes after stack item")
+    return value
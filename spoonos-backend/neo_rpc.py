@@ -0,0 +1,446 @@
+"""
+NEO JSON-RPC Client
+Async client dùng connection pool keep-alive để gọi RPC đến NEO node
+"""
+import json
+import time
+import asyncio
+import logging
+import itertools
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# RPC methods without side effects; identical concurrent calls are coalesced
+READ_METHODS = frozenset({
+    "getblockcount",
+    "getblock",
+    "getblockhash",
+    "getapplicationlog",
+    "getcontractstate",
+    "getnep17balances",
+    "getversion",
+    "invokefunction",
+})
+
+
+class NeoRpcError(Exception):
+    """Raised when a NEO node returns an error or cannot be reached"""
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls into one
+
+    The first caller for a key starts the work; callers arriving while it
+    is in flight await the same task and share its result or exception.
+    The task is shielded so one caller being cancelled does not cancel
+    the call for everyone else.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.executed += 1
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "shared": self.shared
+        }
+
+
+def call_key(method: str, params: Any) -> Tuple[str, str]:
+    """Hashable identity of an RPC call"""
+    return (method, json.dumps(params, sort_keys=True, default=str))
+
+
+def build_batch(calls: Sequence[Tuple[str, List]], next_id) -> List[Dict[str, Any]]:
+    """Build a JSON-RPC batch array, giving every call its own id"""
+    return [
+        {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params if params is not None else [],
+            "id": next_id()
+        }
+        for method, params in calls
+    ]
+
+
+def demux_batch(payload: List[Dict[str, Any]], data: Any, return_exceptions: bool = False) -> List[Any]:
+    """
+    Match batch responses back to their requests by id
+
+    Nodes may answer a batch in any order, so results are re-ordered to
+    follow the request list. Missing or failed entries raise NeoRpcError,
+    or are returned in place when return_exceptions is True.
+    """
+    if not isinstance(data, list):
+        # A node that rejects the whole batch answers with a single error object
+        if isinstance(data, dict) and "error" in data:
+            raise NeoRpcError(f"RPC Error: {data['error']}")
+        raise NeoRpcError("RPC Error: batch response is not an array")
+
+    by_id = {item.get("id"): item for item in data if isinstance(item, dict)}
+    results = []
+    for request in payload:
+        item = by_id.get(request["id"])
+        if item is None:
+            error = NeoRpcError(f"RPC Error: no response for {request['method']} (id {request['id']})")
+        elif "result" in item:
+            results.append(item["result"])
+            continue
+        else:
+            error = NeoRpcError(f"RPC Error: {item.get('error')}")
+
+        if not return_exceptions:
+            raise error
+        results.append(error)
+
+    return results
+
+
+@dataclass
+class RpcEndpoint:
+    """Health and latency state for one seed node"""
+    url: str
+    latency: Optional[float] = None  # EWMA of round-trip time, seconds
+    block_height: int = 0
+    healthy: bool = True
+    lagging: bool = False
+    failures: int = 0
+    last_checked: float = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and not self.lagging
+
+    def record_success(self, elapsed: float):
+        self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+        self.failures = 0
+        self.healthy = True
+
+    def record_failure(self):
+        self.failures += 1
+        self.healthy = False
+
+
+class NeoRpcClient:
+    """
+    Asyncio-native JSON-RPC client cho NEO node
+
+    Một httpx.AsyncClient được giữ suốt vòng đời process để tái sử dụng
+    kết nối TCP/TLS; số request đồng thời bị giới hạn bởi semaphore.
+    Khi có nhiều seed node, mỗi lời gọi đi tới node khỏe có latency thấp
+    nhất và tự chuyển sang node kế tiếp khi timeout hoặc lỗi mạng.
+    """
+
+    def __init__(
+        self,
+        rpc_urls: Union[str, List[str]],
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        max_concurrency: int = 32,
+        max_block_lag: int = 5
+    ):
+        if isinstance(rpc_urls, str):
+            rpc_urls = [rpc_urls]
+        if not rpc_urls:
+            raise ValueError("At least one RPC URL is required")
+
+        self.endpoints = [RpcEndpoint(url) for url in dict.fromkeys(rpc_urls)]
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.max_concurrency = max_concurrency
+        self.max_block_lag = max_block_lag
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._ids = itertools.count(1)
+        self._health_task: Optional[asyncio.Task] = None
+        self._height_listeners: List[Callable[[int], Any]] = []
+        self.flights = SingleFlight()
+
+    @property
+    def rpc_url(self) -> str:
+        """URL of the currently preferred endpoint"""
+        return self.ranked_endpoints()[0].url
+
+    def ranked_endpoints(self) -> List[RpcEndpoint]:
+        """
+        Endpoints in the order calls should try them
+
+        Available nodes come first, fastest first; nodes never measured sort
+        after measured ones, and unhealthy or lagging nodes are kept as a
+        last resort.
+        """
+        def key(endpoint: RpcEndpoint):
+            return (
+                not endpoint.available,
+                endpoint.latency is None,
+                endpoint.latency or 0.0,
+                endpoint.failures
+            )
+        return sorted(self.endpoints, key=key)
+
+    def endpoint_status(self) -> List[Dict[str, Any]]:
+        """Snapshot of endpoint health for status reporting"""
+        return [
+            {
+                "url": endpoint.url,
+                "healthy": endpoint.healthy,
+                "lagging": endpoint.lagging,
+                "latency_ms": round(endpoint.latency * 1000, 1) if endpoint.latency is not None else None,
+                "block_height": endpoint.block_height,
+                "failures": endpoint.failures
+            }
+            for endpoint in self.ranked_endpoints()
+        ]
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Lazily create the pooled HTTP client inside the running loop"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=30.0
+                ),
+                headers={"Content-Type": "application/json"}
+            )
+        return self._client
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def next_id(self) -> int:
+        """Return a process-unique JSON-RPC request id"""
+        return next(self._ids)
+
+    async def _post(self, payload: Any, timeout: Optional[float] = None) -> Any:
+        """
+        POST a JSON-RPC payload and return the decoded body
+
+        Args:
+            payload: Request object (or list of request objects)
+            timeout: Per-call timeout in seconds (default: client timeout)
+
+        Returns:
+            Decoded JSON response
+        """
+        call_timeout = timeout if timeout is not None else self.timeout
+        last_error: Optional[NeoRpcError] = None
+
+        async with self._get_semaphore():
+            for endpoint in self.ranked_endpoints():
+                try:
+                    return await self._post_to(endpoint, payload, call_timeout)
+                except NeoRpcError as e:
+                    # Fail over to the next node
+                    last_error = e
+
+        raise last_error
+
+    async def _post_to(self, endpoint: RpcEndpoint, payload: Any, timeout: float) -> Any:
+        """POST to a single endpoint, updating its health state"""
+        client = self._get_client()
+        started = time.monotonic()
+
+        try:
+            response = await client.post(endpoint.url, json=payload, timeout=timeout)
+        except httpx.TimeoutException as e:
+            endpoint.record_failure()
+            raise NeoRpcError(f"RPC timeout after {timeout}s ({endpoint.url}): {e}") from e
+        except httpx.HTTPError as e:
+            endpoint.record_failure()
+            raise NeoRpcError(f"RPC call failed ({endpoint.url}): {e}") from e
+
+        if response.status_code != 200:
+            endpoint.record_failure()
+            raise NeoRpcError(f"HTTP Error: {response.status_code} ({endpoint.url})")
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            # An HTML error page or truncated body from a proxy in front of the node
+            endpoint.record_failure()
+            raise NeoRpcError(f"RPC response is not JSON ({endpoint.url}): {e}") from e
+
+        endpoint.record_success(time.monotonic() - started)
+        return data
+
+    @staticmethod
+    def _unwrap(data: Dict[str, Any]) -> Any:
+        if "result" in data:
+            return data["result"]
+        if "error" in data:
+            raise NeoRpcError(f"RPC Error: {data['error']}")
+        raise NeoRpcError("RPC Error: response has neither result nor error")
+
+    async def call(self, method: str, params: List = None, timeout: Optional[float] = None) -> Any:
+        """
+        Make an RPC call to the NEO node
+
+        Args:
+            method: RPC method name
+            params: Method parameters
+            timeout: Per-call timeout in seconds
+
+        Returns:
+            RPC result
+        """
+        params = params if params is not None else []
+
+        async def send():
+            payload = {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params,
+                "id": self.next_id()
+            }
+            data = await self._post(payload, timeout)
+            return self._unwrap(data)
+
+        if method not in READ_METHODS:
+            return await send()
+        return await self.flights.do(call_key(method, params), send)
+
+    async def batch(
+        self,
+        calls: Sequence[Tuple[str, List]],
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Send several RPC calls in one HTTP request
+
+        Args:
+            calls: List of (method, params) tuples
+            timeout: Per-request timeout in seconds
+            return_exceptions: Return NeoRpcError in place of failed items
+                instead of raising
+
+        Returns:
+            Results in the same order as calls
+        """
+        if not calls:
+            return []
+
+        async def send():
+            payload = build_batch(calls, self.next_id)
+            data = await self._post(payload, timeout)
+            return demux_batch(payload, data, return_exceptions=True)
+
+        if all(method in READ_METHODS for method, _ in calls):
+            key = ("batch",) + tuple(call_key(method, params) for method, params in calls)
+            results = await self.flights.do(key, send)
+        else:
+            results = await send()
+
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, NeoRpcError):
+                    raise result
+        return results
+
+    # ========== Health checks ==========
+
+    def add_height_listener(self, listener: Callable[[int], Any]):
+        """Call listener(height) whenever a probe sees a block height"""
+        self._height_listeners.append(listener)
+
+    async def _probe(self, endpoint: RpcEndpoint, timeout: float):
+        payload = {"jsonrpc": "2.0", "method": "getblockcount", "params": [], "id": self.next_id()}
+        endpoint.last_checked = time.time()
+        try:
+            data = await self._post_to(endpoint, payload, timeout)
+        except NeoRpcError:
+            # _post_to already marked the node as failed
+            return
+
+        try:
+            endpoint.block_height = int(self._unwrap(data))
+        except (NeoRpcError, TypeError, ValueError):
+            endpoint.record_failure()
+
+    async def check_health(self, timeout: float = 5.0) -> List[Dict[str, Any]]:
+        """
+        Probe every endpoint with getblockcount
+
+        Nodes that fail, time out, or trail the best known height by more
+        than max_block_lag blocks are marked unhealthy.
+
+        Returns:
+            Endpoint status after the probe
+        """
+        await asyncio.gather(*(self._probe(endpoint, timeout) for endpoint in self.endpoints))
+
+        best_height = max((endpoint.block_height for endpoint in self.endpoints), default=0)
+        for endpoint in self.endpoints:
+            endpoint.lagging = best_height - endpoint.block_height > self.max_block_lag
+
+        if best_height:
+            for listener in self._height_listeners:
+                listener(best_height)
+
+        return self.endpoint_status()
+
+    async def _health_loop(self, interval: float):
+        while True:
+            try:
+                await self.check_health(timeout=min(self.timeout, interval))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # One bad round (e.g. a failing height listener) must not stop later probes
+                logger.warning("NEO health check failed: %s", e)
+            await asyncio.sleep(interval)
+
+    def start_health_checks(self, interval: float = 15.0):
+        """Run check_health in the background every interval seconds"""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop(interval))
+
+    async def stop_health_checks(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    async def aclose(self):
+        """Close pooled connections (call on application shutdown)"""
+        await self.stop_health_checks()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
@@ -4,23 +4,314 @@ Service layer để tương tác với NEO smart contracts
 """
 import os
 import json
+import base64
+import time
+import hashlib
 import requests
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dotenv import load_dotenv
+from neo_rpc import NeoRpcClient, build_batch, demux_batch
+from neo_cache import BlockReadCache
+from neo_codec import deserialize_stack_item, parse_stack_item
 
 load_dotenv()
 
+GAS_HASH = "0xd2a4cff31913016155e38e474a2c06d08be276cf"
+NEO_HASH = "0xef4073a0f2b305a38ec4050e4d3d28bc40ea63f5"
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+
+DEFAULT_RPC_URLS = [
+    "http://seed1t5.neo.org:20332",
+    "https://testnet1.neo.org:443",
+    "https://testnet2.neo.org:443",
+]
+
+# MissionContract status codes
+STATUS_NAMES = {
+    0: "PENDING",
+    1: "IN_PROGRESS",
+    2: "COMPLETED",
+    3: "VERIFIED",
+    4: "CANCELLED",
+}
+STATUS_CODES = {name: code for code, name in STATUS_NAMES.items()}
+
+# Field order of a serialized mission (FIELD_* in MissionContract.py)
+MISSION_LAYOUT = [
+    "id",
+    "creator",
+    "title",
+    "description",
+    "reward",
+    "deadline",
+    "category",
+    "status",
+    "assignee",
+    "created_at",
+    "completed_at",
+]
+MISSION_TEXT_FIELDS = ("title", "description", "category")
+
+# Contract-side cap for paginated reads (MAX_PAGE_SIZE in MissionContract.py)
+MAX_PAGE_SIZE = 100
+
+# Contract-side cap for batch writes (MAX_BATCH_SIZE in MissionContract.py)
+MAX_BATCH_SIZE = 20
+
+# MissionContract events: name -> field order of the notification state
+# (CreateNewEvent declarations in MissionContract.py)
+MISSION_EVENTS = {
+    "MissionCreated": [
+        "mission_id",
+        "creator",
+        "title",
+        "description",
+        "reward",
+        "deadline",
+        "category",
+        "created_at",
+    ],
+    "MissionAccepted": ["mission_id", "assignee"],
+    "MissionCompleted": ["mission_id", "assignee", "proof", "completed_at"],
+    "MissionVerified": ["mission_id", "verifier", "approved", "status"],
+    "MissionCancelled": ["mission_id", "creator"],
+}
+# Status a mission is in after each event (MissionVerified carries its own)
+MISSION_EVENT_STATUS = {
+    "MissionCreated": "PENDING",
+    "MissionAccepted": "IN_PROGRESS",
+    "MissionCompleted": "COMPLETED",
+    "MissionCancelled": "CANCELLED",
+}
+MISSION_EVENT_TEXT_FIELDS = ("title", "description", "category", "proof")
+
+MOCK_USER_MISSIONS = [1, 2, 3, 5, 7]
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def address_to_script_hash(address: str) -> str:
+    """
+    Convert a NEO N3 address to its script hash (0x-prefixed, big-endian)
+    
+    Args:
+        address: Base58Check NEO address
+        
+    Returns:
+        Script hash string accepted by Hash160 contract parameters
+    """
+    num = 0
+    for char in address:
+        digit = BASE58_ALPHABET.find(char)
+        if digit < 0:
+            raise ValueError(f"Invalid NEO address: {address}")
+        num = num * 58 + digit
+    if num.bit_length() > 200:
+        raise ValueError(f"Invalid NEO address: {address}")
+    raw = num.to_bytes(25, "big")
+    payload, checksum = raw[:-4], raw[-4:]
+    if hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        raise ValueError(f"Invalid NEO address: {address}")
+    return "0x" + payload[1:][::-1].hex()
+
+
+def load_rpc_urls() -> List[str]:
+    """
+    Resolve the list of seed nodes to use
+    
+    NEO_RPC_URLS (comma-separated) wins outright. Otherwise NEO_RPC_URL is
+    tried first, followed by config.json's neo_config and the defaults.
+    """
+    env_urls = os.getenv("NEO_RPC_URLS", "")
+    if env_urls.strip():
+        return [url.strip() for url in env_urls.split(",") if url.strip()]
+    
+    urls = []
+    if os.getenv("NEO_RPC_URL"):
+        urls.append(os.getenv("NEO_RPC_URL"))
+    
+    try:
+        with open(CONFIG_PATH, encoding="utf-8") as f:
+            neo_config = json.load(f).get("neo_config", {})
+        urls.extend(neo_config.get("rpc_urls", []))
+        if neo_config.get("rpc_url"):
+            urls.append(neo_config["rpc_url"])
+    except (OSError, ValueError):
+        pass
+    
+    urls.extend(DEFAULT_RPC_URLS)
+    return list(dict.fromkeys(urls))
+
+
+def to_script_hash(user: str) -> str:
+    """Script hash for an address; values that are not addresses pass through"""
+    try:
+        return address_to_script_hash(user)
+    except ValueError:
+        return user
+
+
+def normalize_mission(mission: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert raw contract fields to API form
+    
+    UInt160 fields become 0x-prefixed script hashes and numeric status
+    codes become their names.
+    """
+    normalized = dict(mission)
+    for field in ("creator", "assignee"):
+        value = normalized.get(field)
+        if isinstance(value, (bytes, bytearray)):
+            normalized[field] = "0x" + bytes(value)[::-1].hex() if value else ""
+    if isinstance(normalized.get("status"), int):
+        normalized["status"] = STATUS_NAMES.get(normalized["status"], str(normalized["status"]))
+    return normalized
+
+
+def decode_mission(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decode a mission record stored by MissionContract
+    
+    Args:
+        data: StdLib.serialize bytes of the fixed-layout mission list
+        
+    Returns:
+        Normalized mission dict, or None for empty/malformed data
+    """
+    if not data:
+        return None
+    
+    try:
+        fields = deserialize_stack_item(data)
+    except ValueError:
+        return None
+    if not isinstance(fields, list) or len(fields) < len(MISSION_LAYOUT):
+        return None
+    
+    mission = dict(zip(MISSION_LAYOUT, fields))
+    for field in MISSION_TEXT_FIELDS:
+        if isinstance(mission[field], bytes):
+            mission[field] = mission[field].decode("utf-8", errors="replace")
+    for field in ("id", "reward", "deadline", "status", "created_at", "completed_at"):
+        # Integers that went through a ByteString round-trip come back as bytes
+        if isinstance(mission[field], bytes):
+            mission[field] = int.from_bytes(mission[field], "little", signed=True)
+    return normalize_mission(mission)
+
+
+def decode_mission_events(application_log: Dict[str, Any], contract_hash: str) -> List[Dict[str, Any]]:
+    """
+    Extract MissionContract events from a getapplicationlog result
+    
+    Only HALTed executions count - notifications of faulted transactions
+    are rolled back on chain.
+    
+    Args:
+        application_log: getapplicationlog result for one transaction
+        contract_hash: MissionContract hash (0x-prefixed)
+        
+    Returns:
+        List of {"event", "tx_hash", <event fields>} in emission order, with
+        addresses as 0x script hashes and "status" as a status name
+    """
+    contract_hash = contract_hash.lower()
+    events = []
+    
+    for execution in application_log.get("executions", []):
+        if execution.get("vmstate") != "HALT":
+            continue
+        for notification in execution.get("notifications", []):
+            name = notification.get("eventname")
+            layout = MISSION_EVENTS.get(name)
+            if layout is None or notification.get("contract", "").lower() != contract_hash:
+                continue
+            
+            values = parse_stack_item(notification.get("state"))
+            if not isinstance(values, list) or len(values) < len(layout):
+                continue
+            
+            event = dict(zip(layout, values))
+            for field in MISSION_EVENT_TEXT_FIELDS:
+                if isinstance(event.get(field), bytes):
+                    event[field] = event[field].decode("utf-8", errors="replace")
+            for field in ("creator", "assignee", "verifier"):
+                if isinstance(event.get(field), bytes):
+                    event[field] = "0x" + event[field][::-1].hex() if event[field] else ""
+            if isinstance(event.get("status"), int):
+                event["status"] = STATUS_NAMES.get(event["status"], str(event["status"]))
+            else:
+                event["status"] = MISSION_EVENT_STATUS[name]
+            
+            events.append({"event": name, "tx_hash": application_log.get("txid"), **event})
+    
+    return events
+
 
 class NeoService:
     """
     Service để tương tác với NEO blockchain
     """
     
-    def __init__(self):
-        self.rpc_url = os.getenv("NEO_RPC_URL", "http://seed1t5.neo.org:20332")
+    def __init__(self, rpc_urls: Optional[List[str]] = None):
         self.wallet_address = os.getenv("NEO_WALLET_ADDRESS", "")
         self.private_key = os.getenv("NEO_WALLET_PRIVATE_KEY", "")
         self.mission_contract = os.getenv("NEO_MISSION_CONTRACT", "")
+        self.rpc = NeoRpcClient(
+            rpc_urls or load_rpc_urls(),
+            timeout=float(os.getenv("NEO_RPC_TIMEOUT", "10")),
+            max_connections=int(os.getenv("NEO_RPC_MAX_CONNECTIONS", "20")),
+            max_concurrency=int(os.getenv("NEO_RPC_MAX_CONCURRENCY", "32")),
+            max_block_lag=int(os.getenv("NEO_RPC_MAX_BLOCK_LAG", "5"))
+        )
+        self.cache = BlockReadCache(
+            max_entries=int(os.getenv("NEO_CACHE_MAX_ENTRIES", "1024")),
+            ttl=float(os.getenv("NEO_CACHE_TTL", "15"))
+        )
+        # Health probes see every new block first
+        self.rpc.add_height_listener(self.cache.observe_block_height)
+    
+    @property
+    def rpc_url(self) -> str:
+        """Currently preferred seed node"""
+        return self.rpc.rpc_url
+    
+    def _post_sync(self, payload: Any) -> Any:
+        """
+        POST a JSON-RPC payload with blocking requests, failing over
+        across seed nodes in the same order as the async client
+        """
+        last_error = None
+        for endpoint in self.rpc.ranked_endpoints():
+            started = time.monotonic()
+            try:
+                response = requests.post(
+                    endpoint.url,
+                    json=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=self.rpc.timeout
+                )
+            except requests.RequestException as e:
+                endpoint.record_failure()
+                last_error = e
+                continue
+            
+            if response.status_code != 200:
+                endpoint.record_failure()
+                last_error = Exception(f"HTTP Error: {response.status_code}")
+                continue
+            
+            try:
+                data = response.json()
+            except ValueError as e:
+                endpoint.record_failure()
+                last_error = Exception(f"RPC response is not JSON: {e}")
+                continue
+            
+            endpoint.record_success(time.monotonic() - started)
+            return data
+        
+        raise Exception(f"RPC call failed: {last_error}")
         
     def _rpc_call(self, method: str, params: List = None) -> Dict[str, Any]:
         """
@@ -40,28 +331,31 @@ class NeoService:
             "jsonrpc": "2.0",
             "method": method,
             "params": params,
-            "id": 1
+            "id": self.rpc.next_id()
         }
         
-        try:
-            response = requests.post(
-                self.rpc_url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "result" in data:
-                    return data["result"]
-                elif "error" in data:
-                    raise Exception(f"RPC Error: {data['error']}")
-            
-            raise Exception(f"HTTP Error: {response.status_code}")
+        data = self._post_sync(payload)
+        if "result" in data:
+            return data["result"]
+        
+        raise Exception(f"RPC call failed: RPC Error: {data.get('error')}")
+    
+    def _rpc_batch(self, calls: List[Tuple[str, List]], return_exceptions: bool = False) -> List[Any]:
+        """
+        Send several RPC calls in a single HTTP request
+        
+        Args:
+            calls: List of (method, params) tuples
+            return_exceptions: Return errors in place instead of raising
             
-        except Exception as e:
-            raise Exception(f"RPC call failed: {e}")
+        Returns:
+            Results in the same order as calls
+        """
+        if not calls:
+            return []
+        
+        payload = build_batch(calls, self.rpc.next_id)
+        return demux_batch(payload, self._post_sync(payload), return_exceptions)
     
     def get_block_count(self) -> int:
         """Get current block height"""
@@ -81,7 +375,11 @@ class NeoService:
             address = self.wallet_address
             
         result = self._rpc_call("getnep17balances", [address])
-        
+        return self._parse_balances(result)
+    
+    @staticmethod
+    def _parse_balances(result: Dict[str, Any]) -> Dict[str, float]:
+        """Extract GAS/NEO amounts from a getnep17balances result"""
         balances = {"GAS": 0.0, "NEO": 0.0}
         
         if "balance" in result:
@@ -90,10 +388,10 @@ class NeoService:
                 amount = int(balance.get("amount", 0)) / 100000000
                 
                 # GAS token
-                if asset_hash == "0xd2a4cff31913016155e38e474a2c06d08be276cf":
+                if asset_hash == GAS_HASH:
                     balances["GAS"] = amount
                 # NEO token
-                elif asset_hash == "0xef4073a0f2b305a38ec4050e4d3d28bc40ea63f5":
+                elif asset_hash == NEO_HASH:
                     balances["NEO"] = amount
         
         return balances
@@ -120,12 +418,93 @@ class NeoService:
         ]
         
         result = self._rpc_call("invokefunction", invoke_params)
-        
+        return self._first_stack_item(result)
+    
+    @staticmethod
+    def _first_stack_item(result: Dict[str, Any]) -> Any:
         if "stack" in result and len(result["stack"]) > 0:
             return result["stack"][0]
         
         return None
     
+    def _invoke_call(self, operation: str, params: List = None) -> Tuple[str, List]:
+        """Build an invokefunction (method, params) pair for the mission contract"""
+        return ("invokefunction", [self.mission_contract, operation, params or []])
+    
+    @staticmethod
+    def _decode_mission(stack_item: Any) -> Optional[Dict[str, Any]]:
+        """
+        Decode a get_mission stack item into a mission dict
+        
+        The contract returns the raw serialized record as a base64
+        ByteString (see decode_mission).
+        """
+        if not stack_item or stack_item.get("type") not in ("ByteString", "Buffer"):
+            return None
+        
+        return decode_mission(base64.b64decode(stack_item.get("value", "")))
+    
+    @staticmethod
+    def _decode_int(stack_item: Any) -> int:
+        if not stack_item or stack_item.get("type") != "Integer":
+            return 0
+        return int(stack_item.get("value", 0))
+    
+    @staticmethod
+    def _decode_id_list(stack_item: Any) -> List[int]:
+        """Decode an Array-of-Integer stack item (paginated ID reads)"""
+        if not stack_item or stack_item.get("type") != "Array":
+            return []
+        
+        return [
+            int(item.get("value", 0))
+            for item in stack_item.get("value", [])
+            if item.get("type") == "Integer"
+        ]
+    
+    @staticmethod
+    def _page_params(offset: int, limit: int) -> List[Dict[str, str]]:
+        return [
+            {"type": "Integer", "value": str(max(0, offset))},
+            {"type": "Integer", "value": str(max(0, min(limit, MAX_PAGE_SIZE)))}
+        ]
+    
+    @staticmethod
+    def _status_code(status: Any) -> int:
+        """Accept a status name ("COMPLETED") or code (2)"""
+        if isinstance(status, str) and not status.isdigit():
+            if status.upper() not in STATUS_CODES:
+                raise ValueError(f"Unknown mission status: {status}")
+            return STATUS_CODES[status.upper()]
+        return int(status)
+    
+    def _status_count_calls(self) -> List[Tuple[str, List]]:
+        return [
+            self._invoke_call("get_status_count", [{"type": "Integer", "value": str(code)}])
+            for code in STATUS_NAMES
+        ]
+    
+    def _decode_status_counts(self, results: List[Any]) -> Dict[str, int]:
+        return {
+            STATUS_NAMES[code]: self._decode_int(self._first_stack_item(result))
+            for code, result in zip(STATUS_NAMES, results)
+        }
+    
+    def _mock_mission(self, mission_id: int) -> Dict[str, Any]:
+        return {
+            "id": mission_id,
+            "creator": self.wallet_address,
+            "title": f"Mission #{mission_id}",
+            "description": "Complete this awesome mission!",
+            "reward": 5,
+            "deadline": 1700000000,
+            "category": "fitness",
+            "status": "PENDING",
+            "assignee": "",
+            "created_at": 1699000000,
+            "completed_at": 0
+        }
+    
     # ========== Mission Contract Methods ==========
     
     def create_mission(
@@ -173,6 +552,42 @@ class NeoService:
             }
         }
     
+    def create_missions_batch(self, creator: str, missions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create several missions in one transaction (create_missions_batch)
+        
+        Args:
+            creator: Creator address
+            missions: Dicts with title, description, reward_amount, deadline, category
+            
+        Returns:
+            Transaction info with the new mission_ids, in input order
+        """
+        # For now, return mock data until contract is deployed
+        # TODO: Replace with actual contract invocation
+        
+        mission_ids = list(range(1, len(missions) + 1))  # Mock IDs
+        
+        return {
+            "success": True,
+            "mission_ids": mission_ids,
+            "tx_hash": "0xmock_batch_transaction_hash",
+            "message": f"{len(missions)} missions created successfully (mock)",
+            "data": [
+                {
+                    "id": mission_id,
+                    "creator": creator,
+                    "title": mission["title"],
+                    "description": mission["description"],
+                    "reward": mission["reward_amount"],
+                    "deadline": mission["deadline"],
+                    "category": mission["category"],
+                    "status": "PENDING"
+                }
+                for mission_id, mission in zip(mission_ids, missions)
+            ]
+        }
+    
     def get_mission(self, mission_id: int) -> Optional[Dict[str, Any]]:
         """
         Get mission details from blockchain
@@ -184,21 +599,15 @@ class NeoService:
             Mission data or None
         """
         # Mock data until contract deployed
-        # TODO: Replace with actual contract call
+        if not self.mission_contract:
+            return self._mock_mission(mission_id)
         
-        return {
-            "id": mission_id,
-            "creator": self.wallet_address,
-            "title": f"Mission #{mission_id}",
-            "description": "Complete this awesome mission!",
-            "reward": 5,
-            "deadline": 1700000000,
-            "category": "fitness",
-            "status": "PENDING",
-            "assignee": "",
-            "created_at": 1699000000,
-            "completed_at": 0
-        }
+        item = self.invoke_contract_read(
+            self.mission_contract,
+            "get_mission",
+            [{"type": "Integer", "value": str(mission_id)}]
+        )
+        return self._decode_mission(item)
     
     def accept_mission(self, mission_id: int, user: str) -> Dict[str, Any]:
         """
@@ -269,18 +678,114 @@ class NeoService:
             }
         }
     
-    def get_user_missions(self, user: str) -> List[int]:
+    def verify_missions_batch(self, verifier: str, items: List[Tuple[int, bool]]) -> Dict[str, Any]:
+        """
+        Verify several completed missions in one transaction (verify_missions_batch)
+        
+        Missions that are not COMPLETED are skipped by the contract rather
+        than failing the whole batch.
+        
+        Args:
+            verifier: Verifier address
+            items: (mission_id, approved) pairs
+            
+        Returns:
+            Transaction result with one entry per item
+        """
+        return {
+            "success": True,
+            "tx_hash": "0xmock_verify_batch_tx",
+            "message": f"{len(items)} missions verified (mock)",
+            "data": [
+                {
+                    "mission_id": mission_id,
+                    "verified": True,
+                    "status": "VERIFIED" if approved else "IN_PROGRESS",
+                    "reward_distributed": approved
+                }
+                for mission_id, approved in items
+            ]
+        }
+    
+    def get_user_missions(self, user: str, offset: int = 0, limit: int = MAX_PAGE_SIZE) -> List[int]:
         """
-        Get list of user's missions
+        Get one page of a user's missions
         
         Args:
             user: User address
+            offset: Entries to skip
+            limit: Page size (capped at MAX_PAGE_SIZE by the contract)
             
         Returns:
-            List of mission IDs
+            List of mission IDs, oldest first
         """
-        # Mock data
-        return [1, 2, 3, 5, 7]
+        # Mock data until contract deployed
+        if not self.mission_contract:
+            return MOCK_USER_MISSIONS[offset:offset + limit]
+        
+        item = self.invoke_contract_read(
+            self.mission_contract,
+            "get_user_missions",
+            [{"type": "Hash160", "value": address_to_script_hash(user)}] + self._page_params(offset, limit)
+        )
+        return self._decode_id_list(item)
+    
+    def get_missions_by_status(self, status: Any, offset: int = 0, limit: int = MAX_PAGE_SIZE) -> List[int]:
+        """
+        Get one page of mission IDs from the contract's status index
+        
+        Args:
+            status: Status name or code
+            offset: Entries to skip
+            limit: Page size (capped at MAX_PAGE_SIZE by the contract)
+            
+        Returns:
+            List of mission IDs, oldest first
+        """
+        code = self._status_code(status)
+        if not self.mission_contract:
+            return []
+        
+        item = self.invoke_contract_read(
+            self.mission_contract,
+            "get_missions_by_status",
+            [{"type": "Integer", "value": str(code)}] + self._page_params(offset, limit)
+        )
+        return self._decode_id_list(item)
+    
+    def get_missions_by_category(self, category: str, offset: int = 0, limit: int = MAX_PAGE_SIZE) -> List[int]:
+        """
+        Get one page of mission IDs from the contract's category index
+        
+        Args:
+            category: Mission category
+            offset: Entries to skip
+            limit: Page size (capped at MAX_PAGE_SIZE by the contract)
+            
+        Returns:
+            List of mission IDs, oldest first
+        """
+        if not self.mission_contract:
+            return []
+        
+        item = self.invoke_contract_read(
+            self.mission_contract,
+            "get_missions_by_category",
+            [{"type": "String", "value": category}] + self._page_params(offset, limit)
+        )
+        return self._decode_id_list(item)
+    
+    def get_status_counts(self) -> Dict[str, int]:
+        """
+        Get the number of missions in each status (one batched request)
+        
+        Returns:
+            Dict of status name -> count
+        """
+        if not self.mission_contract:
+            return {name: 42 if code == 0 else 0 for code, name in STATUS_NAMES.items()}
+        
+        return self._decode_status_counts(self._rpc_batch(self._status_count_calls()))
     
     def get_mission_count(self) -> int:
         """
@@ -289,8 +794,27 @@ class NeoService:
         Returns:
             Mission count
         """
-        # Mock data
-        return 42
+        # Mock data until contract deployed
+        if not self.mission_contract:
+            return 42
+        
+        item = self.invoke_contract_read(self.mission_contract, "get_mission_count")
+        return self._decode_int(item)
+    
+    def get_mission_events(self, tx_hash: str) -> List[Dict[str, Any]]:
+        """
+        Get the MissionContract events emitted by a transaction
+        
+        Args:
+            tx_hash: Transaction hash
+            
+        Returns:
+            Decoded events (see decode_mission_events)
+        """
+        if not self.mission_contract:
+            return []
+        
+        return decode_mission_events(self._rpc_call("getapplicationlog", [tx_hash]), self.mission_contract)
     
     def get_blockchain_status(self) -> Dict[str, Any]:
         """
@@ -300,8 +824,12 @@ class NeoService:
             Status information
         """
         try:
-            block_count = self.get_block_count()
-            balances = self.get_balance()
+            # One round trip for both reads
+            block_count, balance_result = self._rpc_batch([
+                ("getblockcount", []),
+                ("getnep17balances", [self.wallet_address])
+            ])
+            balances = self._parse_balances(balance_result)
             
             return {
                 "connected": True,
@@ -310,16 +838,279 @@ class NeoService:
                 "wallet_address": self.wallet_address,
                 "balances": balances,
                 "contract_address": self.mission_contract,
-                "rpc_url": self.rpc_url
+                "rpc_url": self.rpc_url,
+                "rpc_nodes": self.rpc.endpoint_status()
             }
         except Exception as e:
             return {
                 "connected": False,
                 "error": str(e),
                 "network": "NEO N3 TestNet",
-                "rpc_url": self.rpc_url
+                "rpc_url": self.rpc_url,
+                "rpc_nodes": self.rpc.endpoint_status()
             }
 
+    
+    # ========== Async API ==========
+    # Awaitable versions of the methods above. They share one pooled
+    # NeoRpcClient so FastAPI handlers never block the event loop.
+    # Contract reads go through self.cache, which is flushed on every
+    # new block.
+    
+    async def _acached(self, method: str, params: Any, loader):
+        """Serve (method, params) from the read cache, loading on a miss"""
+        key = self.cache.make_key(method, params)
+        hit, value = self.cache.get(key)
+        if hit:
+            return value
+        
+        # A block observed while loading makes the result stale
+        generation = self.cache.generation
+        value = await loader()
+        self.cache.set(key, value, generation=generation)
+        return value
+    
+    async def aget_block_count(self) -> int:
+        """Get current block height"""
+        height = await self.rpc.call("getblockcount")
+        self.cache.observe_block_height(height)
+        return height
+    
+    async def aget_balance(self, address: str = None) -> Dict[str, float]:
+        """Get GAS and NEO balance (see get_balance)"""
+        if not address:
+            address = self.wallet_address
+        
+        result = await self.rpc.call("getnep17balances", [address])
+        return self._parse_balances(result)
+    
+    async def ainvoke_contract_read(self, contract_hash: str, operation: str, params: List = None) -> Any:
+        """Invoke contract method read-only (see invoke_contract_read)"""
+        result = await self.rpc.call("invokefunction", [contract_hash, operation, params or []])
+        return self._first_stack_item(result)
+    
+    async def acreate_mission(
+        self,
+        creator: str,
+        title: str,
+        description: str,
+        reward_amount: int,
+        deadline: int,
+        category: str
+    ) -> Dict[str, Any]:
+        """Create new mission on blockchain (see create_mission)"""
+        return self.create_mission(creator, title, description, reward_amount, deadline, category)
+    
+    async def acreate_missions_batch(self, creator: str, missions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create several missions in one transaction (see create_missions_batch)"""
+        return self.create_missions_batch(creator, missions)
+    
+    async def aget_mission(self, mission_id: int) -> Optional[Dict[str, Any]]:
+        """Get mission details (see get_mission)"""
+        if not self.mission_contract:
+            return self._mock_mission(mission_id)
+        
+        async def load():
+            item = await self.ainvoke_contract_read(
+                self.mission_contract,
+                "get_mission",
+                [{"type": "Integer", "value": str(mission_id)}]
+            )
+            return self._decode_mission(item)
+        
+        return await self._acached("get_mission", [mission_id], load)
+    
+    async def aget_missions(self, mission_ids: List[int], strict: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get details for several missions in one batched RPC request
+        
+        Args:
+            mission_ids: Mission IDs
+            strict: Raise on a failed read instead of leaving the mission out
+            
+        Returns:
+            Missions that exist, in the order of mission_ids
+        """
+        if not self.mission_contract:
+            return [self._mock_mission(mission_id) for mission_id in mission_ids]
+        
+        # Serve what we can from the cache and batch only the misses
+        found = {}
+        missing = []
+        for mission_id in dict.fromkeys(mission_ids):
+            hit, mission = self.cache.get(self.cache.make_key("get_mission", [mission_id]))
+            if hit:
+                found[mission_id] = mission
+            else:
+                missing.append(mission_id)
+        
+        generation = self.cache.generation
+        results = await self.rpc.batch(
+            [
+                self._invoke_call("get_mission", [{"type": "Integer", "value": str(mission_id)}])
+                for mission_id in missing
+            ],
+            return_exceptions=not strict
+        )
+        
+        for mission_id, result in zip(missing, results):
+            if isinstance(result, Exception):
+                continue
+            mission = self._decode_mission(self._first_stack_item(result))
+            self.cache.set(self.cache.make_key("get_mission", [mission_id]), mission, generation=generation)
+            found[mission_id] = mission
+        
+        return [found[mission_id] for mission_id in mission_ids if found.get(mission_id)]
+    
+    async def aaccept_mission(self, mission_id: int, user: str) -> Dict[str, Any]:
+        """User accepts a mission (see accept_mission)"""
+        return self.accept_mission(mission_id, user)
+    
+    async def acomplete_mission(self, mission_id: int, user: str, proof: str) -> Dict[str, Any]:
+        """Mark mission as completed (see complete_mission)"""
+        return self.complete_mission(mission_id, user, proof)
+    
+    async def averify_mission(self, mission_id: int, verifier: str, approved: bool) -> Dict[str, Any]:
+        """Verify completed mission (see verify_mission)"""
+        return self.verify_mission(mission_id, verifier, approved)
+    
+    async def averify_missions_batch(self, verifier: str, items: List[Tuple[int, bool]]) -> Dict[str, Any]:
+        """Verify several missions in one transaction (see verify_missions_batch)"""
+        return self.verify_missions_batch(verifier, items)
+    
+    async def aget_user_missions(self, user: str, offset: int = 0, limit: int = MAX_PAGE_SIZE) -> List[int]:
+        """Get one page of a user's missions (see get_user_missions)"""
+        if not self.mission_contract:
+            return MOCK_USER_MISSIONS[offset:offset + limit]
+        
+        async def load():
+            item = await self.ainvoke_contract_read(
+                self.mission_contract,
+                "get_user_missions",
+                [{"type": "Hash160", "value": address_to_script_hash(user)}] + self._page_params(offset, limit)
+            )
+            return self._decode_id_list(item)
+        
+        return await self._acached("get_user_missions", [user, offset, limit], load)
+    
+    async def aget_mission_count(self) -> int:
+        """Get total number of missions (see get_mission_count)"""
+        if not self.mission_contract:
+            return 42
+        
+        async def load():
+            item = await self.ainvoke_contract_read(self.mission_contract, "get_mission_count")
+            return self._decode_int(item)
+        
+        return await self._acached("get_mission_count", [], load)
+    
+    async def aget_mission_events(self, tx_hashes: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get the MissionContract events of several transactions in one batched
+        RPC request (see get_mission_events)
+        
+        Returns:
+            Events of all transactions, in the order of tx_hashes
+        """
+        if not self.mission_contract or not tx_hashes:
+            return []
+        
+        logs = await self.rpc.batch([("getapplicationlog", [tx_hash]) for tx_hash in tx_hashes])
+        events = []
+        for log in logs:
+            events.extend(decode_mission_events(log, self.mission_contract))
+        return events
+    
+    async def aget_missions_by_status(self, status: Any, offset: int = 0, limit: int = MAX_PAGE_SIZE) -> List[int]:
+        """Page through the status index (see get_missions_by_status)"""
+        code = self._status_code(status)
+        if not self.mission_contract:
+            return []
+        
+        async def load():
+            item = await self.ainvoke_contract_read(
+                self.mission_contract,
+                "get_missions_by_status",
+                [{"type": "Integer", "value": str(code)}] + self._page_params(offset, limit)
+            )
+            return self._decode_id_list(item)
+        
+        return await self._acached("get_missions_by_status", [code, offset, limit], load)
+    
+    async def aget_missions_by_category(self, category: str, offset: int = 0, limit: int = MAX_PAGE_SIZE) -> List[int]:
+        """Page through the category index (see get_missions_by_category)"""
+        if not self.mission_contract:
+            return []
+        
+        async def load():
+            item = await self.ainvoke_contract_read(
+                self.mission_contract,
+                "get_missions_by_category",
+                [{"type": "String", "value": category}] + self._page_params(offset, limit)
+            )
+            return self._decode_id_list(item)
+        
+        return await self._acached("get_missions_by_category", [category, offset, limit], load)
+    
+    async def aget_status_counts(self) -> Dict[str, int]:
+        """Get per-status mission counts (see get_status_counts)"""
+        if not self.mission_contract:
+            return self.get_status_counts()
+        
+        async def load():
+            return self._decode_status_counts(await self.rpc.batch(self._status_count_calls()))
+        
+        return dict(await self._acached("get_status_counts", [], load))
+    
+    async def aget_blockchain_status(self) -> Dict[str, Any]:
+        """
+        Get NEO blockchain status without blocking the event loop
+        
+        Returns:
+            Status information (same shape as get_blockchain_status)
+        """
+        try:
+            hit, chain_state = self.cache.get(self.cache.make_key("status", [self.wallet_address]))
+            if not hit:
+                # One round trip for both reads
+                block_count, balance_result = await self.rpc.batch([
+                    ("getblockcount", []),
+                    ("getnep17balances", [self.wallet_address])
+                ])
+                self.cache.observe_block_height(block_count)
+                chain_state = (block_count, self._parse_balances(balance_result))
+                self.cache.set(self.cache.make_key("status", [self.wallet_address]), chain_state)
+            
+            block_count, balances = chain_state
+            return {
+                "connected": True,
+                "network": "NEO N3 TestNet",
+                "block_height": block_count,
+                "wallet_address": self.wallet_address,
+                "balances": dict(balances),
+                "contract_address": self.mission_contract,
+                "rpc_url": self.rpc_url,
+                "rpc_nodes": self.rpc.endpoint_status(),
+                "cache": self.cache.stats(),
+                "single_flight": self.rpc.flights.stats()
+            }
+        except Exception as e:
+            return {
+                "connected": False,
+                "error": str(e),
+                "network": "NEO N3 TestNet",
+                "rpc_url": self.rpc_url,
+                "rpc_nodes": self.rpc.endpoint_status()
+            }
+    
+    def start_background_tasks(self):
+        """Start seed node health checks (call from the running event loop)"""
+        self.rpc.start_health_checks(float(os.getenv("NEO_RPC_HEALTH_INTERVAL", "15")))
+    
+    async def aclose(self):
+        """Stop health checks and release pooled RPC connections"""
+        await self.rpc.aclose()
+
 
 # Singleton instance
 neo_service = NeoService()
@@ -0,0 +1,593 @@
+"""
+NEO RPC Stand-in Server
+JSON-RPC giả lập node NEO (MissionContract trong bộ nhớ) cho test tải offline
+
+Chạy riêng:  python neo_stub_server.py
+Rồi trỏ backend vào:  NEO_RPC_URLS=http://127.0.0.1:20332
+                      NEO_MISSION_CONTRACT=<NEO_STUB_CONTRACT>
+
+Cấu hình qua env:
+    NEO_STUB_PORT          Port lắng nghe (mặc định 20332)
+    NEO_STUB_CONTRACT      Hash của MissionContract giả lập
+    NEO_STUB_MISSIONS      Số missions tạo sẵn khi khởi động
+    NEO_STUB_LATENCY_MS    Độ trễ trung bình mỗi request
+    NEO_STUB_JITTER_MS     Độ lệch ngẫu nhiên (+/-) quanh độ trễ
+    NEO_STUB_ERROR_RATE    Tỉ lệ request trả lỗi JSON-RPC (0-1)
+    NEO_STUB_DROP_RATE     Tỉ lệ request trả HTTP 503 (0-1)
+"""
+import os
+import time
+import base64
+import bisect
+import random
+import hashlib
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from dotenv import load_dotenv
+
+from neo_codec import build_contract_call, serialize_stack_item
+from neo_service import GAS_HASH, NEO_HASH, MAX_BATCH_SIZE, MAX_PAGE_SIZE, MISSION_EVENTS
+
+load_dotenv()
+
+DEFAULT_CONTRACT = "0x" + "5354" * 10
+DEFAULT_PORT = 20332
+
+# Mirrors MissionContract.py
+STATUS_PENDING = 0
+STATUS_IN_PROGRESS = 1
+STATUS_COMPLETED = 2
+STATUS_VERIFIED = 3
+STATUS_CANCELLED = 4
+MAX_CATEGORY_LENGTH = 32
+
+# JSON-RPC error codes used by neo-cli
+ERROR_INTERNAL = -32603
+ERROR_METHOD_NOT_FOUND = -32601
+ERROR_INVALID_PARAMS = -32602
+ERROR_UNKNOWN_CONTRACT = -100
+ERROR_UNKNOWN_BLOCK = -100
+ERROR_UNKNOWN_TRANSACTION = -100
+
+
+class ContractAbort(Exception):
+    """Raised by contract methods where the real contract calls abort()"""
+
+
+class RpcFault(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def hash_to_bytes(script_hash: str) -> bytes:
+    """0x-prefixed big-endian script hash -> UInt160 bytes as stored on chain"""
+    return bytes.fromhex(script_hash[2:] if script_hash.startswith("0x") else script_hash)[::-1]
+
+
+def parse_contract_param(param: Dict[str, Any]) -> Any:
+    """Convert an invokefunction ContractParameter to the value the contract sees"""
+    param_type = param.get("type")
+    value = param.get("value")
+    if param_type == "Integer":
+        return int(value)
+    if param_type == "Boolean":
+        return value is True or str(value).lower() == "true"
+    if param_type == "String":
+        return str(value)
+    if param_type in ("Hash160", "Hash256"):
+        return hash_to_bytes(value)
+    if param_type == "ByteArray":
+        return base64.b64decode(value or "")
+    if param_type == "Array":
+        return [parse_contract_param(item) for item in value or []]
+    return None
+
+
+def to_stack_item(value: Any) -> Dict[str, Any]:
+    """Python value -> RPC JSON stack item (inverse of neo_codec.parse_stack_item)"""
+    if value is None:
+        return {"type": "Any"}
+    if isinstance(value, bool):
+        return {"type": "Boolean", "value": value}
+    if isinstance(value, int):
+        return {"type": "Integer", "value": str(value)}
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    if isinstance(value, (bytes, bytearray)):
+        return {"type": "ByteString", "value": base64.b64encode(bytes(value)).decode()}
+    if isinstance(value, (list, tuple)):
+        return {"type": "Array", "value": [to_stack_item(item) for item in value]}
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+class MissionContractState:
+    """
+    In-memory MissionContract
+
+    Follows the storage semantics of contracts/MissionContract.py (status
+    transitions, indexes, counters, page caps and events). Witness checks
+    are skipped: every signer is trusted.
+    """
+
+    def __init__(self):
+        self.missions: Dict[int, List[Any]] = {}
+        self.user_missions: Dict[bytes, List[int]] = {}  # sorted, like the contract's ID-ordered keys
+        self.proofs: Dict[int, str] = {}
+        self.notifications: List[Dict[str, Any]] = []
+
+    # ========== Helpers ==========
+
+    def _emit(self, event: str, *values: Any):
+        self.notifications.append({"eventname": event, "values": list(values)})
+
+    def _add_user_mission(self, user: bytes, mission_id: int):
+        # One entry per (user, mission): a creator accepting their own mission is not listed twice
+        ids = self.user_missions.setdefault(user, [])
+        position = bisect.bisect_left(ids, mission_id)
+        if position == len(ids) or ids[position] != mission_id:
+            ids.insert(position, mission_id)
+
+    @staticmethod
+    def _validate(title: str, description: str, reward_amount: int, category: str):
+        if not 0 < len(title) <= 100 or not 0 < len(description) <= 500:
+            raise ContractAbort("invalid title or description")
+        if reward_amount <= 0 or not 0 < len(category) <= MAX_CATEGORY_LENGTH:
+            raise ContractAbort("invalid reward or category")
+
+    def _store_new_mission(
+        self,
+        creator: bytes,
+        title: str,
+        description: str,
+        reward_amount: int,
+        deadline: int,
+        category: str
+    ) -> int:
+        mission_id = len(self.missions) + 1
+        self.missions[mission_id] = [
+            mission_id, creator, title, description, reward_amount, deadline,
+            category, STATUS_PENDING, b"", 0, 0
+        ]
+        self._add_user_mission(creator, mission_id)
+        self._emit("MissionCreated", mission_id, creator, title, description, reward_amount, deadline, category, 0)
+        return mission_id
+
+    def _ids_where(self, predicate: Callable[[List[Any]], bool], offset: int, limit: int) -> List[int]:
+        limit = min(limit, MAX_PAGE_SIZE)
+        if offset < 0 or limit <= 0:
+            return []
+        ids = [mission_id for mission_id, mission in self.missions.items() if predicate(mission)]
+        return ids[offset:offset + limit]
+
+    def _verify(self, mission_id: int, verifier: bytes, approved: bool) -> bool:
+        mission = self.missions.get(mission_id)
+        if mission is None or mission[1] != verifier or mission[7] != STATUS_COMPLETED:
+            return False
+        mission[7] = STATUS_VERIFIED if approved else STATUS_IN_PROGRESS
+        self._emit("MissionVerified", mission_id, verifier, approved, mission[7])
+        return True
+
+    # ========== Writes ==========
+
+    def create_mission(self, creator, title, description, reward_amount, deadline, category) -> int:
+        self._validate(title, description, reward_amount, category)
+        return self._store_new_mission(creator, title, description, reward_amount, deadline, category)
+
+    def create_missions_batch(self, creator, missions) -> List[int]:
+        if not 0 < len(missions) <= MAX_BATCH_SIZE:
+            raise ContractAbort("invalid batch size")
+        # Validate everything first: an abort must not leave half a batch behind
+        for title, description, reward_amount, _, category in missions:
+            self._validate(title, description, reward_amount, category)
+        return [self._store_new_mission(creator, *mission[:5]) for mission in missions]
+
+    def accept_mission(self, mission_id, user) -> bool:
+        mission = self.missions.get(mission_id)
+        if mission is None or mission[7] != STATUS_PENDING:
+            return False
+        mission[7] = STATUS_IN_PROGRESS
+        mission[8] = user
+        self._add_user_mission(user, mission_id)
+        self._emit("MissionAccepted", mission_id, user)
+        return True
+
+    def complete_mission(self, mission_id, user, proof) -> bool:
+        mission = self.missions.get(mission_id)
+        if mission is None or mission[8] != user or mission[7] != STATUS_IN_PROGRESS:
+            return False
+        mission[7] = STATUS_COMPLETED
+        self.proofs[mission_id] = proof
+        self._emit("MissionCompleted", mission_id, user, proof, 0)
+        return True
+
+    def verify_mission(self, mission_id, verifier, approved) -> bool:
+        return self._verify(mission_id, verifier, approved)
+
+    def verify_missions_batch(self, verifier, mission_ids, approvals) -> List[bool]:
+        if len(mission_ids) != len(approvals) or len(mission_ids) > MAX_BATCH_SIZE:
+            raise ContractAbort("invalid batch")
+        return [self._verify(mission_id, verifier, approved) for mission_id, approved in zip(mission_ids, approvals)]
+
+    def cancel_mission(self, mission_id, creator) -> bool:
+        mission = self.missions.get(mission_id)
+        if mission is None or mission[1] != creator or mission[7] != STATUS_PENDING:
+            return False
+        mission[7] = STATUS_CANCELLED
+        self._emit("MissionCancelled", mission_id, creator)
+        return True
+
+    # ========== Reads ==========
+
+    def get_mission(self, mission_id) -> bytes:
+        mission = self.missions.get(mission_id)
+        return serialize_stack_item(mission) if mission else b""
+
+    def get_user_missions(self, user, offset, limit) -> List[int]:
+        limit = min(limit, MAX_PAGE_SIZE)
+        if offset < 0 or limit <= 0:
+            return []
+        return self.user_missions.get(user, [])[offset:offset + limit]
+
+    def get_mission_count(self) -> int:
+        return len(self.missions)
+
+    def get_missions_by_status(self, status, offset, limit) -> List[int]:
+        return self._ids_where(lambda mission: mission[7] == status, offset, limit)
+
+    def get_missions_by_category(self, category, offset, limit) -> List[int]:
+        return self._ids_where(lambda mission: mission[6] == category, offset, limit)
+
+    def get_status_count(self, status) -> int:
+        return sum(1 for mission in self.missions.values() if mission[7] == status)
+
+    READ_METHODS = frozenset({
+        "get_mission",
+        "get_user_missions",
+        "get_mission_count",
+        "get_missions_by_status",
+        "get_missions_by_category",
+        "get_status_count",
+    })
+    WRITE_METHODS = frozenset({
+        "create_mission",
+        "create_missions_batch",
+        "accept_mission",
+        "complete_mission",
+        "verify_mission",
+        "verify_missions_batch",
+        "cancel_mission",
+    })
+
+
+class NeoStubNode:
+    """
+    JSON-RPC dispatcher with latency and error injection
+
+    Unlike a real node, write methods sent through invokefunction are
+    committed immediately: each one is recorded as a transaction (the
+    invocation script a wallet would send) in a new block, with an
+    application log holding the HALT execution, its return value and the
+    MissionContract notifications. getblock and getapplicationlog serve
+    those, so load tests exercise cache invalidation and the indexer's
+    change path. Blocks before the first write are empty.
+    """
+
+    def __init__(
+        self,
+        contract_hash: str = DEFAULT_CONTRACT,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        block_height: int = 1000,
+        seed: Optional[int] = None
+    ):
+        self.contract_hash = contract_hash.lower()
+        self.contract = MissionContractState()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.block_count = block_height
+        self.blocks: Dict[int, Dict[str, Any]] = {}  # only blocks holding a write
+        self.block_hashes: Dict[str, int] = {}
+        self.application_logs: Dict[str, Dict[str, Any]] = {}
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.calls: Dict[str, int] = {}
+        self.injected_errors = 0
+        self.dropped = 0
+        self._methods: Dict[str, Callable[[List[Any]], Any]] = {
+            "getblockcount": self.getblockcount,
+            "getnep17balances": self.getnep17balances,
+            "invokefunction": self.invokefunction,
+            "getcontractstate": self.getcontractstate,
+            "getversion": self.getversion,
+            "getblock": self.getblock,
+            "getapplicationlog": self.getapplicationlog,
+        }
+
+    def seed_missions(self, count: int, categories: List[str] = None):
+        """Pre-populate the contract with pending missions"""
+        categories = categories or ["fitness", "learning", "health", "work"]
+        for index in range(count):
+            creator = bytes([index % 256]) * 20
+            self.contract.create_mission(
+                creator,
+                f"Mission {index + 1}",
+                f"Seeded mission {index + 1}",
+                10,
+                1_900_000_000,
+                categories[index % len(categories)]
+            )
+        self.contract.notifications.clear()
+
+    # ========== Fault injection ==========
+
+    async def delay(self):
+        if self.latency_ms <= 0 and self.jitter_ms <= 0:
+            return
+        jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+    def should_drop(self) -> bool:
+        if self.drop_rate > 0 and self._random.random() < self.drop_rate:
+            self.dropped += 1
+            return True
+        return False
+
+    # ========== JSON-RPC ==========
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a single JSON-RPC request object"""
+        request_id = request.get("id")
+        method = request.get("method")
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+        try:
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                self.injected_errors += 1
+                raise RpcFault(ERROR_INTERNAL, "Injected error")
+            handler = self._methods.get(method)
+            if handler is None:
+                raise RpcFault(ERROR_METHOD_NOT_FOUND, f"Method not found: {method}")
+            result = handler(request.get("params") or [])
+        except RpcFault as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": e.message}}
+
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def getblockcount(self, params: List[Any]) -> int:
+        return self.block_count
+
+    def getnep17balances(self, params: List[Any]) -> Dict[str, Any]:
+        if not params:
+            raise RpcFault(ERROR_INVALID_PARAMS, "Invalid params")
+        return {
+            "address": params[0],
+            "balance": [
+                {"assethash": GAS_HASH, "amount": "5000000000", "lastupdatedblock": self.block_count - 1},
+                {"assethash": NEO_HASH, "amount": "10", "lastupdatedblock": self.block_count - 1},
+            ]
+        }
+
+    def getversion(self, params: List[Any]) -> Dict[str, Any]:
+        return {
+            "tcpport": 20333,
+            "nonce": 1,
+            "useragent": "/NeoStub:1.0.0/",
+            "protocol": {
+                "network": 894710606,
+                "validatorscount": 7,
+                "msperblock": 15000,
+                "maxtraceableblocks": 2102400,
+                "addressversion": 53,
+                "maxtransactionsperblock": 512,
+                "memorypoolmaxtransactions": 50000,
+                "initialgasdistribution": 5200000000000000
+            }
+        }
+
+    def getcontractstate(self, params: List[Any]) -> Dict[str, Any]:
+        if not params:
+            raise RpcFault(ERROR_INVALID_PARAMS, "Invalid params")
+        target = str(params[0]).lower()
+        names = {GAS_HASH: "GasToken", NEO_HASH: "NeoToken", self.contract_hash: "MissionContract"}
+        if target not in names:
+            raise RpcFault(ERROR_UNKNOWN_CONTRACT, "Unknown contract")
+
+        methods = []
+        if target == self.contract_hash:
+            methods = [
+                {"name": name, "safe": name in MissionContractState.READ_METHODS}
+                for name in sorted(MissionContractState.READ_METHODS | MissionContractState.WRITE_METHODS)
+            ]
+        return {
+            "id": 1,
+            "updatecounter": 0,
+            "hash": target,
+            "manifest": {
+                "name": names[target],
+                "abi": {
+                    "methods": methods,
+                    "events": [
+                        {"name": name, "parameters": [{"name": field, "type": "Any"} for field in fields]}
+                        for name, fields in MISSION_EVENTS.items()
+                    ]
+                    if target == self.contract_hash else []
+                }
+            }
+        }
+
+    def invokefunction(self, params: List[Any]) -> Dict[str, Any]:
+        if len(params) < 2:
+            raise RpcFault(ERROR_INVALID_PARAMS, "Invalid params")
+        target, operation = str(params[0]).lower(), params[1]
+        if target != self.contract_hash:
+            raise RpcFault(ERROR_UNKNOWN_CONTRACT, "Unknown contract")
+
+        contract = self.contract
+        if operation not in contract.READ_METHODS | contract.WRITE_METHODS:
+            return self._fault(f"Method \"{operation}\" with {len(params[2] if len(params) > 2 else [])} parameter(s) doesn't exist")
+
+        args = [parse_contract_param(param) for param in (params[2] if len(params) > 2 else [])]
+        contract.notifications.clear()
+        try:
+            value = getattr(contract, operation)(*args)
+        except ContractAbort as e:
+            contract.notifications.clear()
+            return self._fault(f"ABORT: {e}")
+        except (TypeError, ValueError, IndexError) as e:
+            contract.notifications.clear()
+            return self._fault(str(e))
+
+        notifications = [
+            {
+                "contract": self.contract_hash,
+                "eventname": notification["eventname"],
+                "state": to_stack_item(notification["values"])
+            }
+            for notification in contract.notifications
+        ]
+        stack = [to_stack_item(value)]
+        if operation in contract.WRITE_METHODS:
+            self._commit(operation, args, stack, notifications)
+
+        return {
+            "script": "",
+            "state": "HALT",
+            "gasconsumed": "1000000",
+            "exception": None,
+            "notifications": notifications,
+            "stack": stack
+        }
+
+    @staticmethod
+    def _hash(*parts: Any) -> str:
+        return "0x" + hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+    def _commit(self, operation: str, args: List[Any], stack: List[Dict[str, Any]], notifications: List[Dict[str, Any]]):
+        """Record a write as the only transaction of a new block"""
+        index = self.block_count
+        script = build_contract_call(self.contract_hash, operation, args)
+        tx_hash = self._hash("tx", index, script.hex())
+        self.application_logs[tx_hash] = {
+            "txid": tx_hash,
+            "executions": [{
+                "trigger": "Application",
+                "vmstate": "HALT",
+                "exception": None,
+                "gasconsumed": "1000000",
+                "stack": stack,
+                "notifications": notifications
+            }]
+        }
+        block = self._block(index)
+        block["tx"] = [{"hash": tx_hash, "script": base64.b64encode(script).decode(), "signers": []}]
+        self.blocks[index] = block
+        self.block_hashes[block["hash"]] = index
+        self.block_count += 1
+
+    def _block(self, index: int) -> Dict[str, Any]:
+        return {
+            "hash": self._hash("block", index),
+            "index": index,
+            "time": int(time.time() * 1000),
+            "tx": []
+        }
+
+    def getblock(self, params: List[Any]) -> Dict[str, Any]:
+        if not params:
+            raise RpcFault(ERROR_INVALID_PARAMS, "Invalid params")
+        target = params[0]
+        index = self.block_hashes.get(target.lower()) if isinstance(target, str) else target
+        if not isinstance(index, int) or not 0 <= index < self.block_count:
+            raise RpcFault(ERROR_UNKNOWN_BLOCK, "Unknown block")
+        return self.blocks.get(index) or self._block(index)
+
+    def getapplicationlog(self, params: List[Any]) -> Dict[str, Any]:
+        if not params:
+            raise RpcFault(ERROR_INVALID_PARAMS, "Invalid params")
+        log = self.application_logs.get(str(params[0]).lower())
+        if log is None:
+            raise RpcFault(ERROR_UNKNOWN_TRANSACTION, "Unknown transaction")
+        return log
+
+    @staticmethod
+    def _fault(message: str) -> Dict[str, Any]:
+        return {
+            "script": "",
+            "state": "FAULT",
+            "gasconsumed": "1000000",
+            "exception": message,
+            "notifications": [],
+            "stack": []
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "calls": dict(self.calls),
+            "injected_errors": self.injected_errors,
+            "dropped": self.dropped,
+            "block_count": self.block_count,
+            "transactions": len(self.application_logs),
+            "missions": len(self.contract.missions)
+        }
+
+
+def create_app(node: NeoStubNode) -> FastAPI:
+    """ASGI app serving the node's JSON-RPC on / (single and batch requests)"""
+    app = FastAPI(title="NEO RPC Stand-in", docs_url=None, redoc_url=None)
+
+    @app.post("/")
+    async def rpc(request: Request):
+        node.requests += 1
+        await node.delay()
+        if node.should_drop():
+            return JSONResponse({"error": "Injected drop"}, status_code=503)
+
+        try:
+            payload = await request.json()
+        except ValueError:
+            return JSONResponse({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}})
+
+        if isinstance(payload, list):
+            return JSONResponse([node.handle(item) for item in payload])
+        return JSONResponse(node.handle(payload))
+
+    @app.get("/stats")
+    async def stats():
+        return node.stats()
+
+    return app
+
+
+def node_from_env() -> NeoStubNode:
+    node = NeoStubNode(
+        contract_hash=os.getenv("NEO_STUB_CONTRACT", DEFAULT_CONTRACT),
+        latency_ms=float(os.getenv("NEO_STUB_LATENCY_MS", "0")),
+        jitter_ms=float(os.getenv("NEO_STUB_JITTER_MS", "0")),
+        error_rate=float(os.getenv("NEO_STUB_ERROR_RATE", "0")),
+        drop_rate=float(os.getenv("NEO_STUB_DROP_RATE", "0"))
+    )
+    node.seed_missions(int(os.getenv("NEO_STUB_MISSIONS", "100")))
+    return node
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    node = node_from_env()
+    port = int(os.getenv("NEO_STUB_PORT", DEFAULT_PORT))
+
+    print(f"🧪 NEO RPC stand-in on http://127.0.0.1:{port}")
+    print(f"📜 Contract: {node.contract_hash} ({len(node.contract.missions)} seeded missions)")
+    print(f"⏱️  Latency: {node.latency_ms}±{node.jitter_ms} ms, error rate {node.error_rate}, drop rate {node.drop_rate}")
+
+    uvicorn.run(create_app(node), host="127.0.0.1", port=port, log_level="warning")
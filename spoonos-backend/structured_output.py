@@ -0,0 +1,162 @@
+"""
+Structured Output
+Yêu cầu LLM trả JSON theo schema và parse thẳng vào Pydantic model, một lượt quét với chi phí có giới hạn
+"""
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from json_stream import StreamEvent, StreamingJsonParser
+
+# Opening brackets tried by the fallback scan before giving up
+MAX_FALLBACK_STARTS = 8
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a response holds no JSON value that validates into the expected model"""
+
+
+@lru_cache(maxsize=None)
+def json_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON Schema of a response model, as passed to the providers' JSON modes"""
+    return model.model_json_schema()
+
+
+def array_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    return {"type": "array", "items": json_schema(model)}
+
+
+def extract_json(text: str, container: str = "{") -> Any:
+    """
+    First JSON object (container "{") or array ("[") in an LLM response
+
+    JSON-mode answers are parsed directly. Otherwise (prose, ``` fences,
+    trailing text) the value is decoded with raw_decode from each opening
+    bracket in turn, which stops at the value's own closing bracket. Each
+    attempt is linear and at most MAX_FALLBACK_STARTS are made.
+
+    Raises:
+        StructuredOutputError: If no such value is found
+    """
+    expected = dict if container == "{" else list
+    try:
+        value = json.loads(text)
+        if isinstance(value, expected):
+            return value
+    except ValueError:
+        pass
+
+    decoder = json.JSONDecoder(strict=False)
+    start = text.find(container)
+    for _ in range(MAX_FALLBACK_STARTS):
+        if start == -1:
+            break
+        try:
+            value, _ = decoder.raw_decode(text, start)
+            if isinstance(value, expected):
+                return value
+        except ValueError:
+            pass
+        start = text.find(container, start + 1)
+
+    raise StructuredOutputError("Invalid JSON response from AI")
+
+
+def validate_model(data: Any, model: Type[ModelT], defaults: Optional[Dict[str, Any]] = None) -> ModelT:
+    """Validate decoded JSON into a model, filling missing fields from defaults"""
+    if not isinstance(data, dict):
+        raise StructuredOutputError(f"Expected a JSON object for {model.__name__}")
+    try:
+        return model.model_validate({**(defaults or {}), **data})
+    except ValidationError as e:
+        raise StructuredOutputError(f"AI response does not match {model.__name__}: {e}") from e
+
+
+def parse_model(text: str, model: Type[ModelT], defaults: Optional[Dict[str, Any]] = None) -> ModelT:
+    return validate_model(extract_json(text, "{"), model, defaults)
+
+
+async def generate_structured(
+    router,
+    prompt: str,
+    model: Type[ModelT],
+    defaults: Optional[Dict[str, Any]] = None
+) -> ModelT:
+    """
+    Ask the router for JSON matching a model's schema and validate the answer
+
+    Raises:
+        LLMError: If every provider failed
+        StructuredOutputError: If the answer does not validate
+    """
+    response = await router.generate(prompt, schema=json_schema(model))
+    return parse_model(response.text, model, defaults)
+
+
+class StructuredStream:
+    """
+    Incremental parse of a streamed answer into a model
+
+    container "{" streams one model: feed() passes through the parser's
+    "text" and "field" events and result() validates the completed object.
+    container "[" streams a list: each complete element is validated and
+    reported as ("item", index, instance); elements that do not validate
+    are dropped and counted in `invalid`.
+    """
+
+    def __init__(
+        self,
+        model: Type[ModelT],
+        defaults: Optional[Dict[str, Any]] = None,
+        container: str = "{"
+    ):
+        self.model = model
+        self.defaults = defaults
+        self.container = container
+        self.parser = StreamingJsonParser(container)
+        self.fields: Dict[str, Any] = {}
+        self.items: List[ModelT] = []
+        self.invalid = 0
+        self._chunks: List[str] = []
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        self._chunks.append(chunk)
+        events: List[StreamEvent] = []
+        for kind, name, value in self.parser.feed(chunk):
+            if kind == "field":
+                self.fields[name] = value
+            elif kind == "item":
+                try:
+                    value = validate_model(value, self.model, self.defaults)
+                except StructuredOutputError:
+                    self.invalid += 1
+                    continue
+                self.items.append(value)
+            events.append((kind, name, value))
+        return events
+
+    def result(self):
+        """
+        The validated model (objects) or list of models (arrays)
+
+        If the stream never closed its top-level value, the whole text gets
+        one bounded extract_json pass before giving up.
+
+        Raises:
+            StructuredOutputError: If nothing valid can be recovered
+        """
+        if self.container == "[":
+            if self.parser.done or self.items:
+                return self.items
+            return [
+                validate_model(item, self.model, self.defaults)
+                for item in extract_json("".join(self._chunks), "[")
+            ]
+
+        if self.parser.done:
+            return validate_model(self.fields, self.model, self.defaults)
+        return parse_model("".join(self._chunks), self.model, self.defaults)
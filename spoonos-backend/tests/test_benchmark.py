@@ -0,0 +1,80 @@
+"""
+Test benchmark
+Kiểm tra nhanh benchmark.py: percentile, tiêu chí bền vững và một bước đo trên app ASGI trong process
+"""
+import random
+import asyncio
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+import benchmark
+import main
+from benchmark import ENDPOINTS, Endpoint, bench_endpoint, percentile, run_step, step_passes
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/broken")
+    async def broken():
+        raise HTTPException(status_code=500)
+
+    return app
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://bench")
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 99) == 0.0
+
+
+def test_step_passes_needs_errors_latency_and_rate():
+    summary = {"offered_rps": 100, "achieved_rps": 95, "error_rate": 0.0, "latency_ms": {"p99": 120}}
+    assert step_passes(summary, max_error_rate=0.01, p99_slo_ms=200)
+    assert not step_passes({**summary, "error_rate": 0.05}, 0.01, 200)
+    assert not step_passes({**summary, "latency_ms": {"p99": 250}}, 0.01, 200)
+    assert not step_passes({**summary, "achieved_rps": 80}, 0.01, 200)
+
+
+def test_run_step_sends_on_schedule():
+    async def scenario():
+        async with _client() as client:
+            return await run_step(client, ENDPOINTS["health"], rps=50, duration=0.2, missions=10, max_in_flight=8, seed=1)
+
+    summary = asyncio.run(scenario()).summary()
+    assert (summary["sent"], summary["ok"], summary["errors"]) == (10, 10, 0)
+    assert summary["status_codes"] == {"200": 10}
+    assert summary["latency_ms"]["max"] >= summary["latency_ms"]["p50"] > 0
+
+
+def test_ramp_stops_at_the_first_unsustainable_rate():
+    args = benchmark.parse_args(["--rps-start", "20", "--rps-max", "80", "--duration", "0.1"])
+    broken = Endpoint("broken", lambda rng, n: ("GET", "/broken", None))
+
+    async def scenario():
+        async with _client() as client:
+            return await bench_endpoint(client, broken, args)
+
+    result = asyncio.run(scenario())
+    assert len(result["steps"]) == 1 and not result["steps"][0]["sustainable"]
+    assert result["max_sustainable_rps"] == 0.0
+
+
+def test_every_endpoint_targets_an_api_route():
+    paths = [route.path_regex for route in main.app.routes if hasattr(route, "path_regex")]
+    rng = random.Random(1)
+    for endpoint in ENDPOINTS.values():
+        method, path, body = endpoint.request(rng, 100)
+        assert method in ("GET", "POST")
+        assert any(regex.match(path.split("?")[0]) for regex in paths), endpoint.name
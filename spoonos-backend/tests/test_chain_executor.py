@@ -0,0 +1,82 @@
+"""
+Test blockchain executor
+Kiểm tra giới hạn slot của BlockchainExecutor (kể cả khi lời gọi bị hủy) và phản hồi 503 + Retry-After khi quá tải
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from chain_executor import BlockchainExecutor, ChainSaturatedError
+
+
+def test_run_returns_result_and_frees_slot():
+    executor = BlockchainExecutor(max_workers=2, max_queue=0)
+    assert asyncio.run(executor.run(lambda a, b=0: a + b, 1, b=2)) == 3
+    assert executor.stats()["pending"] == 0
+    executor.shutdown()
+
+
+def test_full_executor_rejects_fast():
+    executor = BlockchainExecutor(max_workers=1, max_queue=1, retry_after=7)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.create_task(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ChainSaturatedError) as info:
+            await executor.run(release.wait)
+        assert info.value.retry_after == 7
+
+        with pytest.raises(ChainSaturatedError):
+            async with executor.admit():
+                pass
+
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+    assert executor.stats() == {"pending": 0, "capacity": 2, "workers": 1, "rejected": 2}
+    executor.shutdown()
+
+
+def test_cancelled_call_keeps_its_slot_until_the_thread_finishes():
+    executor = BlockchainExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        task = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # The thread is still blocked, so the slot is still taken
+        pending = executor.stats()["pending"]
+        release.set()
+        assert pending == 1
+
+        for _ in range(100):
+            if executor.stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert await executor.run(lambda: "free") == "free"
+
+    asyncio.run(scenario())
+    assert executor.stats()["pending"] == 0
+    executor.shutdown()
+
+
+def test_saturated_route_answers_503_with_retry_after(monkeypatch):
+    executor = BlockchainExecutor(max_workers=1, max_queue=0, retry_after=3)
+    executor._pending = executor.capacity
+    monkeypatch.setattr(main, "chain_executor", executor)
+
+    client = TestClient(main.app)
+    response = client.post("/api/missions/1/accept", json={"user": "NXV7ZhHiyM1aHXwpVsRZC6BwNFP2jghXAq"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+
+    response = client.get("/api/neo/status")
+    assert response.status_code == 503
+    executor.shutdown()
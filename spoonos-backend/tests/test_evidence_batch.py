@@ -0,0 +1,65 @@
+"""
+Test evidence batching
+Kiểm tra pack_evidences (ngân sách token, số item) và parse_batch_verdicts
+"""
+import json
+
+from evidence_batch import estimate_tokens, format_evidence, pack_evidences, parse_batch_verdicts
+
+
+def _items(count: int, width: int = 40):
+    return [(index, f"[{index}] " + "x" * width) for index in range(count)]
+
+
+def test_single_batch_when_everything_fits():
+    items = _items(5)
+    assert pack_evidences(items, header_tokens=100, prompt_budget=1000, max_items=10) == [items]
+
+
+def test_batches_respect_item_cap_and_keep_order():
+    items = _items(7)
+    batches = pack_evidences(items, header_tokens=0, prompt_budget=10_000, max_items=3)
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [item for batch in batches for item in batch] == items
+
+
+def test_batches_respect_token_budget():
+    items = _items(10, width=400)
+    header = 50
+    budget = 400
+    batches = pack_evidences(items, header_tokens=header, prompt_budget=budget, max_items=100)
+    assert len(batches) > 1
+    for batch in batches:
+        assert header + sum(estimate_tokens(line) + 1 for _, line in batch) <= budget
+
+
+def test_oversized_item_gets_its_own_batch():
+    items = [(0, "short"), (1, "y" * 10_000), (2, "short")]
+    batches = pack_evidences(items, header_tokens=10, prompt_budget=100, max_items=10)
+    assert [[index for index, _ in batch] for batch in batches] == [[0], [1], [2]]
+
+
+def test_format_evidence_is_one_line():
+    line = format_evidence(3, "photo", "chạy\nbộ  5km", "1/1/2025")
+    assert "\n" not in line and line.startswith("[3] ") and "chạy bộ 5km" in line
+
+
+def test_parse_keeps_only_requested_valid_indexes():
+    text = "```json\n" + json.dumps({"verdicts": [
+        {"index": 0, "result": "approve", "confidence": 90, "reason": "ok"},
+        {"index": "2", "result": "reject", "confidence": 10, "reason": "sai"},
+        {"index": 0, "result": "reject", "confidence": 1, "reason": "duplicate"},
+        {"index": 5, "result": "approve", "confidence": 90, "reason": "not asked"},
+        {"index": 3, "result": "maybe", "confidence": 50, "reason": "bad result"},
+        {"index": None, "result": "approve"},
+        "garbage"
+    ]}) + "\n```"
+    verdicts = parse_batch_verdicts(text, [0, 1, 2, 3])
+    assert sorted(verdicts) == [0, 2]
+    assert verdicts[0]["reason"] == "ok"
+    assert verdicts[2]["result"] == "reject"
+
+
+def test_parse_garbled_answer_returns_nothing():
+    assert parse_batch_verdicts("không có JSON", [0, 1]) == {}
+    assert parse_batch_verdicts('{"verdicts": "none"}', [0]) == {}
@@ -0,0 +1,164 @@
+"""
+Test mission indexer
+Kiểm tra MissionIndexer với node giả: backfill lần đầu, đồng bộ theo block và thử lại block lỗi
+"""
+import base64
+import asyncio
+
+import pytest
+
+from indexer import MissionIndexer
+from mission_store import MissionStore
+from neo_rpc import NeoRpcError
+
+CONTRACT = "0x" + "ab" * 20
+
+
+class FakeRpc:
+    def __init__(self):
+        self.blocks = {}
+        self.logs = {}
+
+    async def batch(self, calls, return_exceptions=False):
+        results = []
+        for method, params in calls:
+            if method == "getblock":
+                results.append(self.blocks.get(params[0], {"index": params[0], "tx": []}))
+            elif params[0] in self.logs:
+                results.append(self.logs[params[0]])
+            else:
+                results.append(NeoRpcError("RPC Error: Unknown transaction"))
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, NeoRpcError):
+                    raise result
+        return results
+
+
+class FakeService:
+    mission_contract = CONTRACT
+
+    def __init__(self, mission_count: int, tip: int):
+        self.rpc = FakeRpc()
+        self.missions = {mission_id: self._mission(mission_id) for mission_id in range(1, mission_count + 1)}
+        self.tip = tip
+
+    @staticmethod
+    def _mission(mission_id: int, **fields):
+        return {"id": mission_id, "creator": "0x" + "a1" * 20, "title": f"Mission {mission_id}", "status": "PENDING", **fields}
+
+    async def aget_block_count(self):
+        return self.tip + 1
+
+    async def aget_mission_count(self):
+        return len(self.missions)
+
+    async def aget_missions(self, mission_ids, **kwargs):
+        return [dict(self.missions[mission_id]) for mission_id in mission_ids if mission_id in self.missions]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MissionStore(str(tmp_path / "missions.db"))
+    yield store
+    store.close()
+
+
+def test_first_sync_backfills_every_mission(store):
+    service = FakeService(mission_count=120, tip=500)
+    indexer = MissionIndexer(service, store, batch_size=50)
+
+    assert asyncio.run(indexer.sync_once()) == 0
+    assert store.count() == 120
+    assert store.get_indexed_height() == 500
+
+    # Later syncs walk blocks instead of backfilling again
+    service.tip = 503
+    assert asyncio.run(indexer.sync_once()) == 3
+    assert store.get_indexed_height() == 503
+
+
+def test_backfill_at_height_zero_is_repeated(store):
+    service = FakeService(mission_count=0, tip=0)
+    indexer = MissionIndexer(service, store)
+
+    asyncio.run(indexer.sync_once())
+    # Height 0 means "never synced", so the next sync backfills again
+    assert store.get_indexed_height() == 0
+
+    service.missions[1] = service._mission(1)
+    service.tip = 1
+    asyncio.run(indexer.sync_once())
+    assert store.get_indexed_height() == 1 and store.count() == 1
+
+
+def _write_block(service: FakeService, index: int, tx_hash: str):
+    # Any script mentioning the contract hash makes the indexer fetch the log
+    script = bytes.fromhex(CONTRACT[2:])[::-1]
+    service.rpc.blocks[index] = {
+        "index": index,
+        "tx": [{"hash": tx_hash, "script": base64.b64encode(script).decode()}]
+    }
+
+
+def test_block_with_missing_log_is_retried(store):
+    service = FakeService(mission_count=1, tip=10)
+    indexer = MissionIndexer(service, store)
+    asyncio.run(indexer.sync_once())
+
+    service.tip = 12
+    _write_block(service, 12, "0xaccept")
+    service.missions[1] = service._mission(1, status="IN_PROGRESS")
+
+    with pytest.raises(RuntimeError, match="0xaccept"):
+        asyncio.run(indexer.sync_once())
+    # Block 11 is applied, block 12 is not skipped
+    assert store.get_indexed_height() == 11
+    assert store.get_mission(1)["status"] == "PENDING"
+
+    service.rpc.logs["0xaccept"] = {
+        "txid": "0xaccept",
+        "executions": [{
+            "vmstate": "HALT",
+            "stack": [],
+            "notifications": [{
+                "contract": CONTRACT,
+                "eventname": "MissionAccepted",
+                "state": {"type": "Array", "value": [
+                    {"type": "Integer", "value": "1"},
+                    {"type": "ByteString", "value": base64.b64encode(bytes(20)).decode()}
+                ]}
+            }]
+        }]
+    }
+    assert asyncio.run(indexer.sync_once()) == 1
+    assert store.get_indexed_height() == 12
+    assert store.get_mission(1)["status"] == "IN_PROGRESS"
+
+
+def test_failed_mission_read_stops_the_sync(store):
+    service = FakeService(mission_count=0, tip=10)
+    service.missions[1] = service._mission(1)
+    indexer = MissionIndexer(service, store)
+    asyncio.run(indexer.sync_once())
+
+    async def unreachable(mission_ids, **kwargs):
+        raise NeoRpcError("RPC timeout")
+
+    service.aget_missions = unreachable
+    service.tip = 11
+    _write_block(service, 11, "0xcreate")
+    service.rpc.logs["0xcreate"] = {
+        "txid": "0xcreate",
+        "executions": [{"vmstate": "HALT", "stack": [{"type": "Integer", "value": "2"}], "notifications": [{
+            "contract": CONTRACT,
+            "eventname": "MissionAccepted",
+            "state": {"type": "Array", "value": [
+                {"type": "Integer", "value": "2"},
+                {"type": "ByteString", "value": base64.b64encode(bytes(20)).decode()}
+            ]}
+        }]}]
+    }
+    with pytest.raises(NeoRpcError):
+        asyncio.run(indexer.sync_once())
+    assert store.get_indexed_height() == 10
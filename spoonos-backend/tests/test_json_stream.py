@@ -0,0 +1,71 @@
+"""
+Test JSON stream parser
+Kiểm tra StreamingJsonParser với mọi cách cắt chunk, kể cả cắt giữa escape
+"""
+import json
+
+import pytest
+
+from json_stream import StreamingJsonParser
+
+ASSESSMENT = 'Câu "trích dẫn" \\ xuống\ndòng\ttab 😀 é kết thúc'
+OBJECT = {"overallScore": 82, "aiAssessment": ASSESSMENT, "details": {"a": [1, "}"]}, "passedRequirements": True}
+
+
+def _feed(parser: StreamingJsonParser, text: str, size: int):
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return events
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+def test_object_any_chunking(size, ensure_ascii):
+    text = "Đây là kết quả:\n```json\n" + json.dumps(OBJECT, ensure_ascii=ensure_ascii) + "\n```"
+    parser = StreamingJsonParser()
+    events = _feed(parser, text, size)
+
+    fields = {name: value for kind, name, value in events if kind == "field"}
+    assert fields == OBJECT
+    assert "".join(value for kind, name, value in events if kind == "text" and name == "aiAssessment") == ASSESSMENT
+    assert parser.done
+
+
+@pytest.mark.parametrize("escape", ["\\n", "\\\\", '\\"', "\\u00e9", "\\ud83d\\ude00"])
+def test_escape_split_at_every_offset(escape):
+    text = '{"t": "a' + escape + 'b"}'
+    expected = json.loads(text)["t"]
+    for cut in range(1, len(text)):
+        parser = StreamingJsonParser()
+        events = parser.feed(text[:cut]) + parser.feed(text[cut:])
+        deltas = [value for kind, _, value in events if kind == "text"]
+        assert "".join(deltas) == expected, cut
+        # No delta carries half a surrogate pair
+        assert all(not 0xD800 <= ord(value[-1]) <= 0xDBFF for value in deltas)
+
+
+def test_array_items():
+    items = [{"title": "a"}, {"title": "b, [c]"}, 3]
+    parser = StreamingJsonParser("[")
+    events = _feed(parser, "noise " + json.dumps(items) + " trailing", 4)
+    assert events == [("item", 0, items[0]), ("item", 1, items[1]), ("item", 2, items[2])]
+    assert parser.done
+
+
+def test_text_ends_at_closing_quote():
+    parser = StreamingJsonParser()
+    events = parser.feed('{"a": "xy') + parser.feed('z", "b": 1}')
+    assert [value for kind, _, value in events if kind == "text"] == ["xy", "z"]
+    assert ("field", "a", "xyz") in events and ("field", "b", 1) in events
+
+
+def test_unterminated_answer_is_not_done():
+    parser = StreamingJsonParser()
+    parser.feed('{"overallScore": 50, "aiAssessment": "cut')
+    assert not parser.done
+
+
+def test_rejects_unknown_container():
+    with pytest.raises(ValueError):
+        StreamingJsonParser("(")
@@ -0,0 +1,78 @@
+"""
+Test LLM client
+Kiểm tra LLMProvider dùng chung: giới hạn đồng thời, timeout tính cả thời gian chờ slot và registry LLMClients
+"""
+import asyncio
+
+import pytest
+
+from llm_client import GeminiProvider, LLMClients, LLMError, LLMNotConfiguredError, LLMProvider, LLMTimeoutError
+
+
+class SleepyProvider(LLMProvider):
+    name = "sleepy"
+
+    def __init__(self, delay: float, fail: bool = False, **kwargs):
+        super().__init__("sleepy-1", **kwargs)
+        self.delay = delay
+        self.fail = fail
+        self.peak = 0
+
+    async def _generate(self, prompt, schema=None):
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return prompt.upper()
+
+
+def test_concurrency_is_limited_per_provider():
+    provider = SleepyProvider(0.01, max_concurrency=2)
+
+    async def scenario():
+        return await asyncio.gather(*(provider.generate(f"p{i}") for i in range(6)))
+
+    assert asyncio.run(scenario()) == [f"P{i}" for i in range(6)]
+    assert provider.peak == 2 and provider.in_flight == 0
+    assert provider.stats()["calls"] == 6
+
+
+def test_waiting_for_a_slot_counts_against_the_timeout():
+    provider = SleepyProvider(0.2, max_concurrency=1, timeout=0.3)
+
+    async def scenario():
+        return await asyncio.gather(provider.generate("a"), provider.generate("b"), return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+    assert first == "A"
+    assert isinstance(second, LLMTimeoutError)
+    assert provider.stats()["timeouts"] == 1
+
+
+def test_provider_errors_are_wrapped():
+    provider = SleepyProvider(0, fail=True)
+    with pytest.raises(LLMError, match="quota exceeded"):
+        asyncio.run(provider.generate("a"))
+    assert provider.errors == 1
+
+
+def test_gemini_without_key_is_not_configured():
+    provider = GeminiProvider("gemini-test", api_key=None)
+    assert not provider.configured
+    with pytest.raises(LLMNotConfiguredError):
+        asyncio.run(provider.generate("a"))
+
+
+def test_clients_are_created_once_with_env_limits(monkeypatch):
+    monkeypatch.setenv("LLM_GEMINI_MAX_CONCURRENCY", "3")
+    monkeypatch.setenv("LLM_GEMINI_TIMEOUT", "7.5")
+    clients = LLMClients()
+    gemini = clients.get("gemini")
+    assert clients.get("gemini") is gemini
+    assert (gemini.max_concurrency, gemini.timeout) == (3, 7.5)
+
+    with pytest.raises(LLMError, match="Unknown LLM provider"):
+        clients.get("nonexistent")
+
+    clients.register(SleepyProvider(0))
+    assert set(clients.stats()) == {"gemini", "sleepy"}
@@ -0,0 +1,270 @@
+"""
+Test LLM jobs
+Kiểm tra hàng đợi job: submit/kết quả, thứ tự ưu tiên, 503 khi hàng đợi đầy, lỗi backend, lease và callback URL
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import llm_jobs
+import main
+from llm_jobs import JobQueue, JobQueueFullError, MemoryJobBackend, RedisJobBackend, check_callback_url
+
+EVIDENCE = {
+    "evidenceType": "photo",
+    "description": "Chạy bộ 5km",
+    "date": "2025-01-01",
+    "missionTitle": "Chạy bộ",
+    "missionDescription": "Chạy bộ mỗi ngày"
+}
+
+
+def _queue(**kwargs) -> JobQueue:
+    return JobQueue(MemoryJobBackend(ttl=60), **kwargs)
+
+
+async def _wait(queue: JobQueue, job_id: str):
+    for _ in range(200):
+        job = await queue.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_submitted_job_runs_and_keeps_its_result():
+    queue = _queue(workers=2)
+
+    async def echo(payload):
+        return {"echo": payload["text"]}
+
+    async def boom(payload):
+        raise RuntimeError("provider down")
+
+    queue.register("echo", echo)
+    queue.register("boom", boom)
+
+    async def scenario():
+        queue.start()
+        try:
+            submitted = await queue.submit("echo", {"text": "xin chào"})
+            assert submitted["status"] == "queued" and "payload" not in submitted
+            done = await _wait(queue, submitted["id"])
+            failed = await _wait(queue, (await queue.submit("boom", {}))["id"])
+        finally:
+            await queue.stop()
+        return done, failed
+
+    done, failed = asyncio.run(scenario())
+    assert done["status"] == "done" and done["result"] == {"echo": "xin chào"}
+    assert failed["status"] == "failed" and failed["error"] == "provider down"
+    assert (queue.completed, queue.failed) == (1, 1)
+
+
+def test_higher_priority_runs_first_fifo_within_a_priority():
+    queue = _queue(workers=1)
+    order = []
+
+    async def record(payload):
+        order.append(payload["name"])
+        return {}
+
+    queue.register("record", record)
+
+    async def scenario():
+        jobs = []
+        for name, priority in [("a", 0), ("b", 5), ("c", 0), ("d", 9), ("e", 5)]:
+            jobs.append(await queue.submit("record", {"name": name}, priority))
+        queue.start()
+        try:
+            for job in jobs:
+                await _wait(queue, job["id"])
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+    assert order == ["d", "b", "e", "a", "c"]
+
+
+def test_submit_validates_kind_and_priority():
+    queue = _queue()
+    queue.register("echo", lambda payload: payload)
+    with pytest.raises(ValueError, match="Unknown job kind"):
+        asyncio.run(queue.submit("nope", {}))
+    with pytest.raises(ValueError, match="priority"):
+        asyncio.run(queue.submit("echo", {}, priority=10))
+
+
+def test_full_queue_rejects():
+    queue = _queue(max_queued=1, retry_after=9)
+    queue.register("echo", lambda payload: payload)
+
+    async def scenario():
+        await queue.submit("echo", {})
+        with pytest.raises(JobQueueFullError) as info:
+            await queue.submit("echo", {})
+        assert info.value.retry_after == 9
+
+    asyncio.run(scenario())
+    assert (queue.submitted, queue.rejected) == (1, 1)
+
+
+def test_full_queue_answers_503_with_retry_after(monkeypatch):
+    monkeypatch.setattr(main.llm_jobs, "max_queued", 0)
+    monkeypatch.setattr(main.llm_jobs, "retry_after", 4)
+
+    response = TestClient(main.app).post("/api/jobs/verify-evidence", json=EVIDENCE)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "4"
+
+
+class FakeRedis:
+    """The few redis.asyncio calls RedisJobBackend makes, in memory"""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry_ms = {}
+        self.queue = {}
+
+    async def set(self, key, value, ex=None, px=None):
+        self.values[key] = value
+        self.expiry_ms[key] = px if px is not None else ex * 1000
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def zadd(self, key, mapping):
+        self.queue.update(mapping)
+
+    async def zcard(self, key):
+        return len(self.queue)
+
+    async def scan_iter(self, match, count=None):
+        prefix = match.rstrip("*")
+        for key in list(self.values):
+            if key.startswith(prefix):
+                yield key
+
+
+def _redis_backend() -> RedisJobBackend:
+    backend = RedisJobBackend.__new__(RedisJobBackend)
+    backend._client = FakeRedis()
+    backend.ttl = 60
+    return backend
+
+
+def test_running_job_without_lease_is_requeued():
+    backend = _redis_backend()
+    job = {"id": "j1", "kind": "echo", "status": "running", "priority": 3, "createdAt": 1.0, "startedAt": 2.0}
+
+    async def scenario():
+        await backend.save(job)
+        await backend.lease("j1", 60)
+        # Its worker is still renewing the lease
+        assert await backend.requeue_orphans() == 0
+
+        await backend.release("j1")
+        assert await backend.requeue_orphans() == 1
+        requeued = await backend.load("j1")
+        assert (requeued["status"], requeued["startedAt"]) == ("queued", None)
+        assert await backend.queued() == 1
+        # Finished and queued jobs are left alone
+        assert await backend.requeue_orphans() == 0
+
+    asyncio.run(scenario())
+
+
+def test_job_ttl_below_one_second_still_expires():
+    backend = _redis_backend()
+    backend.ttl = 0.5
+    asyncio.run(backend.save({"id": "j1", "status": "done"}))
+    assert backend._client.expiry_ms["missionstake:job:j1"] == 500
+
+
+class FlakyBackend(MemoryJobBackend):
+    """Memory backend failing load / the running save for chosen jobs"""
+
+    def __init__(self):
+        super().__init__(ttl=60)
+        self.broken_loads = set()
+        self.broken_starts = set()
+
+    async def load(self, job_id):
+        if job_id in self.broken_loads:
+            raise ConnectionError("store unreachable")
+        return await super().load(job_id)
+
+    async def save(self, job):
+        if job["status"] == "running" and job["id"] in self.broken_starts:
+            self.broken_starts.discard(job["id"])
+            raise ConnectionError("store unreachable")
+        await super().save(job)
+
+
+def test_worker_survives_backend_errors(monkeypatch):
+    monkeypatch.setattr(llm_jobs, "WORKER_BACKOFF_SECONDS", 0)
+    backend = FlakyBackend()
+    queue = JobQueue(backend, workers=1)
+
+    async def echo(payload):
+        return payload
+
+    queue.register("echo", echo)
+
+    async def scenario():
+        unreadable = await queue.submit("echo", {"n": 1})
+        unstartable = await queue.submit("echo", {"n": 2})
+        healthy = await queue.submit("echo", {"n": 3})
+        backend.broken_loads.add(unreadable["id"])
+        backend.broken_starts.add(unstartable["id"])
+        queue.start()
+        try:
+            done = await _wait(queue, healthy["id"])
+            failed = await _wait(queue, unstartable["id"])
+            alive = all(not task.done() for task in queue._tasks)
+        finally:
+            await queue.stop()
+        return done, failed, alive
+
+    done, failed, alive = asyncio.run(scenario())
+    assert done["status"] == "done" and done["result"] == {"n": 3}
+    assert failed["status"] == "failed" and "store unreachable" in failed["error"]
+    assert alive and queue.running == 0
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://localhost:8000/hook",
+    "http://10.0.0.5/hook",
+    "http://192.168.1.1/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "ftp://example.com/hook",
+    "not a url",
+])
+def test_callback_url_to_internal_hosts_is_refused(url):
+    with pytest.raises(ValueError):
+        asyncio.run(check_callback_url(url))
+
+
+def test_callback_url_public_address_and_allow_list():
+    asyncio.run(check_callback_url("https://93.184.216.34/hook"))
+    asyncio.run(check_callback_url("http://hooks.internal/x", frozenset({"hooks.internal"})))
+    with pytest.raises(ValueError, match="not allowed"):
+        asyncio.run(check_callback_url("http://127.0.0.1/x", frozenset({"hooks.internal"})))
+
+
+def test_submit_refuses_internal_callback():
+    queue = _queue()
+    queue.register("echo", lambda payload: payload)
+    with pytest.raises(ValueError):
+        asyncio.run(queue.submit("echo", {}, callback_url="http://127.0.0.1:8000/hook"))
+    assert queue.submitted == 0
@@ -0,0 +1,84 @@
+"""
+Test LLM router
+Kiểm tra fallback, hedging và thứ tự provider của LLMRouter với StubProvider (không cần mạng)
+"""
+import asyncio
+
+import pytest
+
+from llm_client import LLMClients, LLMError, LLMNotConfiguredError, StubProvider
+from llm_router import UNHEALTHY_ERROR_RATE, LLMRouter
+
+PROMPT = "Đánh giá bằng chứng"
+
+
+def _router(*providers: StubProvider, hedge_after: float = 0.0, chain=None) -> LLMRouter:
+    clients = LLMClients()
+    for provider in providers:
+        clients.register(provider)
+    return LLMRouter(clients, chain or [provider.name for provider in providers], hedge_after)
+
+
+def test_first_healthy_provider_answers():
+    router = _router(StubProvider("gemini", model="g"), StubProvider("openai", model="o"))
+    response = asyncio.run(router.generate(PROMPT))
+    assert (response.provider, response.model, response.hedged) == ("gemini", "g", False)
+    assert router.fallbacks == 0
+
+
+def test_failure_falls_through_to_next_provider():
+    router = _router(StubProvider("gemini", error_rate=1.0), StubProvider("openai"))
+    response = asyncio.run(router.generate(PROMPT))
+    assert response.provider == "openai"
+    assert router.fallbacks == 1 and router.wins == {"openai": 1}
+
+
+def test_all_providers_failing_raises_last_error():
+    router = _router(StubProvider("gemini", error_rate=1.0), StubProvider("openai", error_rate=1.0))
+    with pytest.raises(LLMError, match="openai"):
+        asyncio.run(router.generate(PROMPT))
+    assert router.failures == 1
+
+
+def test_slow_provider_is_hedged():
+    slow = StubProvider("gemini", latency_ms=2000)
+    router = _router(slow, StubProvider("openai"), hedge_after=0.05)
+    response = asyncio.run(router.generate(PROMPT))
+    assert response.provider == "openai" and response.hedged
+    assert router.hedges == 1
+    # The losing call is cancelled and not counted against the provider
+    assert slow.calls == 0 and slow.error_rate == 0.0
+
+
+def test_unhealthy_provider_moves_back_but_model_id_is_stable():
+    gemini, openai = StubProvider("gemini", model="g"), StubProvider("openai", model="o")
+    router = _router(gemini, openai)
+    model_id = router.model_id
+
+    gemini.error_rate = UNHEALTHY_ERROR_RATE + 0.1
+    assert [provider.name for provider in router.providers()] == ["openai", "gemini"]
+    assert router.model_id == model_id == "g|o"
+
+
+def test_unknown_providers_are_skipped():
+    router = _router(StubProvider("openai"), chain=["nonexistent", "openai"])
+    assert asyncio.run(router.generate(PROMPT)).provider == "openai"
+
+
+def test_empty_chain_is_not_configured():
+    router = _router(chain=["nonexistent"])
+    assert not router.configured
+    with pytest.raises(LLMNotConfiguredError):
+        asyncio.run(router.generate(PROMPT))
+
+
+def test_stream_falls_back_before_first_chunk():
+    router = _router(StubProvider("gemini", error_rate=1.0), StubProvider("openai", chunk_ms=0))
+
+    async def collect():
+        return [chunk async for chunk in router.stream(PROMPT)]
+
+    chunks = asyncio.run(collect())
+    expected = asyncio.run(StubProvider("reference").generate(PROMPT))
+    assert "".join(chunks) == expected
+    assert router.wins == {"openai": 1} and router.fallbacks == 1
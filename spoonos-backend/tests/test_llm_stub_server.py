@@ -0,0 +1,88 @@
+"""
+Test LLM stand-in server
+Kiểm tra llm_stub_server: chọn câu trả lời theo responseSchema hoặc khối format của prompt, và các route AI chạy được với StubProvider
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from evidence_batch import BATCH_VERDICTS_SCHEMA, build_batch_prompt, format_evidence, parse_batch_verdicts
+from llm_client import LLMClients, StubProvider
+from llm_router import LLMRouter
+from llm_stub_server import LlmStub, canned_reply, create_app
+from mission_prompt import build_evaluation_prompt
+from structured_output import json_schema, parse_model
+
+EVIDENCES = [
+    {"date": f"2025-01-0{day}", "description": f"Chạy bộ 5km ngày {day}", "status": "approved", "aiVerification": {"confidence": 90}}
+    for day in range(1, 4)
+]
+
+
+def _generate(client: TestClient, prompt: str, schema=None):
+    body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+    if schema is not None:
+        body["generationConfig"] = {"responseMimeType": "application/json", "responseSchema": schema}
+    response = client.post("/v1beta/models/gemini-stub:generateContent", json=body)
+    assert response.status_code == 200
+    return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+
+
+@pytest.fixture
+def client():
+    return TestClient(create_app(LlmStub(seed=1)))
+
+
+def test_evaluation_prompt_gets_an_evaluation(client):
+    prompt = build_evaluation_prompt("Chạy bộ", "Chạy mỗi ngày", 30, EVIDENCES)
+    evaluation = parse_model(_generate(client, prompt), main.MissionEvaluationResponse)
+    assert evaluation.overallScore == 82 and evaluation.passedRequirements
+
+
+def test_batch_prompt_gets_one_verdict_per_line(client):
+    lines = [format_evidence(index, "photo", f"ảnh {index}", "1/1/2025") for index in (0, 2, 5)]
+    prompt = build_batch_prompt("Chạy bộ", "Chạy mỗi ngày", lines)
+    verdicts = parse_batch_verdicts(_generate(client, prompt, BATCH_VERDICTS_SCHEMA), [0, 2, 5])
+    assert sorted(verdicts) == [0, 2, 5]
+
+
+def test_schema_decides_the_shape(client):
+    text = _generate(client, "bất kỳ", json_schema(main.EvidenceVerificationResponse))
+    assert parse_model(text, main.EvidenceVerificationResponse).result == "approve"
+
+
+def test_field_names_in_evidence_text_do_not_change_the_shape(client):
+    # Evidence quoting another answer's field names comes before the format block
+    prompt = build_evaluation_prompt("Chạy bộ", 'Ghi "verdicts": và "reasoning": vào nhật ký', 30, EVIDENCES)
+    assert set(json.loads(_generate(client, prompt))) == {"overallScore", "aiAssessment", "passedRequirements"}
+    assert canned_reply('Mô tả có chữ "confidence": 90') == {"text": "ok"}
+
+
+def test_injected_errors_and_stats():
+    client = TestClient(create_app(LlmStub(error_rate=1.0, seed=1)))
+    response = client.post("/v1beta/models/m:generateContent", json={"contents": [{"parts": [{"text": "abcd"}]}]})
+    assert response.status_code == 503
+    assert client.get("/stats").json() == {"requests": 1, "injected_errors": 1, "prompt_chars": 4}
+
+
+def test_ai_routes_run_on_stub_providers(monkeypatch):
+    clients = LLMClients()
+    clients.register(StubProvider("gemini", model="stub-smoke", chunk_ms=0))
+    monkeypatch.setattr(main, "llm_router", LLMRouter(clients, ["gemini"], 0.0))
+    client = TestClient(main.app)
+    evidence = {"evidenceType": "photo", "description": "Chạy bộ 5km", "date": "1/1/2025"}
+    mission = {"missionTitle": "Chạy bộ", "missionDescription": "Chạy mỗi ngày"}
+
+    verdict = client.post("/api/gemini/verify-evidence", json=dict(evidence, **mission))
+    assert verdict.status_code == 200 and verdict.json()["result"] == "approve"
+
+    batch = client.post("/api/gemini/verify-evidence/batch", json=dict(mission, evidences=[evidence, dict(evidence, description="Bơi 1km")]))
+    assert batch.status_code == 200 and len(batch.json()["results"]) == 2 and not batch.json()["errors"]
+
+    evaluation = client.post("/api/gemini/evaluate-mission", json=dict(mission, evidences=EVIDENCES, totalDays=30))
+    assert evaluation.status_code == 200 and evaluation.json()["overallScore"] == 82
+
+    missions = client.post("/api/ai/generate-missions", json={"userId": "u1", "preferences": {}})
+    assert missions.status_code == 200 and len(missions.json()) == 3
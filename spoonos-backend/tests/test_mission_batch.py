@@ -0,0 +1,61 @@
+"""
+Test mission batch endpoints
+Kiểm tra /api/neo/create-missions và /api/missions/verify-batch (dữ liệu giả lập)
+"""
+from fastapi.testclient import TestClient
+
+import main
+from neo_service import MAX_BATCH_SIZE
+
+VERIFIER = "NXV7ZhHiyM1aHXwpVsRZC6BwNFP2jghXAq"
+
+
+def _client() -> TestClient:
+    return TestClient(main.app)
+
+
+def test_create_missions_keeps_input_order():
+    missions = [
+        {"title": "Chạy bộ", "description": "5km mỗi sáng", "reward_amount": 20, "category": "health"},
+        {"title": "Đọc sách", "description": "30 phút mỗi tối"}
+    ]
+    response = _client().post("/api/neo/create-missions", json={"creator": VERIFIER, "missions": missions})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] and body["count"] == 2 and body["txHash"]
+    assert [mission["title"] for mission in body["data"]["data"]] == ["Chạy bộ", "Đọc sách"]
+    assert [mission["id"] for mission in body["data"]["data"]] == body["missionIds"]
+    assert body["data"]["data"][1]["reward"] == 10 and body["data"]["data"][1]["category"] == "general"
+
+
+def test_create_missions_rejects_bad_batches():
+    client = _client()
+    too_many = [{"title": "t", "description": "d"}] * (MAX_BATCH_SIZE + 1)
+    for missions in ([], "not a list", too_many, [{"title": "t"}]):
+        response = client.post("/api/neo/create-missions", json={"missions": missions})
+        assert response.status_code == 400, missions
+
+
+def test_verify_batch_answers_per_item():
+    items = [{"missionId": 3, "approved": True}, {"missionId": 5, "approved": False}]
+    response = _client().post("/api/missions/verify-batch", json={"verifier": VERIFIER, "items": items})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] and body["txHash"]
+    assert body["results"] == [
+        {"missionId": 3, "verified": True, "rewardDistributed": True},
+        {"missionId": 5, "verified": True, "rewardDistributed": False}
+    ]
+
+
+def test_verify_batch_rejects_bad_requests():
+    client = _client()
+    too_many = [{"missionId": 1}] * (MAX_BATCH_SIZE + 1)
+    for data in (
+        {"items": [{"missionId": 1}]},
+        {"verifier": VERIFIER, "items": []},
+        {"verifier": VERIFIER, "items": too_many},
+        {"verifier": VERIFIER, "items": [{"missionId": "1"}]}
+    ):
+        response = client.post("/api/missions/verify-batch", json=data)
+        assert response.status_code == 400, data
@@ -0,0 +1,120 @@
+"""
+Test mission evaluation state
+Kiểm tra MissionEvaluationStore.plan: unchanged / incremental / full và khóa theo missionId
+"""
+import asyncio
+
+from mission_evaluation import MissionEvaluationStore, evaluation_key
+from verdict_cache import MemoryVerdictBackend
+
+ASSESSMENT = {"overallScore": 80, "aiAssessment": "Đều đặn", "passedRequirements": True}
+ACTIVITIES = ["chạy bộ", "bơi lội", "đạp xe", "leo núi", "yoga", "gym", "đi bộ", "nhảy dây"]
+
+
+def _tag(number: int) -> str:
+    # Bare numbers are ignored when merging near-duplicates, letters are not
+    return "khu" + chr(ord("a") + number % 26) + chr(ord("a") + number // 26)
+
+
+def _evidence(day: int, month: int = 1):
+    return {
+        "date": f"2025-{month:02d}-{day:02d}",
+        "description": f"Ngày {day}: {ACTIVITIES[day % len(ACTIVITIES)]} {day * 7} phút tại {_tag(month * 31 + day)}",
+        "status": "approved",
+        "aiVerification": {"confidence": 80}
+    }
+
+
+EVIDENCES = [_evidence(day) for day in range(1, 31)]
+
+
+def _store(**kwargs) -> MissionEvaluationStore:
+    return MissionEvaluationStore(MemoryVerdictBackend(100, 3600), **kwargs)
+
+
+def _plan(store, evidences, key="k", total_days=31):
+    return asyncio.run(store.plan(key, "Vận động", "Vận động mỗi ngày", total_days, evidences))
+
+
+def _evaluate(store, evidences, key="k", total_days=31):
+    plan = _plan(store, evidences, key, total_days)
+    asyncio.run(store.record(plan, ASSESSMENT))
+    return plan
+
+
+def test_evaluation_key_needs_a_mission_id():
+    assert evaluation_key("gemini:m", None) is None
+    assert evaluation_key("gemini:m", "") is None
+    assert evaluation_key("gemini:m", "42") == evaluation_key("gemini:m", "42")
+    assert evaluation_key("gemini:m", "42") != evaluation_key("openai:m", "42")
+    assert evaluation_key("gemini:m", "42") != evaluation_key("gemini:m", "43")
+
+
+def test_first_evaluation_is_full():
+    plan = _evaluate(_store(), EVIDENCES[:10])
+    assert plan.mode == "full" and plan.prompt and plan.watermark == 10
+
+
+def test_unchanged_list_reuses_assessment():
+    store = _store()
+    _evaluate(store, EVIDENCES[:10])
+    plan = _plan(store, EVIDENCES[:10])
+    assert plan.mode == "unchanged" and plan.prompt is None and plan.assessment == ASSESSMENT
+
+
+def test_appended_evidences_are_incremental():
+    store = _store()
+    _evaluate(store, EVIDENCES[:10])
+    plan = _plan(store, EVIDENCES[:12])
+    assert plan.mode == "incremental" and plan.increments == 1
+    assert EVIDENCES[11]["description"] in plan.prompt
+    assert EVIDENCES[0]["description"] not in plan.prompt
+
+
+def test_edited_history_is_full():
+    store = _store()
+    _evaluate(store, EVIDENCES[:10])
+    edited = [dict(EVIDENCES[0], description="đã sửa")] + EVIDENCES[1:12]
+    assert _plan(store, edited).mode == "full"
+
+
+def test_changed_total_days_is_full():
+    store = _store()
+    _evaluate(store, EVIDENCES[:10])
+    assert _plan(store, EVIDENCES[:12], total_days=60).mode == "full"
+
+
+def test_max_increments_forces_full():
+    store = _store(max_increments=2)
+    _evaluate(store, EVIDENCES[:10])
+    assert _evaluate(store, EVIDENCES[:11]).mode == "incremental"
+    assert _evaluate(store, EVIDENCES[:12]).mode == "incremental"
+    assert _evaluate(store, EVIDENCES[:13]).mode == "full"
+    assert _plan(store, EVIDENCES[:14]).mode == "incremental"
+
+
+def test_large_delta_is_full():
+    store = _store()
+    _evaluate(store, [], total_days=60)
+    many = [_evidence(day) for day in range(1, 29)] + [_evidence(day, month=2) for day in range(1, 6)]
+    assert _plan(store, many, total_days=60).mode == "full"
+    assert _plan(store, many[:5], total_days=60).mode == "incremental"
+
+
+def test_requests_without_key_keep_no_state():
+    store = _store()
+    _evaluate(store, EVIDENCES[:10], key=None)
+    assert _plan(store, EVIDENCES[:10], key=None).mode == "full"
+    assert store.stats()["entries"] == 0
+
+
+def test_missions_do_not_share_state():
+    store = _store()
+    _evaluate(store, EVIDENCES[:10], key="a")
+    assert _plan(store, EVIDENCES[:10], key="b").mode == "full"
+
+
+def test_disabled_store_is_always_full():
+    store = MissionEvaluationStore(enabled=False)
+    _evaluate(store, EVIDENCES[:10])
+    assert _plan(store, EVIDENCES[:10]).mode == "full"
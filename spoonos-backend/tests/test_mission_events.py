@@ -0,0 +1,103 @@
+"""
+Test mission events
+Kiểm tra decode_mission_events với notification của từng event trong MissionContract
+"""
+import base64
+
+import pytest
+
+from neo_service import MISSION_EVENTS, decode_mission_events
+
+CONTRACT = "0x" + "ab" * 20
+CREATOR = bytes(range(1, 21))
+ASSIGNEE = bytes(range(21, 41))
+
+
+def _stack_item(value):
+    # Notification states arrive as RPC JSON stack items
+    if isinstance(value, bool):
+        return {"type": "Boolean", "value": value}
+    if isinstance(value, int):
+        return {"type": "Integer", "value": str(value)}
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    if isinstance(value, bytes):
+        return {"type": "ByteString", "value": base64.b64encode(value).decode()}
+    return {"type": "Array", "value": [_stack_item(item) for item in value]}
+
+
+def _log(*notifications, vmstate="HALT", contract=CONTRACT):
+    return {
+        "txid": "0x" + "11" * 32,
+        "executions": [{
+            "vmstate": vmstate,
+            "notifications": [
+                {"contract": contract, "eventname": name, "state": _stack_item(values)}
+                for name, values in notifications
+            ]
+        }]
+    }
+
+
+def _address(script_hash: bytes) -> str:
+    return "0x" + script_hash[::-1].hex()
+
+
+@pytest.mark.parametrize("name, values, expected", [
+    (
+        "MissionCreated",
+        [7, CREATOR, "Chạy bộ", "5km mỗi ngày", 10, 1_900_000_000, "fitness", 1_800_000_000],
+        {"mission_id": 7, "creator": _address(CREATOR), "title": "Chạy bộ", "description": "5km mỗi ngày",
+         "reward": 10, "deadline": 1_900_000_000, "category": "fitness", "created_at": 1_800_000_000,
+         "status": "PENDING"}
+    ),
+    (
+        "MissionAccepted",
+        [7, ASSIGNEE],
+        {"mission_id": 7, "assignee": _address(ASSIGNEE), "status": "IN_PROGRESS"}
+    ),
+    (
+        "MissionCompleted",
+        [7, ASSIGNEE, "ipfs://ảnh", 1_850_000_000],
+        {"mission_id": 7, "assignee": _address(ASSIGNEE), "proof": "ipfs://ảnh",
+         "completed_at": 1_850_000_000, "status": "COMPLETED"}
+    ),
+    (
+        "MissionVerified",
+        [7, CREATOR, True, 3],
+        {"mission_id": 7, "verifier": _address(CREATOR), "approved": True, "status": "VERIFIED"}
+    ),
+    (
+        "MissionCancelled",
+        [7, CREATOR],
+        {"mission_id": 7, "creator": _address(CREATOR), "status": "CANCELLED"}
+    ),
+])
+def test_event_round_trip(name, values, expected):
+    assert len(values) == len(MISSION_EVENTS[name])
+    events = decode_mission_events(_log((name, values)), CONTRACT)
+    assert events == [{"event": name, "tx_hash": "0x" + "11" * 32, **expected}]
+
+
+def test_rejected_verification_keeps_status_from_event():
+    events = decode_mission_events(_log(("MissionVerified", [7, CREATOR, False, 1])), CONTRACT)
+    assert (events[0]["approved"], events[0]["status"]) == (False, "IN_PROGRESS")
+
+
+def test_events_keep_emission_order():
+    log = _log(("MissionAccepted", [1, ASSIGNEE]), ("MissionCancelled", [2, CREATOR]))
+    assert [event["event"] for event in decode_mission_events(log, CONTRACT)] == ["MissionAccepted", "MissionCancelled"]
+
+
+def test_contract_hash_is_case_insensitive():
+    log = _log(("MissionAccepted", [1, ASSIGNEE]), contract=CONTRACT.upper().replace("0X", "0x"))
+    assert len(decode_mission_events(log, CONTRACT)) == 1
+
+
+def test_ignored_notifications():
+    other_contract = _log(("MissionAccepted", [1, ASSIGNEE]), contract="0x" + "cd" * 20)
+    faulted = _log(("MissionAccepted", [1, ASSIGNEE]), vmstate="FAULT")
+    unknown = _log(("Transfer", [1, ASSIGNEE]))
+    short = _log(("MissionCompleted", [1, ASSIGNEE]))
+    for log in (other_contract, faulted, unknown, short):
+        assert decode_mission_events(log, CONTRACT) == []
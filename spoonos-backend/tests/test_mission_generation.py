@@ -0,0 +1,86 @@
+"""
+Test mission generation routes
+Kiểm tra /api/ai/generate-missions và bản stream: cùng kết quả, cứu câu trả lời bị cắt và số đếm của event done
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from llm_client import LLMClients, StubProvider
+from llm_router import LLMRouter
+
+MISSION = {
+    "id": "mission_1",
+    "title": "Chạy bộ buổi sáng",
+    "description": "Chạy 3km trước 7 giờ",
+    "category": "thể thao",
+    "difficulty": "easy",
+    "estimatedTime": 30,
+    "rewards": {"xp": 100, "coins": 200},
+    "tags": ["sức khỏe"],
+    "reasoning": "Bạn thích vận động"
+}
+MISSIONS = [MISSION, dict(MISSION, id="mission_2", title="Đọc sách")]
+REQUEST = {"userId": "u1", "preferences": {"interests": ["thể thao"]}}
+
+
+class TextProvider(StubProvider):
+    """Stub provider answering with a fixed text"""
+
+    def __init__(self, text: str):
+        super().__init__("gemini", chunk_ms=0)
+        self.text = text
+
+    async def _generate(self, prompt, schema=None):
+        return self.text
+
+
+@pytest.fixture
+def answer(monkeypatch):
+    def use(text: str):
+        clients = LLMClients()
+        clients.register(TextProvider(text))
+        monkeypatch.setattr(main, "llm_router", LLMRouter(clients, ["gemini"], 0.0))
+    return use
+
+
+def _events(response):
+    events = []
+    for frame in response.text.strip().split("\n\n"):
+        event, data = frame.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_routes_agree(answer):
+    answer("Đây là gợi ý:\n" + json.dumps(MISSIONS, ensure_ascii=False))
+    client = TestClient(main.app)
+
+    missions = client.post("/api/ai/generate-missions", json=REQUEST).json()
+    events = _events(client.post("/api/ai/generate-missions/stream", json=REQUEST))
+    assert missions == MISSIONS
+    assert events == [("mission", MISSIONS[0]), ("mission", MISSIONS[1]), ("done", {"count": 2})]
+
+
+def test_salvaged_missions_are_counted(answer):
+    # The parser latches onto the stray "[" and never closes; the fallback finds the array
+    answer("Chú ý [: " + json.dumps(MISSIONS, ensure_ascii=False))
+    events = _events(TestClient(main.app).post("/api/ai/generate-missions/stream", json=REQUEST))
+    assert events == [("mission", MISSIONS[0]), ("mission", MISSIONS[1]), ("done", {"count": 2})]
+
+
+def test_nothing_to_salvage_ends_the_stream_normally(answer):
+    answer('[{"id": "mission_1", "title": "Chạy')
+    events = _events(TestClient(main.app).post("/api/ai/generate-missions/stream", json=REQUEST))
+    assert events == [("done", {"count": 0})]
+
+
+def test_placeholders_without_a_provider(monkeypatch):
+    monkeypatch.setattr(main, "llm_router", LLMRouter(LLMClients(), ["nonexistent"], 0.0))
+    client = TestClient(main.app)
+    missions = client.post("/api/ai/generate-missions", json=REQUEST).json()
+    events = _events(client.post("/api/ai/generate-missions/stream", json=REQUEST))
+    assert [mission for kind, mission in events if kind == "mission"] == missions
+    assert events[-1] == ("done", {"count": len(missions)})
@@ -0,0 +1,70 @@
+"""
+Test mission prescore
+Kiểm tra ngưỡng pass/fail của MissionPrescorer và các trường hợp phải hỏi LLM
+"""
+from mission_prescore import PASS_SCORE, MissionPrescorer
+
+
+def _evidences(days: int, confidence: int = 95, status: str = "approved"):
+    return [
+        {"date": f"2025-01-{day:02d}", "status": status, "aiVerification": {"confidence": confidence}}
+        for day in range(1, days + 1)
+    ]
+
+
+def test_full_coverage_and_confidence_passes():
+    prescorer = MissionPrescorer()
+    verdict = prescorer.score(_evidences(30), 30)
+    assert verdict["passedRequirements"] is True
+    assert verdict["overallScore"] >= PASS_SCORE
+    assert prescorer.passed == 1
+
+
+def test_pass_thresholds_are_inclusive():
+    prescorer = MissionPrescorer(pass_coverage=0.9, pass_confidence=85)
+    assert prescorer.score(_evidences(27, confidence=85), 30) is not None
+    assert prescorer.score(_evidences(26, confidence=85), 30) is None
+    assert prescorer.score(_evidences(27, confidence=84), 30) is None
+
+
+def test_no_evidence_fails():
+    prescorer = MissionPrescorer()
+    for evidences in ([], _evidences(5, status="rejected")):
+        verdict = prescorer.score(evidences, 30)
+        assert verdict["passedRequirements"] is False and verdict["overallScore"] == 0
+    assert prescorer.failed == 2
+
+
+def test_pending_evidence_is_not_failed():
+    assert MissionPrescorer().score(_evidences(3, status="pending"), 30) is None
+
+
+def test_low_coverage_is_left_to_the_llm():
+    # The request does not say how many days have elapsed
+    assert MissionPrescorer().score(_evidences(3), 30) is None
+
+
+def test_undated_evidence_is_left_to_the_llm():
+    evidences = _evidences(30) + [{"date": "hôm qua", "status": "approved", "aiVerification": {"confidence": 95}}]
+    assert MissionPrescorer().score(evidences, 30) is None
+
+
+def test_missing_total_days_is_left_to_the_llm():
+    assert MissionPrescorer().score(_evidences(30), 0) is None
+
+
+def test_disabled_never_scores():
+    prescorer = MissionPrescorer(enabled=False)
+    assert prescorer.score([], 30) is None
+    assert prescorer.stats()["escalated"] == 0
+
+
+def test_stats_skip_rate():
+    prescorer = MissionPrescorer()
+    prescorer.score(_evidences(30), 30)
+    prescorer.score([], 30)
+    prescorer.score(_evidences(3), 30)
+    prescorer.score(_evidences(3), 30)
+    stats = prescorer.stats()
+    assert (stats["passed"], stats["failed"], stats["escalated"]) == (1, 1, 2)
+    assert stats["skip_rate"] == 0.5
@@ -0,0 +1,63 @@
+"""
+Test mission prompt
+Kiểm tra prompt đánh giá nhiệm vụ nằm trong ngân sách token dù có nhiều bằng chứng
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from evidence_batch import estimate_tokens
+from mission_prompt import EVALUATION_PROMPT_TOKENS, build_evaluation_prompt
+
+ACTIVITIES = ["chạy bộ", "bơi lội", "đạp xe", "leo núi", "yoga", "gym", "đi bộ", "nhảy dây", "tập tạ", "thiền"]
+START = date(2025, 1, 1)
+
+
+def _evidences(days: int, per_day: int = 1):
+    evidences = []
+    for offset in range(days):
+        day = START + timedelta(days=offset)
+        for slot in range(per_day):
+            activity = ACTIVITIES[(offset + slot) % len(ACTIVITIES)]
+            evidences.append({
+                "date": day.isoformat(),
+                "description": f"{activity} buổi {slot} ngày {day:%d/%m} tại khu {chr(97 + offset % 26)}{chr(97 + offset // 26 % 26)}",
+                "status": "approved",
+                "aiVerification": {"confidence": 70 + offset % 30}
+            })
+    return evidences
+
+
+def _prompt(evidences, budget=EVALUATION_PROMPT_TOKENS, total_days=None):
+    return build_evaluation_prompt("Vận động", "Vận động mỗi ngày", total_days or 365, evidences, budget)
+
+
+@pytest.mark.parametrize("days, per_day", [(30, 1), (365, 1), (365, 5)])
+def test_prompt_stays_within_budget(days, per_day):
+    assert estimate_tokens(_prompt(_evidences(days, per_day))) <= EVALUATION_PROMPT_TOKENS
+
+
+@pytest.mark.parametrize("budget", [800, 1500, 3000])
+def test_smaller_budgets_are_respected(budget):
+    assert estimate_tokens(_prompt(_evidences(365), budget)) <= budget
+
+
+def test_newest_evidence_is_quoted_verbatim():
+    evidences = _evidences(365)
+    prompt = _prompt(evidences)
+    assert evidences[-1]["description"] in prompt
+    # The oldest ones only appear in the weekly summary
+    assert evidences[0]["description"] not in prompt
+    assert "TỔNG HỢP THEO TUẦN" in prompt
+
+
+def test_short_mission_quotes_everything():
+    evidences = _evidences(10)
+    prompt = _prompt(evidences, total_days=10)
+    assert all(evidence["description"] in prompt for evidence in evidences)
+
+
+def test_rejected_evidence_is_not_quoted():
+    evidences = _evidences(5)
+    evidences[-1] = dict(evidences[-1], status="rejected")
+    assert evidences[-1]["description"] not in _prompt(evidences)
@@ -0,0 +1,159 @@
+"""
+Test mission store
+Kiểm tra bản chiếu SQLite: missions của user, phân trang cursor, bộ lọc và áp dụng event
+"""
+import pytest
+
+from mission_store import MissionStore
+
+ALICE = "0x" + "a1" * 20
+BOB = "0x" + "b0" * 20
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MissionStore(str(tmp_path / "missions.db"))
+    yield store
+    store.close()
+
+
+def _mission(mission_id: int, **fields):
+    return {
+        "id": mission_id,
+        "creator": ALICE,
+        "title": f"Mission {mission_id}",
+        "description": "",
+        "reward": 10,
+        "deadline": 1_900_000_000 + mission_id,
+        "category": "fitness" if mission_id % 2 else "study",
+        "status": "PENDING",
+        **fields
+    }
+
+
+def test_upsert_and_read_back(store):
+    store.upsert_missions([_mission(1, proof="ipfs://a"), _mission(2)], height=5)
+    store.upsert_missions([_mission(1, status="COMPLETED")], height=6)
+
+    mission = store.get_mission(1)
+    assert mission["status"] == "COMPLETED"
+    # A record without a proof keeps the one already stored
+    assert mission["proof"] == "ipfs://a"
+    assert [m["id"] for m in store.get_missions([2, 9, 1])] == [2, 1]
+    assert store.get_mission(9) is None
+
+
+def test_indexed_height(store):
+    assert store.get_indexed_height() == 0
+    store.set_indexed_height(100)
+    store.set_indexed_height(101)
+    assert store.get_indexed_height() == 101
+
+
+def test_user_missions_union_creator_and_assignee(store):
+    store.upsert_missions([
+        _mission(1),
+        _mission(2, creator=BOB, assignee=ALICE),
+        _mission(3, creator=BOB),
+        _mission(4, assignee=ALICE),
+    ], height=1)
+
+    assert store.get_user_mission_ids(ALICE) == [1, 2, 4]
+    assert store.get_user_mission_ids(BOB) == [2, 3]
+
+
+def _ids(missions):
+    return [mission["id"] for mission in missions]
+
+
+def test_list_missions_pages_are_stable(store):
+    store.upsert_missions([_mission(mission_id) for mission_id in range(1, 26)], height=1)
+
+    first, cursor = store.list_missions(limit=10)
+    assert _ids(first) == list(range(25, 15, -1)) and cursor == 16
+
+    # Missions created between pages do not shift the next page
+    store.upsert_missions([_mission(26), _mission(27)], height=2)
+    second, cursor = store.list_missions(cursor=cursor, limit=10)
+    assert _ids(second) == list(range(15, 5, -1)) and cursor == 6
+
+    last, cursor = store.list_missions(cursor=cursor, limit=10)
+    assert _ids(last) == [5, 4, 3, 2, 1] and cursor is None
+
+
+def test_exact_last_page_has_no_cursor(store):
+    store.upsert_missions([_mission(mission_id) for mission_id in range(1, 5)], height=1)
+    missions, cursor = store.list_missions(limit=4)
+    assert len(missions) == 4 and cursor is None
+
+
+def test_list_missions_filters(store):
+    store.upsert_missions([
+        _mission(1, status="COMPLETED"),
+        _mission(2, status="COMPLETED"),
+        _mission(3, status="COMPLETED", creator=BOB),
+        _mission(4),
+        _mission(5, status="COMPLETED"),
+    ], height=1)
+
+    assert _ids(store.list_missions(status="COMPLETED")[0]) == [5, 3, 2, 1]
+    assert _ids(store.list_missions(status="COMPLETED", category="fitness")[0]) == [5, 3, 1]
+    assert _ids(store.list_missions(status="COMPLETED", creator=BOB)[0]) == [3]
+    assert _ids(store.list_missions(deadline_from=1_900_000_002, deadline_to=1_900_000_004)[0]) == [4, 3, 2]
+
+    page, cursor = store.list_missions(status="COMPLETED", category="fitness", limit=2)
+    assert _ids(page) == [5, 3] and cursor == 3
+    assert _ids(store.list_missions(status="COMPLETED", category="fitness", cursor=cursor)[0]) == [1]
+    assert store.list_missions(status="VERIFIED") == ([], None)
+
+
+def test_user_missions_page(store):
+    store.upsert_missions([_mission(mission_id, creator=BOB if mission_id % 3 else ALICE) for mission_id in range(1, 10)], height=1)
+    assert store.get_user_mission_ids(ALICE) == [3, 6, 9]
+    assert store.get_user_mission_ids(ALICE, offset=1, limit=1) == [6]
+    assert store.get_user_mission_ids(ALICE, offset=3) == []
+
+
+CREATED = {
+    "event": "MissionCreated", "mission_id": 1, "creator": ALICE, "title": "Chạy bộ", "description": "5km",
+    "reward": 10, "deadline": 1_900_000_000, "category": "fitness", "created_at": 1_800_000_000, "status": "PENDING"
+}
+EVENTS = [
+    CREATED,
+    {"event": "MissionAccepted", "mission_id": 1, "assignee": BOB, "status": "IN_PROGRESS"},
+    {"event": "MissionCompleted", "mission_id": 1, "assignee": BOB, "proof": "ipfs://a",
+     "completed_at": 1_850_000_000, "status": "COMPLETED"},
+]
+
+
+def test_apply_events_builds_the_mission(store):
+    assert store.apply_events(EVENTS, height=10) == []
+    mission = store.get_mission(1)
+    assert (mission["status"], mission["assignee"], mission["proof"]) == ("COMPLETED", BOB, "ipfs://a")
+    assert mission["completed_at"] == 1_850_000_000 and mission["title"] == "Chạy bộ"
+
+
+def test_apply_events_is_idempotent(store):
+    store.apply_events(EVENTS, height=10)
+    before = store.get_mission(1)
+    # A block applied twice (e.g. retried after a crash) leaves the same state
+    assert store.apply_events(EVENTS, height=10) == []
+    assert store.get_mission(1) == before
+    assert store.count() == 1
+    assert store.get_user_mission_ids(BOB) == [1]
+
+
+def test_apply_events_reports_unknown_missions(store):
+    events = [
+        {"event": "MissionAccepted", "mission_id": 4, "assignee": BOB, "status": "IN_PROGRESS"},
+        {"event": "MissionCancelled", "mission_id": 4, "creator": ALICE, "status": "CANCELLED"},
+    ]
+    assert store.apply_events(events, height=10) == [4]
+    assert store.get_mission(4) is None
+
+
+def test_stalled_projection_is_not_ready(store):
+    assert not store.is_ready(tip=0)
+    store.set_indexed_height(100)
+    assert store.is_ready(tip=102, max_lag=2)
+    assert not store.is_ready(tip=103, max_lag=2)
@@ -0,0 +1,105 @@
+"""
+Test NEO read cache
+Kiểm tra BlockReadCache: TTL, LRU, xóa khi có block mới và bỏ kết quả tải trễ
+"""
+import asyncio
+import time
+
+from neo_cache import BlockReadCache
+from neo_service import NeoService
+
+
+def _service(cache: BlockReadCache) -> NeoService:
+    # Only the cache is needed for _acached
+    service = NeoService.__new__(NeoService)
+    service.cache = cache
+    return service
+
+
+def test_hit_and_miss():
+    cache = BlockReadCache()
+    key = cache.make_key("get_mission", [1])
+    assert cache.get(key) == (False, None)
+    cache.set(key, {"id": 1})
+    assert cache.get(key) == (True, {"id": 1})
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_make_key_ignores_param_order():
+    assert BlockReadCache.make_key("m", {"a": 1, "b": 2}) == BlockReadCache.make_key("m", {"b": 2, "a": 1})
+
+
+def test_new_block_invalidates():
+    cache = BlockReadCache()
+    cache.set("k", 1)
+    assert cache.observe_block_height(10) is True
+    assert cache.get("k") == (False, None)
+    assert cache.invalidations == 1
+
+
+def test_same_or_lower_height_keeps_entries():
+    cache = BlockReadCache()
+    cache.observe_block_height(10)
+    cache.set("k", 1)
+    assert cache.observe_block_height(10) is False
+    assert cache.observe_block_height(9) is False
+    assert cache.get("k") == (True, 1)
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = BlockReadCache(ttl=5)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set("k", 1)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert cache.get("k") == (False, None)
+
+
+def test_lru_eviction():
+    cache = BlockReadCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.evictions == 1
+
+
+def test_set_drops_value_loaded_before_invalidation():
+    cache = BlockReadCache()
+    generation = cache.generation
+    cache.observe_block_height(5)
+    cache.set("k", "stale", generation=generation)
+    assert cache.get("k") == (False, None)
+    assert cache.stale_sets == 1
+
+    cache.set("k", "fresh", generation=cache.generation)
+    assert cache.get("k") == (True, "fresh")
+
+
+def test_load_straddling_a_block_is_not_cached():
+    cache = BlockReadCache()
+    service = _service(cache)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_load():
+            await release.wait()
+            return "old"
+
+        task = asyncio.create_task(service._acached("get_mission_count", [], slow_load))
+        await asyncio.sleep(0)
+        cache.observe_block_height(100)
+        release.set()
+        assert await task == "old"
+        assert cache.get(cache.make_key("get_mission_count", [])) == (False, None)
+
+        async def load():
+            return "new"
+
+        assert await service._acached("get_mission_count", [], load) == "new"
+        assert cache.get(cache.make_key("get_mission_count", [])) == (True, "new")
+
+    asyncio.run(scenario())
@@ -0,0 +1,74 @@
+"""
+Test NEO codec
+Kiểm tra StdLib.serialize/deserialize và script gọi contract (không cần mạng)
+"""
+import pytest
+
+from neo_codec import (
+    build_contract_call,
+    decode_contract_calls,
+    deserialize_stack_item,
+    serialize_stack_item
+)
+
+CONTRACT = "0x" + "5354" * 10
+
+
+@pytest.mark.parametrize("value", [
+    None,
+    True,
+    False,
+    0,
+    1,
+    -1,
+    127,
+    128,
+    255,
+    -129,
+    2 ** 64,
+    b"",
+    b"\x00\xff",
+    b"x" * 300,  # length needs a 0xFD varint
+    [],
+    [1, b"a", [True, None]],
+    {b"k": 1, 2: [b"v"]},
+])
+def test_serialize_round_trip(value):
+    assert deserialize_stack_item(serialize_stack_item(value)) == value
+
+
+def test_strings_come_back_as_bytes():
+    assert deserialize_stack_item(serialize_stack_item("chạy bộ")) == "chạy bộ".encode("utf-8")
+
+
+def test_mission_record_layout():
+    mission = [7, b"\xab" * 20, b"Title", b"Desc", 10, 1_900_000_000, b"fitness", 0, b"", 0, 0]
+    data = serialize_stack_item(mission)
+    assert data[0] == 0x40  # Array
+    assert deserialize_stack_item(data) == mission
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"\x28\x05abc",  # ByteString shorter than its length
+    b"\x21\x01\x01\x00",  # trailing bytes
+    b"\x99",  # unknown item type
+])
+def test_deserialize_rejects_malformed_input(data):
+    with pytest.raises(ValueError):
+        deserialize_stack_item(data)
+
+
+def test_contract_call_round_trip():
+    args = [b"\xab" * 20, "Title", 5, -1, 300, True, None, [1, 2], []]
+    script = build_contract_call(CONTRACT, "create_mission", args)
+
+    [call] = decode_contract_calls(script, CONTRACT)
+    assert call["contract"] == CONTRACT
+    assert call["method"] == "create_mission"
+    assert call["args"] == [b"\xab" * 20, b"Title", 5, -1, 300, True, None, [1, 2], []]
+
+
+def test_decode_filters_other_contracts():
+    script = build_contract_call(CONTRACT, "get_mission", [1])
+    assert decode_contract_calls(script, "0x" + "00" * 20) == []
@@ -0,0 +1,131 @@
+"""
+Test NEO RPC failover
+Kiểm tra xếp hạng seed node, chuyển node khi lỗi hoặc trả về không phải JSON và hạ hạng node bị trễ block (httpx.MockTransport)
+"""
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from neo_rpc import NeoRpcClient, NeoRpcError
+from neo_service import NeoService
+
+SEEDS = ["http://seed1", "http://seed2", "http://seed3"]
+
+
+def _client(handler, urls=SEEDS, **kwargs) -> NeoRpcClient:
+    client = NeoRpcClient(urls, **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def _answer(request: httpx.Request, result):
+    return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "result": result})
+
+
+def test_ranking_prefers_fast_healthy_nodes():
+    client = NeoRpcClient(SEEDS)
+    seed1, seed2, seed3 = client.endpoints
+    seed1.record_success(0.30)
+    seed2.record_success(0.05)
+    assert [endpoint.url for endpoint in client.ranked_endpoints()] == ["http://seed2", "http://seed1", "http://seed3"]
+
+    seed2.record_failure()
+    assert [endpoint.url for endpoint in client.ranked_endpoints()] == ["http://seed1", "http://seed3", "http://seed2"]
+    assert client.rpc_url == "http://seed1"
+
+
+def test_call_fails_over_to_the_next_seed():
+    tried = []
+
+    def handler(request):
+        tried.append(str(request.url))
+        if request.url.host == "seed1":
+            raise httpx.ConnectError("refused", request=request)
+        if request.url.host == "seed2":
+            return httpx.Response(502)
+        return _answer(request, 42)
+
+    client = _client(handler)
+    assert asyncio.run(client.call("getblockcount")) == 42
+    assert tried == ["http://seed1", "http://seed2", "http://seed3"]
+    assert [endpoint.healthy for endpoint in client.endpoints] == [False, False, True]
+    assert client.rpc_url == "http://seed3"
+
+
+def test_non_json_answer_fails_over():
+    def handler(request):
+        if request.url.host == "seed1":
+            return httpx.Response(200, text="<html>502 Bad Gateway</html>")
+        return _answer(request, 7)
+
+    client = _client(handler)
+    assert asyncio.run(client.call("getblockcount")) == 7
+    assert client.endpoints[0].failures == 1 and client.rpc_url == "http://seed2"
+
+
+def test_blocking_calls_fail_over_on_non_json_answer(monkeypatch):
+    def post(url, json=None, headers=None, timeout=None):
+        if url == "http://seed1":
+            return httpx.Response(200, text="<html>maintenance</html>")
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "result": 7})
+
+    monkeypatch.setattr(requests, "post", post)
+    service = NeoService(SEEDS)
+    assert service.get_block_count() == 7
+    assert service.rpc.endpoints[0].failures == 1
+
+
+def test_all_seeds_failing_raises():
+    def handler(request):
+        raise httpx.ConnectTimeout("slow", request=request)
+
+    with pytest.raises(NeoRpcError, match="seed3"):
+        asyncio.run(_client(handler).call("getblockcount"))
+
+
+def test_health_check_demotes_lagging_node():
+    heights = {"seed1": 100, "seed2": 110, "seed3": 109}
+
+    def handler(request):
+        return _answer(request, heights[request.url.host])
+
+    client = _client(handler, max_block_lag=5)
+    asyncio.run(client.check_health())
+
+    seed1 = client.endpoints[0]
+    assert seed1.healthy and seed1.lagging and not seed1.available
+    assert client.ranked_endpoints()[-1] is seed1
+
+    heights["seed1"] = 108
+    asyncio.run(client.check_health())
+    assert seed1.available
+
+
+def test_health_loop_survives_a_failing_round():
+    calls = []
+
+    def handler(request):
+        return _answer(request, 100 + len(calls))
+
+    def listener(height):
+        calls.append(height)
+        if len(calls) == 1:
+            raise RuntimeError("listener broke")
+
+    client = _client(handler)
+    client.add_height_listener(listener)
+
+    async def scenario():
+        client.start_health_checks(interval=0.01)
+        for _ in range(100):
+            if len(calls) >= 2:
+                break
+            await asyncio.sleep(0.01)
+        alive = not client._health_task.done()
+        await client.stop_health_checks()
+        return alive
+
+    assert asyncio.run(scenario())
+    assert len(calls) >= 2
@@ -0,0 +1,55 @@
+"""
+Test NEO RPC batching
+Kiểm tra dựng batch JSON-RPC và ghép kết quả theo id (không cần mạng)
+"""
+import itertools
+
+import pytest
+
+from neo_rpc import NeoRpcError, build_batch, demux_batch
+
+
+def _payload(*calls):
+    return build_batch(calls, itertools.count(1).__next__)
+
+
+def test_build_batch_gives_every_call_its_own_id():
+    payload = _payload(("getblockcount", None), ("invokefunction", ["0x01", "get_mission"]))
+    assert [item["id"] for item in payload] == [1, 2]
+    assert payload[0] == {"jsonrpc": "2.0", "method": "getblockcount", "params": [], "id": 1}
+    assert payload[1]["params"] == ["0x01", "get_mission"]
+
+
+def test_demux_reorders_by_id():
+    payload = _payload(("a", []), ("b", []), ("c", []))
+    data = [{"id": 3, "result": "C"}, {"id": 1, "result": "A"}, {"id": 2, "result": "B"}]
+    assert demux_batch(payload, data) == ["A", "B", "C"]
+
+
+def test_demux_raises_on_missing_or_failed_entry():
+    payload = _payload(("a", []), ("b", []))
+    with pytest.raises(NeoRpcError, match="no response for b"):
+        demux_batch(payload, [{"id": 1, "result": "A"}])
+    with pytest.raises(NeoRpcError):
+        demux_batch(payload, [{"id": 1, "result": "A"}, {"id": 2, "error": {"code": -1}}])
+
+
+def test_demux_returns_errors_in_place():
+    payload = _payload(("a", []), ("b", []), ("c", []))
+    data = [{"id": 1, "result": "A"}, {"id": 3, "error": {"code": -100, "message": "Unknown"}}]
+    results = demux_batch(payload, data, return_exceptions=True)
+    assert results[0] == "A"
+    assert isinstance(results[1], NeoRpcError) and isinstance(results[2], NeoRpcError)
+
+
+def test_demux_keeps_falsy_results():
+    payload = _payload(("a", []), ("b", []))
+    assert demux_batch(payload, [{"id": 2, "result": None}, {"id": 1, "result": 0}]) == [0, None]
+
+
+def test_demux_rejects_non_array_answers():
+    payload = _payload(("a", []))
+    with pytest.raises(NeoRpcError, match="Invalid Request"):
+        demux_batch(payload, {"error": {"code": -32600, "message": "Invalid Request"}})
+    with pytest.raises(NeoRpcError, match="not an array"):
+        demux_batch(payload, "oops")
@@ -0,0 +1,137 @@
+"""
+Test NEO stand-in server
+Kiểm tra neo_stub_server qua TestClient: mọi kết quả giả lập đều được NeoService thật đọc đúng, indexer theo kịp các giao dịch ghi
+"""
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+import requests
+from fastapi.testclient import TestClient
+
+from indexer import MissionIndexer
+from mission_store import MissionStore
+from neo_service import BASE58_ALPHABET, NeoService
+from neo_stub_server import NeoStubNode, create_app
+
+
+def _address(script_hash: bytes) -> str:
+    payload = b"\x35" + script_hash
+    raw = payload + hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+    num, text = int.from_bytes(raw, "big"), ""
+    while num:
+        num, digit = divmod(num, 58)
+        text = BASE58_ALPHABET[digit] + text
+    return text
+
+
+# Creator of seeded mission 2
+USER = _address(bytes([1]) * 20)
+
+
+@pytest.fixture
+def node():
+    node = NeoStubNode(block_height=500, seed=1)
+    node.seed_missions(10)
+    return node
+
+
+@pytest.fixture
+def client(node):
+    return TestClient(create_app(node))
+
+
+@pytest.fixture
+def service(node, client, monkeypatch):
+    # NeoService's blocking calls go through requests.post; send them to the stand-in
+    def post(url, json=None, headers=None, timeout=None):
+        return client.post("/", json=json)
+
+    monkeypatch.setattr(requests, "post", post)
+    service = NeoService(["http://neo-stub"])
+    service.mission_contract = node.contract_hash
+    return service
+
+
+def _rpc(client, method, params=None, request_id=1):
+    return client.post("/", json={"jsonrpc": "2.0", "method": method, "params": params or [], "id": request_id}).json()
+
+
+def test_reads_parse_with_neo_service(service):
+    assert service.get_block_count() == 500
+    assert service.get_mission_count() == 10
+
+    mission = service.get_mission(3)
+    assert mission["id"] == 3 and mission["title"] == "Mission 3" and mission["status"] == "PENDING"
+    assert service.get_mission(99) is None
+
+    assert service.get_user_missions(USER) == [2]
+    assert service.get_missions_by_category("learning") == [2, 6, 10]
+    assert service.get_status_counts()["PENDING"] == 10
+
+
+def test_status_and_balances(service):
+    status = service.get_blockchain_status()
+    assert status["connected"] is True and status["block_height"] == 500
+    assert status["balances"] == {"GAS": 50.0, "NEO": 0.0000001}
+
+
+def test_batch_answers_every_id(client):
+    payload = [
+        {"jsonrpc": "2.0", "method": "getblockcount", "params": [], "id": 7},
+        {"jsonrpc": "2.0", "method": "nope", "params": [], "id": 8},
+    ]
+    answers = {item["id"]: item for item in client.post("/", json=payload).json()}
+    assert answers[7]["result"] == 500
+    assert answers[8]["error"]["code"] == -32601
+
+
+def test_unknown_contract_and_method(client, node):
+    assert _rpc(client, "invokefunction", ["0x" + "00" * 20, "get_mission_count"])["error"]["code"] == -100
+    fault = _rpc(client, "invokefunction", [node.contract_hash, "nope"])["result"]
+    assert fault["state"] == "FAULT" and fault["stack"] == []
+
+
+def test_injected_faults(node, client):
+    node.drop_rate = 1.0
+    assert client.post("/", json={"jsonrpc": "2.0", "method": "getblockcount", "id": 1}).status_code == 503
+    node.drop_rate, node.error_rate = 0.0, 1.0
+    assert _rpc(client, "getblockcount")["error"]["message"] == "Injected error"
+    assert client.get("/stats").json()["injected_errors"] == 1
+
+
+def test_indexer_follows_writes(node, client, tmp_path):
+    service = NeoService(["http://neo-stub"])
+    service.mission_contract = node.contract_hash
+    service.rpc._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(node)))
+    store = MissionStore(str(tmp_path / "missions.db"))
+    indexer = MissionIndexer(service, store)
+
+    async def scenario():
+        await indexer.sync_once()
+        assert store.count() == 10 and store.get_indexed_height() == 499
+
+        creator = {"type": "Hash160", "value": "0x" + "ab" * 20}
+        result = _rpc(client, "invokefunction", [node.contract_hash, "create_mission", [
+            creator,
+            {"type": "String", "value": "Đọc sách"},
+            {"type": "String", "value": "30 phút mỗi ngày"},
+            {"type": "Integer", "value": "5"},
+            {"type": "Integer", "value": "1900000000"},
+            {"type": "String", "value": "learning"},
+        ]])["result"]
+        assert result["state"] == "HALT" and result["notifications"][0]["eventname"] == "MissionCreated"
+        _rpc(client, "invokefunction", [node.contract_hash, "accept_mission", [
+            {"type": "Integer", "value": "11"},
+            {"type": "Hash160", "value": "0x" + "cd" * 20},
+        ]])
+
+        assert await indexer.sync_once() == 2
+        await service.rpc.aclose()
+
+    asyncio.run(scenario())
+    mission = store.get_mission(11)
+    assert (mission["title"], mission["status"], mission["assignee"]) == ("Đọc sách", "IN_PROGRESS", "0x" + "cd" * 20)
+    assert store.get_indexed_height() == 501
+    store.close()
@@ -0,0 +1,92 @@
+"""
+Test single-flight
+Kiểm tra SingleFlight gộp các lời gọi giống nhau đang chạy đồng thời
+"""
+import asyncio
+
+import pytest
+
+from neo_rpc import SingleFlight
+
+
+def _value(value):
+    async def fetch():
+        await asyncio.sleep(0)
+        return value
+    return fetch
+
+
+def test_concurrent_identical_calls_run_once():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("k", fetch) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == [1] * 10
+    assert calls == 1
+    assert flights.stats() == {"in_flight": 0, "executed": 1, "shared": 9}
+
+
+def test_different_keys_do_not_share():
+    flights = SingleFlight()
+
+    async def scenario():
+        return await asyncio.gather(flights.do("a", _value("a")), flights.do("b", _value("b")))
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert flights.executed == 2
+
+
+def test_exception_is_shared_and_key_is_released():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("node down")
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flights.stats()["in_flight"] == 0
+        # The next call starts fresh instead of reusing the failed task
+        with pytest.raises(RuntimeError):
+            await flights.do("k", fail)
+
+    asyncio.run(scenario())
+    assert calls == 2
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    flights = SingleFlight()
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "ok"
+
+        first = asyncio.create_task(flights.do("k", fetch))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flights.do("k", fetch))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "ok"
+        assert first.cancelled()
+        assert flights.executed == 1
+
+    asyncio.run(scenario())
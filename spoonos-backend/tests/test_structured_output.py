@@ -0,0 +1,56 @@
+"""
+Test structured output
+Kiểm tra extract_json và parse_model với các kiểu câu trả lời LLM thường gặp
+"""
+import pytest
+from pydantic import BaseModel
+
+from structured_output import MAX_FALLBACK_STARTS, StructuredOutputError, extract_json, parse_model
+
+
+class Verdict(BaseModel):
+    result: str
+    confidence: int
+
+
+def test_plain_json():
+    assert extract_json('{"a": 1}') == {"a": 1}
+    assert extract_json("[1, 2]", "[") == [1, 2]
+
+
+def test_fenced_json_with_prose():
+    text = 'Kết quả đánh giá:\n```json\n{"result": "approve", "confidence": 90}\n```\nCảm ơn!'
+    assert extract_json(text) == {"result": "approve", "confidence": 90}
+
+
+def test_skips_brackets_that_do_not_start_json():
+    text = 'Ghi chú {không phải json} rồi {"a": {"b": [1, "}"]}} hết'
+    assert extract_json(text) == {"a": {"b": [1, "}"]}}
+
+
+def test_raw_control_characters_in_strings():
+    assert extract_json('note {"reason": "dòng 1\ndòng 2"}') == {"reason": "dòng 1\ndòng 2"}
+
+
+def test_wrong_container_is_not_accepted():
+    with pytest.raises(StructuredOutputError):
+        extract_json("[1, 2]", "{")
+    assert extract_json('answer: {"items": 1} then [3]', "[") == [3]
+
+
+def test_gives_up_after_max_fallback_starts():
+    text = "{ " * MAX_FALLBACK_STARTS + '{"a": 1}'
+    with pytest.raises(StructuredOutputError):
+        extract_json(text)
+    assert extract_json("{ " * (MAX_FALLBACK_STARTS - 1) + '{"a": 1}') == {"a": 1}
+
+
+def test_no_json():
+    with pytest.raises(StructuredOutputError):
+        extract_json("Xin lỗi, tôi không thể đánh giá.")
+
+
+def test_parse_model_fills_defaults_and_validates():
+    assert parse_model('{"result": "approve"}', Verdict, {"confidence": 0}) == Verdict(result="approve", confidence=0)
+    with pytest.raises(StructuredOutputError):
+        parse_model('{"result": "approve"}', Verdict)
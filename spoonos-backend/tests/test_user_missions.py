@@ -0,0 +1,21 @@
+"""
+Test user missions route
+Kiểm tra /api/missions/user/{address}: kiểm tra địa chỉ chỉ khi đã cấu hình contract
+"""
+from fastapi.testclient import TestClient
+
+import main
+from neo_service import MOCK_USER_MISSIONS
+
+
+def test_mock_mode_accepts_any_user(monkeypatch):
+    monkeypatch.setattr(main.neo_service, "mission_contract", None)
+    response = TestClient(main.app).get("/api/missions/user/default_creator", params={"limit": 2})
+    assert response.status_code == 200
+    assert response.json()["missionIds"] == MOCK_USER_MISSIONS[:2]
+
+
+def test_malformed_address_is_rejected_with_a_contract(monkeypatch):
+    monkeypatch.setattr(main.neo_service, "mission_contract", "0x" + "ab" * 20)
+    response = TestClient(main.app).get("/api/missions/user/default_creator")
+    assert response.status_code == 400
@@ -0,0 +1,86 @@
+"""
+Test verdict cache
+Kiểm tra khóa nội dung của verdict, TTL (kể cả TTL Redis dưới 1 giây), LRU và cache bị tắt
+"""
+import asyncio
+import time
+import unicodedata
+
+from verdict_cache import MemoryVerdictBackend, RedisVerdictBackend, VerdictCache, verdict_key
+
+VERDICT = {"result": "approve", "confidence": 90, "reason": "ok"}
+
+
+def test_key_ignores_spacing_case_and_unicode_form():
+    key = verdict_key("gemini:m", description="Chạy bộ  5km", imageUrl="ipfs://A")
+    # Same text typed with a decomposed "ạ" and different spacing/case
+    assert verdict_key("gemini:m", description=" chạy BỘ 5km ", imageUrl="IPFS://a") == key
+
+
+def test_key_depends_on_model_and_content():
+    key = verdict_key("gemini:m", description="Chạy bộ 5km")
+    assert verdict_key("openai:m", description="Chạy bộ 5km") != key
+    assert verdict_key("gemini:m", description="Chạy bộ 6km") != key
+    assert verdict_key("gemini:m", title="Chạy bộ 5km") != key
+
+
+def test_hit_after_set():
+    cache = VerdictCache(MemoryVerdictBackend(max_entries=10, ttl=60))
+    asyncio.run(cache.set("k", VERDICT))
+    assert asyncio.run(cache.get("k")) == VERDICT
+    assert asyncio.run(cache.get("other")) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["backend"] == "memory"
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = VerdictCache(MemoryVerdictBackend(max_entries=10, ttl=60))
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    asyncio.run(cache.set("k", VERDICT))
+    monkeypatch.setattr(time, "monotonic", lambda: now + 59)
+    assert asyncio.run(cache.get("k")) == VERDICT
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert asyncio.run(cache.get("k")) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerdictCache(MemoryVerdictBackend(max_entries=2, ttl=60))
+
+    async def scenario():
+        await cache.set("a", VERDICT)
+        await cache.set("b", VERDICT)
+        await cache.get("a")
+        await cache.set("c", VERDICT)
+        return [await cache.get(key) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [True, False, True]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disabled_cache_misses_and_drops_writes():
+    backend = MemoryVerdictBackend(max_entries=10, ttl=60)
+    cache = VerdictCache(backend, enabled=False)
+    asyncio.run(cache.set("k", VERDICT))
+    assert asyncio.run(cache.get("k")) is None
+    assert asyncio.run(backend.get("k")) is None
+    assert cache.stats() == {"enabled": False}
+    assert not VerdictCache().enabled
+
+
+class RecordingRedis:
+    def __init__(self):
+        self.sets = []
+
+    async def set(self, key, value, **kwargs):
+        self.sets.append(kwargs)
+
+
+def test_redis_ttl_below_one_second_still_expires():
+    backend = RedisVerdictBackend.__new__(RedisVerdictBackend)
+    backend._client = RecordingRedis()
+    backend.prefix = "test:"
+    backend.errors = 0
+    for ttl in (0.25, 0.0001, 90):
+        backend.ttl = ttl
+        asyncio.run(backend.set("k", VERDICT))
+    assert backend._client.sets == [{"px": 250}, {"px": 1}, {"px": 90000}]
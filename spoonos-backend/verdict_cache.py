@@ -0,0 +1,173 @@
+"""
+Verdict Cache
+Cache kết quả xác minh bằng chứng theo hash nội dung (đầu vào đã chuẩn hóa + tên model)
+"""
+import os
+import json
+import hashlib
+import logging
+import unicodedata
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from llm_client import load_llm_config
+from neo_cache import BlockReadCache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "missionstake:verdict:"
+
+
+def normalize_text(value: Any) -> str:
+    """NFC, case-folded, with runs of whitespace collapsed to one space"""
+    text = unicodedata.normalize("NFC", str(value or ""))
+    return " ".join(text.split()).casefold()
+
+
+def verdict_key(model: str, **inputs: Any) -> str:
+    """
+    Content address for a verdict: sha256 over the model name and the
+    normalized prompt inputs, so retries and resubmissions of the same
+    evidence map to the same entry regardless of spacing or case
+    """
+    payload = json.dumps(
+        {"model": model, **{name: normalize_text(value) for name, value in inputs.items()}},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryVerdictBackend:
+    """In-process TTL + LRU store (a BlockReadCache that never sees block heights)"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._cache = BlockReadCache(max_entries=max_entries, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        hit, value = self._cache.get(key)
+        return value if hit else None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        self._cache.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats.pop("block_height", None)
+        stats.pop("invalidations", None)
+        return stats
+
+    async def aclose(self):
+        pass
+
+
+class RedisVerdictBackend:
+    """
+    Shared store for several API workers
+
+    Entries expire through Redis TTLs; size is bounded by the server's
+    maxmemory policy. Redis errors are logged and treated as misses so an
+    unavailable cache never fails a verification.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float, prefix: str = REDIS_KEY_PREFIX):
+        import redis.asyncio as redis
+
+        # Short timeouts: a slow cache must not cost more than the LLM call it saves
+        self._client = redis.from_url(url, decode_responses=True, socket_connect_timeout=0.5, socket_timeout=0.5)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await self._client.get(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Verdict cache read failed: %s", e)
+            return None
+
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        try:
+            await self._client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=max(1, int(self.ttl * 1000)))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Verdict cache write failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "errors": self.errors
+        }
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class VerdictCache:
+    """
+    Cache for LLM evidence verdicts
+
+    Disabled caches (llm_settings.enable_caching = false) miss on every
+    lookup and drop every write.
+    """
+
+    def __init__(self, backend=None, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled and backend is not None
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        return await self.backend.get(key)
+
+    async def set(self, key: str, verdict: Dict[str, Any]):
+        if self.enabled:
+            await self.backend.set(key, verdict)
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        return {"enabled": True, "backend": self.backend.name, **self.backend.stats()}
+
+    async def aclose(self):
+        if self.backend is not None:
+            await self.backend.aclose()
+
+
+def create_verdict_cache() -> VerdictCache:
+    """
+    Build the cache from config.json's llm_settings.enable_caching and env
+    (LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_REDIS_URL)
+    """
+    enabled = load_llm_config()["settings"].get("enable_caching", False)
+    if not enabled:
+        return VerdictCache(enabled=False)
+
+    ttl = float(os.getenv("LLM_CACHE_TTL", "86400"))
+    redis_url = os.getenv("LLM_CACHE_REDIS_URL", "")
+    if redis_url:
+        return VerdictCache(RedisVerdictBackend(redis_url, ttl))
+    return VerdictCache(MemoryVerdictBackend(int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")), ttl))
+
+
+# Singleton instance
+verdict_cache = create_verdict_cache()
@@ -453,7 +453,8 @@ export function MissionDetail({ missionId, user, onNavigate, setUser, missions,
         mission.title,
         mission.description,
         mission.evidences,
-        totalDays
+        totalDays,
+        mission.id
       );
 
       const finalEvaluation = {
@@ -64,7 +64,8 @@ export async function evaluateMissionWithAI(
   missionTitle: string,
   missionDescription: string,
   evidences: Evidence[],
-  totalDays: number
+  totalDays: number,
+  missionId?: string
 ): Promise<AIFinalEvaluationResult> {
   try {
     const response = await fetch(`${API_BASE_URL}/api/gemini/evaluate-mission`, {
@@ -76,7 +77,8 @@ export async function evaluateMissionWithAI(
         missionTitle: missionTitle,
         missionDescription: missionDescription,
         evidences: evidences,
-        totalDays: totalDays
+        totalDays: totalDays,
+        missionId: missionId
       })
     });
 